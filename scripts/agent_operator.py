@@ -1,23 +1,20 @@
+import importlib
+import json
 import logging
+import subprocess
+import sys
 from uuid import uuid4
 
 import typer
 from dotenv import load_dotenv
 from langchain_core.runnables.config import RunnableConfig
-from langfuse.langchain import CallbackHandler
 
-from template_langgraph.agents.chat_with_tools_agent.agent import graph as chat_with_tools_agent_graph
-from template_langgraph.agents.image_classifier_agent.agent import graph as image_classifier_agent_graph
 from template_langgraph.agents.image_classifier_agent.models import Results
-from template_langgraph.agents.issue_formatter_agent.agent import graph as issue_formatter_agent_graph
-from template_langgraph.agents.kabuto_helpdesk_agent.agent import graph as kabuto_helpdesk_agent_graph
-from template_langgraph.agents.news_summarizer_agent.agent import graph as news_summarizer_agent_graph
 from template_langgraph.agents.news_summarizer_agent.models import (
     AgentInputState,
     AgentState,
     Article,
 )
-from template_langgraph.agents.task_decomposer_agent.agent import graph as task_decomposer_agent_graph
 from template_langgraph.loggers import get_logger
 
 # Initialize the Typer application
@@ -30,21 +27,52 @@ app = typer.Typer(
 logger = get_logger(__name__)
 
 
+# Agent modules are imported on demand so that only the selected agent is loaded
+AGENT_MODULES = {
+    "chat_with_tools_agent": "template_langgraph.agents.chat_with_tools_agent.agent",
+    "issue_formatter_agent": "template_langgraph.agents.issue_formatter_agent.agent",
+    "task_decomposer_agent": "template_langgraph.agents.task_decomposer_agent.agent",
+    "kabuto_helpdesk_agent": "template_langgraph.agents.kabuto_helpdesk_agent.agent",
+    "news_summarizer_agent": "template_langgraph.agents.news_summarizer_agent.agent",
+    "image_classifier_agent": "template_langgraph.agents.image_classifier_agent.agent",
+}
+
+
 def get_agent_graph(name: str):
-    if name == "chat_with_tools_agent":
-        return chat_with_tools_agent_graph
-    elif name == "issue_formatter_agent":
-        return issue_formatter_agent_graph
-    elif name == "task_decomposer_agent":
-        return task_decomposer_agent_graph
-    elif name == "kabuto_helpdesk_agent":
-        return kabuto_helpdesk_agent_graph
-    elif name == "news_summarizer_agent":
-        return news_summarizer_agent_graph
-    elif name == "image_classifier_agent":
-        return image_classifier_agent_graph
-    else:
+    if name not in AGENT_MODULES:
         raise ValueError(f"Unknown agent name: {name}")
+    return importlib.import_module(AGENT_MODULES[name]).get_graph()
+
+
+def get_callback_handler():
+    from langfuse.langchain import CallbackHandler
+
+    return CallbackHandler()
+
+
+def get_langgraph_modules(config_path: str) -> dict[str, str]:
+    """Map each graph name in langgraph.json to the module defining it."""
+    with open(config_path) as f:
+        graphs = json.load(f)["graphs"]
+    return {name: spec.split(":")[0] for name, spec in graphs.items()}
+
+
+def measure_import_time(module: str) -> list[tuple[str, int, int]]:
+    """Import a module in a fresh interpreter and return (module, self_us, cumulative_us) rows."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import {module}: {result.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
 
 
 @app.command()
@@ -128,7 +156,7 @@ def run(
         config=RunnableConfig(
             recursion_limit=recursion_limit,
             callbacks=[
-                CallbackHandler(),
+                get_callback_handler(),
             ],
         ),
     ):
@@ -173,7 +201,7 @@ def news_summarizer_agent(
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    graph = news_summarizer_agent_graph
+    graph = get_agent_graph("news_summarizer_agent")
     for event in graph.stream(
         input=AgentState(
             input=AgentInputState(
@@ -186,7 +214,7 @@ def news_summarizer_agent(
         config=RunnableConfig(
             recursion_limit=recursion_limit,
             callbacks=[
-                CallbackHandler(),
+                get_callback_handler(),
             ],
         ),
     ):
@@ -237,7 +265,7 @@ def image_classifier_agent(
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    graph = image_classifier_agent_graph
+    graph = get_agent_graph("image_classifier_agent")
     for event in graph.stream(
         input=AgentState(
             input=AgentInputState(
@@ -250,7 +278,7 @@ def image_classifier_agent(
         config=RunnableConfig(
             recursion_limit=recursion_limit,
             callbacks=[
-                CallbackHandler(),
+                get_callback_handler(),
             ],
         ),
     ):
@@ -262,6 +290,59 @@ def image_classifier_agent(
         logger.info(f"{result.model_dump_json(indent=2)}")
 
 
+@app.command()
+def import_time(
+    name: str = typer.Option(
+        None,
+        "--name",
+        "-n",
+        help="Name of the graph to measure (default: every graph in langgraph.json)",
+    ),
+    config_path: str = typer.Option(
+        "langgraph.json",
+        "--config",
+        "-c",
+        help="Path to the langgraph.json file",
+    ),
+    top: int = typer.Option(
+        5,
+        "--top",
+        "-t",
+        help="Number of heaviest dependencies to show per module",
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose output",
+    ),
+):
+    """Report the import cost of each agent module measured with `python -X importtime`."""
+    # Set up logging
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+
+    modules = get_langgraph_modules(config_path)
+    if name is not None:
+        modules = {name: modules[name]}
+
+    for graph_name, module in modules.items():
+        try:
+            rows = measure_import_time(module)
+        except RuntimeError as e:
+            typer.echo(f"{graph_name}: {e}")
+            continue
+        cumulative_us = next(c for m, _, c in rows if m == module)
+        typer.echo(f"{graph_name}: {cumulative_us / 1000:.1f} ms ({module})")
+        heaviest = sorted(
+            (row for row in rows if "." not in row[0] and row[0] != "template_langgraph"),
+            key=lambda row: row[2],
+            reverse=True,
+        )
+        for dependency, _, dependency_us in heaviest[:top]:
+            typer.echo(f"  {dependency_us / 1000:8.1f} ms  {dependency}")
+
+
 if __name__ == "__main__":
     load_dotenv(
         override=True,
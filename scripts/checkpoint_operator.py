@@ -7,7 +7,6 @@ import typer
 from dotenv import load_dotenv
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.checkpoint.sqlite import SqliteSaver
-from langgraph_checkpoint_cosmosdb import CosmosDBSaver
 
 from template_langgraph.loggers import get_logger
 
@@ -53,6 +52,8 @@ def get_checkpointer(raw_value: str):
         conn = sqlite3.connect("checkpoints.sqlite", check_same_thread=False)
         return SqliteSaver(conn=conn)
     if checkpoint_type is CheckpointType.COSMOSDB:
+        from langgraph_checkpoint_cosmosdb import CosmosDBSaver
+
         from template_langgraph.tools.cosmosdb_tool import get_cosmosdb_settings
 
         settings = get_cosmosdb_settings()
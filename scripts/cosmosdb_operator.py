@@ -4,9 +4,11 @@ import typer
 from dotenv import load_dotenv
 
 from template_langgraph.internals.csv_loaders import CsvLoaderWrapper
+from template_langgraph.internals.ingestion_manifests import IngestionManifest
 from template_langgraph.internals.pdf_loaders import PdfLoaderWrapper
 from template_langgraph.loggers import get_logger
-from template_langgraph.tools.cosmosdb_tool import CosmosdbClientWrapper
+from template_langgraph.tools.cosmosdb_tool import CosmosdbClientWrapper, get_cosmosdb_target
+from template_langgraph.tools.result_caches import bump_index_version
 
 # Initialize the Typer application
 app = typer.Typer(
@@ -20,6 +22,11 @@ logger = get_logger(__name__)
 
 @app.command()
 def add_documents(
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="Re-ingest every file instead of only new or changed ones",
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -31,29 +38,30 @@ def add_documents(
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    # Load documents from PDF files
-    pdf_documents = PdfLoaderWrapper().load_pdf_docs()
-    logger.info(f"Loaded {len(pdf_documents)} documents from PDF.")
+    pdf_loader = PdfLoaderWrapper()
+    csv_loader = CsvLoaderWrapper()
 
-    # Load documents from CSV files
-    csv_documents = CsvLoaderWrapper().load_csv_docs()
-    logger.info(f"Loaded {len(csv_documents)} documents from CSV.")
+    def load_files(paths: list[str]):
+        yield from pdf_loader.lazy_load_pdf_docs([path for path in paths if path.endswith(".pdf")])
+        yield from csv_loader.lazy_load_csv_docs([path for path in paths if path.endswith(".csv")])
 
-    # Combine all documents
-    documents = pdf_documents + csv_documents
-    logger.info(f"Total documents to add: {len(documents)}")
+    # Load only the new or changed documents from PDF and CSV files
+    manifest = IngestionManifest(target=get_cosmosdb_target())
+    plan = manifest.plan(pdf_loader.list_pdf_paths() + csv_loader.list_csv_paths(), full=full)
 
-    # Add documents to Cosmos DB
+    # Stream the documents into Cosmos DB in batches
     cosmosdb_client = CosmosdbClientWrapper()
-    ids = cosmosdb_client.add_documents(
-        documents=documents,
-    )
-    logger.info(f"Added {len(ids)} documents to Cosmos DB.")
-    for id in ids:
-        logger.debug(f"Added document ID: {id}")
-
-    # FIXME: deleting documents() is not working as expected
-    # assert cosmosdb_client.delete_documents(ids=ids), "Failed to delete documents from Cosmos DB"
+    added = cosmosdb_client.index_documents(plan.iter_documents(load_files))
+    logger.info(f"Added {added} documents to Cosmos DB.")
+
+    if plan.deleted_ids:
+        deleted = cosmosdb_client.delete_documents(
+            ids=plan.deleted_ids,
+        )
+        logger.info(f"Deleted {deleted} stale documents from Cosmos DB.")
+    manifest.commit(plan)
+    if added or plan.deleted_ids:
+        bump_index_version(manifest.target)
 
 
 @app.command()
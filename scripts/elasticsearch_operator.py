@@ -3,9 +3,11 @@ import logging
 import typer
 from dotenv import load_dotenv
 
+from template_langgraph.internals.ingestion_manifests import IngestionManifest
 from template_langgraph.internals.pdf_loaders import PdfLoaderWrapper
 from template_langgraph.loggers import get_logger
 from template_langgraph.tools.elasticsearch_tool import ElasticsearchClientWrapper
+from template_langgraph.tools.result_caches import bump_index_version
 
 # Initialize the Typer application
 app = typer.Typer(
@@ -111,6 +113,7 @@ def delete_index(
         index_name=index_name,
     )
     if result:
+        bump_index_version(f"elasticsearch:{index_name}")
         logger.info(f"Deleted Elasticsearch index: {index_name}")
     else:
         logger.warning(f"Index {index_name} does not exist or could not be deleted.")
@@ -125,6 +128,26 @@ def add_documents(
         "-i",
         help="Name of the Elasticsearch index to add documents to",
     ),
+    chunk_size: int = typer.Option(
+        None,
+        "--chunk-size",
+        help="Number of documents per bulk request (default: ELASTICSEARCH_BULK_CHUNK_SIZE)",
+    ),
+    thread_count: int = typer.Option(
+        None,
+        "--thread-count",
+        help="Number of bulk requests in flight, 1 streams serially (default: ELASTICSEARCH_BULK_THREAD_COUNT)",
+    ),
+    max_chunk_bytes: int = typer.Option(
+        None,
+        "--max-chunk-bytes",
+        help="Maximum size of a bulk request in bytes (default: ELASTICSEARCH_BULK_MAX_CHUNK_BYTES)",
+    ),
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="Re-ingest every file instead of only new or changed ones",
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -139,19 +162,33 @@ def add_documents(
     # Create Elasticsearch index
     es = ElasticsearchClientWrapper()
 
-    # Load documents from PDF files
-    documents = PdfLoaderWrapper().load_pdf_docs()
-    logger.info(f"Loaded {len(documents)} documents from PDF.")
-
-    # Add documents to Elasticsearch index
-    result = es.add_documents(
+    # Stream only the new or changed documents from PDF files into the Elasticsearch index
+    pdf_loader = PdfLoaderWrapper()
+    manifest = IngestionManifest(target=f"elasticsearch:{index_name}")
+    plan = manifest.plan(pdf_loader.list_pdf_paths(), full=full)
+    result = es.index_documents(
         index_name=index_name,
-        documents=documents,
+        documents=plan.iter_documents(pdf_loader.lazy_load_pdf_docs),
+        chunk_size=chunk_size,
+        thread_count=thread_count,
+        max_chunk_bytes=max_chunk_bytes,
     )
-    if result:
-        logger.info(f"Added {len(documents)} documents to Elasticsearch index: {index_name}")
-    else:
-        logger.error(f"Failed to add documents to Elasticsearch index: {index_name}")
+    logger.info(f"Added {result.success} documents to Elasticsearch index: {index_name}")
+    if result.success:
+        bump_index_version(manifest.target)
+    if result.failed:
+        logger.error(f"Failed to add {len(result.failed)} documents to Elasticsearch index: {index_name}")
+        logger.error("Ingestion manifest not updated, the next run will retry the changed files")
+        return
+
+    if plan.deleted_ids:
+        deleted = es.delete_documents(
+            index_name=index_name,
+            ids=plan.deleted_ids,
+        )
+        logger.info(f"Deleted {deleted.success} stale documents from Elasticsearch index: {index_name}")
+        bump_index_version(manifest.target)
+    manifest.commit(plan)
 
 
 if __name__ == "__main__":
@@ -9,7 +9,7 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from mlflow.genai import scorer
 from mlflow.genai.scorers import Correctness, Guidelines
 
-from template_langgraph.agents.demo_agents.weather_agent import graph
+from template_langgraph.agents.demo_agents.weather_agent import get_graph
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper, Settings
 from template_langgraph.loggers import get_logger
 
@@ -62,7 +62,7 @@ def tracing(
     mlflow.set_tracking_uri(tracking_uri)
     mlflow.set_experiment(experiment_name)
 
-    result = graph.invoke(
+    result = get_graph().invoke(
         {
             "messages": [
                 HumanMessage(content=query),
@@ -1,13 +1,23 @@
 import logging
+import time
+import uuid
 
+import numpy as np
 import typer
 from dotenv import load_dotenv
 from qdrant_client.models import PointStruct
 
 from template_langgraph.internals.csv_loaders import CsvLoaderWrapper
+from template_langgraph.internals.embedding_pipelines import (
+    EmbeddedBatch,
+    EmbeddingPipeline,
+    get_embedding_pipeline_settings,
+)
+from template_langgraph.internals.ingestion_manifests import IngestionManifest
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
 from template_langgraph.loggers import get_logger
-from template_langgraph.tools.qdrant_tool import QdrantClientWrapper
+from template_langgraph.tools.qdrant_tool import COLLECTION_PROFILES, QdrantClientWrapper, get_collection_profile
+from template_langgraph.tools.result_caches import bump_index_version
 
 # Initialize the Typer application
 app = typer.Typer(
@@ -19,6 +29,11 @@ app = typer.Typer(
 logger = get_logger(__name__)
 
 
+def to_point_id(chunk_id: str) -> str:
+    """Qdrant point ids must be integers or UUIDs, so map the chunk hash onto a UUID."""
+    return str(uuid.UUID(chunk_id[:32]))
+
+
 @app.command()
 def delete_collection(
     collection_name: str = typer.Option(
@@ -43,6 +58,7 @@ def delete_collection(
         collection_name=collection_name,
     )
     if result:
+        bump_index_version(f"qdrant:{collection_name}")
         logger.info(f"Successfully deleted Qdrant collection: {collection_name}")
     else:
         logger.warning(f"Qdrant collection {collection_name} does not exist or could not be deleted.")
@@ -57,6 +73,29 @@ def add_documents(
         "-c",
         help="Name of the Qdrant collection to add documents to",
     ),
+    batch_size: int = typer.Option(
+        None,
+        "--batch-size",
+        "-b",
+        help="Number of documents per embedding request (default: EMBEDDING_PIPELINE_BATCH_SIZE)",
+    ),
+    max_concurrency: int = typer.Option(
+        None,
+        "--max-concurrency",
+        "-m",
+        help="Number of embedding requests in flight (default: EMBEDDING_PIPELINE_MAX_CONCURRENCY)",
+    ),
+    start_offset: int = typer.Option(
+        0,
+        "--start-offset",
+        "-s",
+        help="Index of the first new or changed document to ingest, to resume an interrupted run",
+    ),
+    full: bool = typer.Option(
+        False,
+        "--full",
+        help="Re-ingest every file instead of only new or changed ones",
+    ),
     verbose: bool = typer.Option(
         False,
         "--verbose",
@@ -68,44 +107,75 @@ def add_documents(
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    # Load documents from CSV files
-    documents = CsvLoaderWrapper().load_csv_docs()
-    logger.info(f"Loaded {len(documents)} documents from CSV.")
+    # Load only the new or changed documents from CSV files
+    csv_loader = CsvLoaderWrapper()
+    manifest = IngestionManifest(target=f"qdrant:{collection_name}")
+    plan = manifest.plan(csv_loader.list_csv_paths(), full=full)
 
-    points = []
+    settings = get_embedding_pipeline_settings().model_copy()
+    if batch_size is not None:
+        settings.embedding_pipeline_batch_size = batch_size
+    if max_concurrency is not None:
+        settings.embedding_pipeline_max_concurrency = max_concurrency
     embedding_wrapper = AzureOpenAiWrapper()
-    for i, doc in enumerate(documents):
-        logger.debug(f"Processing document {i}: {doc.metadata.get('source', 'unknown')}")
-        content = doc.page_content.replace("\n", " ")
-        logger.debug(f"Creating embedding for document {i} with content: {content[:50]}...")
-        vector = embedding_wrapper.create_embedding(content)
-        points.append(
+    pipeline = EmbeddingPipeline(
+        embed_documents=embedding_wrapper.create_embeddings,
+        settings=settings,
+    )
+    qdrant_client = QdrantClientWrapper()
+
+    if plan.changed_paths and not qdrant_client.collection_exists(collection_name=collection_name):
+        # Probe the embedding size once rather than checking the collection on every batch
+        logger.info(f"Creating Qdrant collection: {collection_name}")
+        qdrant_client.create_collection(
+            collection_name=collection_name,
+            vector_size=len(embedding_wrapper.create_embedding(collection_name)),
+        )
+
+    def upsert_batch(batch: EmbeddedBatch):
+        # Point ids derive from chunk ids, so re-running overwrites rather than duplicates
+        points = [
             PointStruct(
-                id=i,
+                id=to_point_id(document.metadata["chunk_id"]),
                 vector=vector,
                 payload={
-                    "file_name": doc.metadata.get("source", f"doc_{i}"),
+                    "file_name": document.metadata.get("source", f"doc_{offset}"),
                     "content": content,
                 },
             )
+            for offset, document, content, vector in zip(
+                range(batch.offset, batch.offset + len(batch.items)),
+                batch.items,
+                batch.texts,
+                batch.vectors,
+            )
+        ]
+        operation_info = qdrant_client.upsert_points(
+            collection_name=collection_name,
+            points=points,
         )
+        logger.debug(f"Operation info: {operation_info}")
 
-    # Create Qdrant collection and upsert points
-    logger.info(f"Creating Qdrant collection: {collection_name}")
-    qdrant_client = QdrantClientWrapper()
-    qdrant_client.create_collection(
-        collection_name=collection_name,
-        vector_size=len(points[0].vector) if points else 1536,  # default vector size
-    )
-
-    # Upsert points into the Qdrant collection
+    # Stream the documents through the pipeline instead of loading them all up front
     logger.info(f"Upserting points into Qdrant collection: {collection_name}")
-    operation_info = qdrant_client.upsert_points(
-        collection_name=collection_name,
-        points=points,
+    progress = pipeline.run(
+        texts=plan.iter_documents(csv_loader.lazy_load_csv_docs),
+        sink=upsert_batch,
+        start_offset=start_offset,
+        to_text=lambda document: document.page_content.replace("\n", " "),
     )
-    logger.info(f"Upserted {len(points)} points into Qdrant collection: {collection_name}")
-    logger.info(f"Operation info: {operation_info}")
+    logger.info(f"Upserted {progress.done} points into Qdrant collection: {collection_name}")
+    logger.info(f"Throughput: {progress.rate:.1f} docs/s")
+
+    if plan.deleted_ids and qdrant_client.collection_exists(collection_name=collection_name):
+        qdrant_client.delete_points(
+            collection_name=collection_name,
+            ids=[to_point_id(chunk_id) for chunk_id in plan.deleted_ids],
+        )
+        logger.info(f"Deleted {len(plan.deleted_ids)} stale points from Qdrant collection: {collection_name}")
+    manifest.commit(plan)
+    if progress.done or plan.deleted_ids:
+        bump_index_version(manifest.target)
 
 
 @app.command()
@@ -146,6 +216,132 @@ def search_documents(
         logger.info("-" * 40)
 
 
+def make_benchmark_vectors(num_points: int, num_queries: int, vector_size: int, seed: int):
+    """Clustered unit vectors, which resemble embeddings more than uniform noise does."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, num_points // 100), vector_size)).astype(np.float32)
+
+    def sample(count: int) -> np.ndarray:
+        vectors = centers[rng.integers(len(centers), size=count)] + 0.5 * rng.standard_normal(
+            (count, vector_size)
+        ).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return sample(num_points), sample(num_queries)
+
+
+@app.command()
+def benchmark(
+    profiles: str = typer.Option(
+        ",".join(COLLECTION_PROFILES),
+        "--profiles",
+        "-p",
+        help="Comma-separated collection profiles to compare",
+    ),
+    num_points: int = typer.Option(
+        20000,
+        "--num-points",
+        "-n",
+        help="Number of synthetic points to index per profile",
+    ),
+    vector_size: int = typer.Option(
+        1536,
+        "--vector-size",
+        help="Dimension of the synthetic vectors",
+    ),
+    num_queries: int = typer.Option(
+        100,
+        "--num-queries",
+        help="Number of queries per profile",
+    ),
+    limit: int = typer.Option(
+        10,
+        "--limit",
+        "-k",
+        help="k of recall@k",
+    ),
+    batch_size: int = typer.Option(
+        1000,
+        "--batch-size",
+        help="Number of points per upsert",
+    ),
+    seed: int = typer.Option(
+        0,
+        "--seed",
+        help="Random seed of the synthetic data",
+    ),
+    keep: bool = typer.Option(
+        False,
+        "--keep",
+        help="Keep the benchmark collections instead of deleting them",
+    ),
+    verbose: bool = typer.Option(
+        False,
+        "--verbose",
+        "-v",
+        help="Enable verbose output",
+    ),
+):
+    """Compare recall@k, query latency and estimated RAM of collection profiles."""
+    # Set up logging
+    if verbose:
+        logger.setLevel(logging.DEBUG)
+
+    vectors, queries = make_benchmark_vectors(num_points, num_queries, vector_size, seed)
+    # Exact top-k as ground truth
+    similarities = queries @ vectors.T
+    truth = [set(np.argsort(-row)[:limit].tolist()) for row in similarities]
+
+    qdrant_client = QdrantClientWrapper()
+    rows = []
+    for name in [name.strip() for name in profiles.split(",") if name.strip()]:
+        profile = get_collection_profile(name)
+        collection_name = f"benchmark_{name}"
+        qdrant_client.delete_collection(collection_name=collection_name)
+        qdrant_client.create_collection(collection_name=collection_name, vector_size=vector_size, profile=profile)
+        for offset in range(0, num_points, batch_size):
+            qdrant_client.upsert_points(
+                collection_name=collection_name,
+                points=[
+                    PointStruct(id=i, vector=vectors[i].tolist())
+                    for i in range(offset, min(offset + batch_size, num_points))
+                ],
+            )
+        qdrant_client.wait_until_indexed(collection_name=collection_name)
+        logger.debug(f"Indexed {num_points} points into {collection_name}")
+
+        latencies = []
+        recalls = []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            points = qdrant_client.query_points(
+                collection_name=collection_name,
+                query=query.tolist(),
+                limit=limit,
+                search_params=profile.search_params(),
+            )
+            latencies.append(time.perf_counter() - started)
+            recalls.append(len(expected & {point.id for point in points}) / limit)
+        rows.append(
+            (
+                name,
+                float(np.mean(recalls)),
+                float(np.percentile(latencies, 50)) * 1000,
+                float(np.percentile(latencies, 95)) * 1000,
+                profile.estimate_ram_bytes(num_points, vector_size) / 1024**2,
+            )
+        )
+        if not keep:
+            qdrant_client.delete_collection(collection_name=collection_name)
+
+    logger.info(f"{num_points} points, {vector_size} dims, {num_queries} queries")
+    logger.info(f"{'profile':<16} {f'recall@{limit}':>10} {'p50 ms':>8} {'p95 ms':>8} {'est. RAM MB':>12}")
+    for name, recall, p50, p95, ram in rows:
+        logger.info(f"{name:<16} {recall:>10.3f} {p50:>8.2f} {p95:>8.2f} {ram:>12.1f}")
+        # RAM scales linearly with the number of points
+        logger.debug(f"{name}: ~{ram * 1_000_000 / num_points / 1024:.1f} GB per million points")
+
+
 if __name__ == "__main__":
     load_dotenv(
         override=True,
@@ -1,11 +1,23 @@
 import asyncio
+import contextvars
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
-from langchain_core.messages import SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.graph import END, StateGraph
 
 from template_langgraph.agents.chat_with_tools_agent.models import AgentState
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+from template_langgraph.llms.prompt_caches import PromptPrefix, get_prompt_prefix_cache, record_prompt_cache_usage
+from template_langgraph.llms.semantic_caches import (
+    SemanticResponseCache,
+    get_semantic_cache_settings,
+    get_semantic_response_cache,
+    make_namespace,
+)
 from template_langgraph.loggers import get_logger
 from template_langgraph.tools.common import get_default_tools, is_async_call_required
 
@@ -13,56 +25,143 @@ logger = get_logger(__name__)
 
 
 class BasicToolNode:
-    """A node that runs the tools requested in the last AIMessage."""
+    """A node that runs the tools requested in the last AIMessage.
 
-    def __init__(self, tools: list) -> None:
+    Independent tool calls from one AIMessage run concurrently: coroutines are
+    gathered on the async path and sync tools are fanned out to a bounded thread
+    pool. ToolMessages are returned in the order of the original tool calls.
+    """
+
+    def __init__(
+        self,
+        tools: list,
+        max_concurrency: int = 8,
+        tool_timeout_seconds: float | None = 300.0,
+    ) -> None:
         self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max(1, max_concurrency)
+        self.tool_timeout_seconds = tool_timeout_seconds
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="tool",
+        )
 
     def __call__(self, inputs: dict):
-        if messages := inputs.get("messages", []):
-            message = messages[-1]
-        else:
-            raise ValueError("No message found in input")
+        message = self._get_last_message(inputs)
+        tool_calls = message.tool_calls
+        if not tool_calls:
+            return {"messages": []}
+
+        # Timeouts are measured from submission; a timed out call keeps its worker until it returns
+        deadline = None if self.tool_timeout_seconds is None else time.monotonic() + self.tool_timeout_seconds
+        futures = [
+            self._executor.submit(contextvars.copy_context().run, self._invoke_tool, tool_call)
+            for tool_call in tool_calls
+        ]
         outputs = []
-        for tool_call in message.tool_calls:
+        for tool_call, future in zip(tool_calls, futures):
             try:
-                if is_async_call_required(tool_call["name"]):
-                    observation = asyncio.run(self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"]))
-                else:
-                    observation = self.tools_by_name[tool_call["name"]].invoke(tool_call["args"])
-                outputs.append(
-                    ToolMessage(
-                        content=json.dumps(observation.__str__(), ensure_ascii=False),
-                        name=tool_call["name"],
-                        tool_call_id=tool_call["id"],
-                    )
-                )
-            except Exception as e:
-                logger.error(f"Error occurred while invoking tools: {e}")
                 outputs.append(
-                    ToolMessage(
-                        content=json.dumps({"error": str(e)}, ensure_ascii=False),
-                        name=tool_call["name"],
-                        tool_call_id=tool_call["id"],
-                    )
+                    future.result(timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
                 )
+            except TimeoutError:
+                future.cancel()
+                outputs.append(self._to_timeout_message(tool_call))
         return {"messages": outputs}
 
+    async def acall(self, inputs: dict):
+        """Async variant used by ainvoke/astream; gathers the tools' coroutines."""
+        message = self._get_last_message(inputs)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(tool_call: dict) -> ToolMessage:
+            async with semaphore:
+                try:
+                    observation = await asyncio.wait_for(
+                        self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"]),
+                        timeout=self.tool_timeout_seconds,
+                    )
+                    return self._to_tool_message(tool_call, observation)
+                except TimeoutError:
+                    return self._to_timeout_message(tool_call)
+                except Exception as e:
+                    logger.error(f"Error occurred while invoking tools: {e}")
+                    return self._to_error_message(tool_call, e)
+
+        outputs = await asyncio.gather(*(run(tool_call) for tool_call in message.tool_calls))
+        return {"messages": list(outputs)}
+
+    def _invoke_tool(self, tool_call: dict) -> ToolMessage:
+        try:
+            if is_async_call_required(tool_call["name"]):
+                observation = asyncio.run(self.tools_by_name[tool_call["name"]].ainvoke(tool_call["args"]))
+            else:
+                observation = self.tools_by_name[tool_call["name"]].invoke(tool_call["args"])
+            return self._to_tool_message(tool_call, observation)
+        except Exception as e:
+            logger.error(f"Error occurred while invoking tools: {e}")
+            return self._to_error_message(tool_call, e)
+
+    def as_runnable(self) -> RunnableLambda:
+        """Wrap the node so LangGraph uses __call__ for sync runs and acall for async runs."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name="tools")
+
+    @staticmethod
+    def _get_last_message(inputs: dict):
+        if messages := inputs.get("messages", []):
+            return messages[-1]
+        raise ValueError("No message found in input")
+
+    @staticmethod
+    def _to_tool_message(tool_call: dict, observation) -> ToolMessage:
+        return ToolMessage(
+            content=json.dumps(observation.__str__(), ensure_ascii=False),
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
+
+    @staticmethod
+    def _to_error_message(tool_call: dict, error: Exception) -> ToolMessage:
+        return ToolMessage(
+            content=json.dumps({"error": str(error)}, ensure_ascii=False),
+            name=tool_call["name"],
+            tool_call_id=tool_call["id"],
+        )
+
+    def _to_timeout_message(self, tool_call: dict) -> ToolMessage:
+        logger.error(f"Tool {tool_call['name']} timed out after {self.tool_timeout_seconds} seconds")
+        return self._to_error_message(
+            tool_call,
+            TimeoutError(f"Tool call timed out after {self.tool_timeout_seconds} seconds"),
+        )
+
 
 class ChatWithToolsAgent:
     def __init__(
         self,
-        tools=get_default_tools(),
+        tools=None,
         checkpointer=None,
         store=None,
         system_prompt: str | None = None,
+        max_tool_concurrency: int = 8,
+        tool_timeout_seconds: float | None = 300.0,
+        semantic_cache: SemanticResponseCache | None = None,
     ):
         self.llm = AzureOpenAiWrapper().chat_model
-        self.tools = tools
+        self.tools = tools if tools is not None else get_default_tools()
         self.checkpointer = checkpointer
         self.store = store
+        self.max_tool_concurrency = max_tool_concurrency
+        self.tool_timeout_seconds = tool_timeout_seconds
         self.system_prompt = system_prompt
-        self._system_message = SystemMessage(content=system_prompt) if system_prompt else None
+        # Opt-in: pass a cache or set SEMANTIC_CACHE_ENABLED
+        if semantic_cache is None and get_semantic_cache_settings().semantic_cache_enabled:
+            semantic_cache = get_semantic_response_cache()
+        self.semantic_cache = semantic_cache
+        self._semantic_cache_namespace = make_namespace(
+            system_prompt,
+            getattr(self.llm, "deployment_name", None),
+        )
 
     def create_graph(self):
         """Create the main graph for the agent."""
@@ -75,11 +174,25 @@ class ChatWithToolsAgent:
             "tools",
             BasicToolNode(
                 tools=self.tools,
-            ),
+                max_concurrency=self.max_tool_concurrency,
+                tool_timeout_seconds=self.tool_timeout_seconds,
+            ).as_runnable(),
         )
 
         # Create edges
-        workflow.set_entry_point("chat_with_tools")
+        if self.semantic_cache is not None:
+            workflow.add_node("semantic_cache", self.lookup_semantic_cache)
+            workflow.set_entry_point("semantic_cache")
+            workflow.add_conditional_edges(
+                source="semantic_cache",
+                path=self.route_semantic_cache,
+                path_map={
+                    "chat_with_tools": "chat_with_tools",
+                    END: END,
+                },
+            )
+        else:
+            workflow.set_entry_point("chat_with_tools")
         workflow.add_conditional_edges(
             source="chat_with_tools",
             path=self.route_tools,
@@ -100,16 +213,47 @@ class ChatWithToolsAgent:
     def chat_with_tools(self, state: AgentState) -> AgentState:
         """Chat with tools using the state."""
         logger.info(f"Chatting with tools using state: {state}")
-        llm_with_tools = self.llm.bind_tools(
-            tools=self.tools,
-        )
-        messages = self._prepare_messages(state)
+        prefix = self._get_prompt_prefix()
+        response = prefix.bound_model.invoke(self._prepare_messages(state, prefix))
+        if usage := record_prompt_cache_usage(response, prefix):
+            response.response_metadata["prompt_cache"] = usage
+        if self.semantic_cache is not None and not response.tool_calls:
+            if question := self._get_cacheable_question(state):
+                self.semantic_cache.store(self._semantic_cache_namespace, question, response.text)
+        return {
+            "messages": [
+                response,
+            ]
+        }
+
+    def lookup_semantic_cache(self, state: AgentState, config: RunnableConfig) -> AgentState:
+        """Answer from the semantic cache when a similar question was answered before.
+
+        Set ``semantic_cache_bypass`` in the configurable config to skip the lookup;
+        the fresh answer still replaces the cached one.
+        """
+        question = self._get_cacheable_question(state)
+        if question is None or config.get("configurable", {}).get("semantic_cache_bypass"):
+            return {"messages": []}
+        hit = self.semantic_cache.lookup(self._semantic_cache_namespace, question)
+        if hit is None:
+            return {"messages": []}
         return {
             "messages": [
-                llm_with_tools.invoke(messages),
+                AIMessage(
+                    content=hit.answer,
+                    response_metadata={"semantic_cache": {"question": hit.question, "similarity": hit.similarity}},
+                ),
             ]
         }
 
+    def route_semantic_cache(self, state: AgentState):
+        """End the run if the cache answered, otherwise call the LLM."""
+        messages = state.get("messages", [])
+        if messages and isinstance(messages[-1], AIMessage):
+            return END
+        return "chat_with_tools"
+
     def route_tools(
         self,
         state: AgentState,
@@ -128,15 +272,34 @@ class ChatWithToolsAgent:
             return "tools"
         return END
 
-    def _prepare_messages(self, state: AgentState):
-        """Return a message list with the optional system prompt prefixed."""
+    @staticmethod
+    def _get_cacheable_question(state: AgentState) -> str | None:
+        """Return the question of a single-turn conversation; later turns depend on the history."""
+        messages = list(state) if isinstance(state, list) else list(state.get("messages", []))
+        questions = [message for message in messages if isinstance(message, HumanMessage)]
+        if len(questions) != 1 or not isinstance(questions[0].content, str):
+            return None
+        return questions[0].content
+
+    def _get_prompt_prefix(self) -> PromptPrefix:
+        """Return the system message and the model bound to the tools, built once per signature."""
+        return get_prompt_prefix_cache().get(self.llm, self.tools, self.system_prompt)
+
+    @staticmethod
+    def _prepare_messages(state: AgentState, prefix: PromptPrefix):
+        """Return the history behind the stable prompt prefix (system prompt, then tools)."""
         base_messages = list(state) if isinstance(state, list) else list(state.get("messages", []))
-        if not self._system_message:
-            return base_messages
-        if base_messages and isinstance(base_messages[0], SystemMessage):
-            if base_messages[0].content == self._system_message.content:
-                return base_messages
-        return [self._system_message, *base_messages]
+        return prefix.layout(base_messages)
+
+
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return ChatWithToolsAgent().create_graph()
 
 
-graph = ChatWithToolsAgent().create_graph()
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,10 @@
+from functools import lru_cache
 from typing import Literal
 
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.types import Command
 
-from template_langgraph.agents.demo_agents.weather_agent import graph
+from template_langgraph.agents.demo_agents.weather_agent import get_graph as get_weather_agent_graph
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
 from template_langgraph.loggers import get_logger
 
@@ -15,12 +16,17 @@ def transfer_to_weather_agent():
 
 
 tools = [transfer_to_weather_agent]
-llm = AzureOpenAiWrapper().chat_model.bind_tools(tools=tools)
+
+
+@lru_cache
+def get_llm():
+    """Bind the tools to the chat model on first use."""
+    return AzureOpenAiWrapper().chat_model.bind_tools(tools=tools)
 
 
 def call_model(state: MessagesState) -> Command[Literal["weather_agent", END]]:
     messages = state["messages"]
-    response = llm.invoke(messages)
+    response = get_llm().invoke(messages)
     if len(response.tool_calls) > 0:
         return Command(
             goto="weather_agent",
@@ -34,9 +40,19 @@ def call_model(state: MessagesState) -> Command[Literal["weather_agent", END]]:
         )
 
 
-workflow = StateGraph(MessagesState)
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    workflow = StateGraph(MessagesState)
+
+    workflow.add_node("agent", call_model)
+    workflow.add_node("weather_agent", get_weather_agent_graph())
+    workflow.add_edge(START, "agent")
+    return workflow.compile()
+
 
-workflow.add_node("agent", call_model)
-workflow.add_node("weather_agent", graph)
-workflow.add_edge(START, "agent")
-graph = workflow.compile()
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.tools.base import BaseTool
 from langgraph.graph import StateGraph
@@ -39,7 +41,7 @@ class ParallelRagAgent:
             output_schema=ParallelRagAgentOutputState,
         )
         workflow.add_node("decompose_tasks", self.decompose_tasks)
-        workflow.add_node("run_task", self.run_task)
+        workflow.add_node("run_task", self.run_task.as_runnable())
         workflow.add_node("summarize_results", self.summarize_results)
 
         workflow.add_edge("run_task", "summarize_results")
@@ -48,7 +50,17 @@ class ParallelRagAgent:
         return workflow.compile()
 
 
-graph = ParallelRagAgent(
-    llm=AzureOpenAiWrapper().chat_model,
-    tools=get_default_tools(),
-).create_graph()
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return ParallelRagAgent(
+        llm=AzureOpenAiWrapper().chat_model,
+        tools=get_default_tools(),
+    ).create_graph()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
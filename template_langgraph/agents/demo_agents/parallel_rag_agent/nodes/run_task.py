@@ -2,6 +2,7 @@ import json
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableLambda
 from langchain_core.tools.base import BaseTool
 
 from template_langgraph.agents.demo_agents.parallel_rag_agent.models import (
@@ -36,14 +37,43 @@ class RunTask:
             observation = {"error": str(e)}
 
         result = self.llm.invoke(
-            input=[
-                HumanMessage(content=query),
-                HumanMessage(
-                    content=json.dumps(observation.__str__(), ensure_ascii=False),
-                ),
-            ],
+            input=self._build_messages(query, observation),
         )
+        return self._to_update(task, result)
 
+    async def acall(self, state: dict) -> dict:
+        """Async variant used by ainvoke/astream; awaits the tool and the LLM."""
+        logger.info(f"Running state... {state}")
+        task: Task = state.get("task", None)
+        query: str = state.get("query", None)
+        logger.info(f"Task: {task.model_dump_json(indent=2)}")
+
+        try:
+            observation = await self.tools_by_name[task.tool_name].ainvoke(task.tool_args)
+        except Exception as e:
+            logger.error(f"Error occurred while invoking tools: {e}")
+            observation = {"error": str(e)}
+
+        result = await self.llm.ainvoke(
+            input=self._build_messages(query, observation),
+        )
+        return self._to_update(task, result)
+
+    def as_runnable(self) -> RunnableLambda:
+        """Wrap the node so LangGraph uses __call__ for sync runs and acall for async runs."""
+        return RunnableLambda(self.__call__, afunc=self.acall, name="run_task")
+
+    @staticmethod
+    def _build_messages(query: str, observation) -> list[HumanMessage]:
+        return [
+            HumanMessage(content=query),
+            HumanMessage(
+                content=json.dumps(observation.__str__(), ensure_ascii=False),
+            ),
+        ]
+
+    @staticmethod
+    def _to_update(task: Task, result) -> dict:
         logger.info(f"LLM response: {result.model_dump_json(indent=2)}, type: {type(result)}")
 
         result = TaskResult(
@@ -1,5 +1,5 @@
 # ruff: noqa: E501
-from deepagents import create_deep_agent
+from functools import lru_cache
 
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
 from template_langgraph.tools.common import get_default_tools
@@ -135,10 +135,23 @@ You have access to a few tools.
 Use this to run an Azure AI Search for getting KABUTO related information. You can specify the number of results, the topic, and whether raw content should be included.
 """
 
-# Create the agent
-graph = create_deep_agent(
-    model=AzureOpenAiWrapper().chat_model,
-    tools=get_default_tools(),
-    instructions=research_instructions,
-    subagents=[critique_sub_agent, research_sub_agent],
-).with_config({"recursion_limit": 1000})
+
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    # deepagents is only needed to build this graph, so it is imported here
+    from deepagents import create_deep_agent
+
+    return create_deep_agent(
+        model=AzureOpenAiWrapper().chat_model,
+        tools=get_default_tools(),
+        instructions=research_instructions,
+        subagents=[critique_sub_agent, research_sub_agent],
+    ).with_config({"recursion_limit": 1000})
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
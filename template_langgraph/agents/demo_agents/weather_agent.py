@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Literal
 
 from langchain_core.tools import tool
@@ -18,12 +19,17 @@ def search(query: str) -> str:
 
 tools = [search]
 tool_node = ToolNode(tools=tools)
-llm = AzureOpenAiWrapper().chat_model.bind_tools(tools=tools)
+
+
+@lru_cache
+def get_llm():
+    """Bind the tools to the chat model on first use."""
+    return AzureOpenAiWrapper().chat_model.bind_tools(tools=tools)
 
 
 def call_model(state: MessagesState) -> Command[Literal["tools", END]]:
     messages = state["messages"]
-    response = llm.invoke(messages)
+    response = get_llm().invoke(messages)
     if len(response.tool_calls) > 0:
         next_node = "tools"
     else:
@@ -36,10 +42,20 @@ def call_model(state: MessagesState) -> Command[Literal["tools", END]]:
     )
 
 
-workflow = StateGraph(MessagesState)
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    workflow = StateGraph(MessagesState)
+
+    workflow.add_node("agent", call_model)
+    workflow.add_node("tools", tool_node)
+    workflow.add_edge(START, "agent")
+    workflow.add_edge("tools", "agent")
+    return workflow.compile()
+
 
-workflow.add_node("agent", call_model)
-workflow.add_node("tools", tool_node)
-workflow.add_edge(START, "agent")
-workflow.add_edge("tools", "agent")
-graph = workflow.compile()
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 import os
 from base64 import b64encode
+from functools import lru_cache
 
 import httpx
 from langgraph.graph import StateGraph
@@ -35,10 +36,16 @@ class MockNotifier:
 class ImageClassifierAgent:
     def __init__(
         self,
-        llm=AzureOpenAiWrapper().chat_model,
-        notifier=MockNotifier(),
-        classifier: BaseClassifier = MockClassifier(),
+        llm=None,
+        notifier=None,
+        classifier: BaseClassifier = None,
     ):
+        if llm is None:
+            llm = AzureOpenAiWrapper().chat_model
+        if notifier is None:
+            notifier = MockNotifier()
+        if classifier is None:
+            classifier = MockClassifier()
         self.llm = llm
         self.notifier = notifier
         self.classifier: BaseClassifier = classifier
@@ -131,8 +138,19 @@ class ImageClassifierAgent:
 # For testing
 # graph = ImageClassifierAgent().create_graph()
 
-graph = ImageClassifierAgent(
-    llm=AzureOpenAiWrapper().chat_model,
-    notifier=MockNotifier(),
-    classifier=LlmClassifier(),
-).create_graph()
+
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return ImageClassifierAgent(
+        llm=AzureOpenAiWrapper().chat_model,
+        notifier=MockNotifier(),
+        classifier=LlmClassifier(),
+    ).create_graph()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
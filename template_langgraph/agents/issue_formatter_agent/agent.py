@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langgraph.graph import StateGraph
 
 from template_langgraph.agents.issue_formatter_agent.models import AgentState, Issue
@@ -38,4 +40,14 @@ class IssueFormatterAgent:
         return state
 
 
-graph = IssueFormatterAgent().create_graph()
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return IssueFormatterAgent().create_graph()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langgraph.prebuilt import create_react_agent
 
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
@@ -8,13 +10,23 @@ logger = get_logger(__name__)
 
 
 class KabutoHelpdeskAgent:
-    def __init__(self, tools=get_default_tools()):
+    def __init__(self, tools=None):
         self.agent = create_react_agent(
             model=AzureOpenAiWrapper().chat_model,
-            tools=tools,
+            tools=tools if tools is not None else get_default_tools(),
             prompt="KABUTO に関する質問に答えるために、必要な情報を収集し適切な回答を提供します",
             debug=True,
         )
 
 
-graph = KabutoHelpdeskAgent().agent
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return KabutoHelpdeskAgent().agent
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
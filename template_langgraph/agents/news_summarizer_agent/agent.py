@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import httpx
 from langgraph.graph import StateGraph
 from langgraph.types import Send
@@ -20,11 +22,19 @@ logger = get_logger(__name__)
 class NewsSummarizerAgent:
     def __init__(
         self,
-        llm=AzureOpenAiWrapper().chat_model,
-        notifier=get_notifier(),
-        scraper=get_scraper(),
-        summarizer=get_summarizer(),
+        llm=None,
+        notifier=None,
+        scraper=None,
+        summarizer=None,
     ):
+        if llm is None:
+            llm = AzureOpenAiWrapper().chat_model
+        if notifier is None:
+            notifier = get_notifier()
+        if scraper is None:
+            scraper = get_scraper()
+        if summarizer is None:
+            summarizer = get_summarizer()
         self.llm = llm
         self.notifier = notifier
         self.scraper = scraper
@@ -126,8 +136,18 @@ class NewsSummarizerAgent:
         return state
 
 
-graph = NewsSummarizerAgent(
-    notifier=get_notifier(),
-    scraper=get_scraper(),
-    summarizer=get_summarizer(),
-).create_graph()
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return NewsSummarizerAgent(
+        notifier=get_notifier(),
+        scraper=get_scraper(),
+        summarizer=get_summarizer(),
+    ).create_graph()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
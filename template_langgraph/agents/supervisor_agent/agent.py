@@ -1,8 +1,10 @@
+from functools import lru_cache
+
 from langgraph_supervisor import create_supervisor
 
-from template_langgraph.agents.chat_with_tools_agent.agent import graph as chat_with_tools_agent_graph
-from template_langgraph.agents.issue_formatter_agent.agent import graph as issue_formatter_agent_graph
-from template_langgraph.agents.task_decomposer_agent.agent import graph as task_decomposer_agent_graph
+from template_langgraph.agents.chat_with_tools_agent.agent import get_graph as get_chat_with_tools_agent_graph
+from template_langgraph.agents.issue_formatter_agent.agent import get_graph as get_issue_formatter_agent_graph
+from template_langgraph.agents.task_decomposer_agent.agent import get_graph as get_task_decomposer_agent_graph
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
 from template_langgraph.loggers import get_logger
 
@@ -22,9 +24,9 @@ class SupervisorAgent:
     def __init__(self):
         self.agent = create_supervisor(
             agents=[
-                chat_with_tools_agent_graph,
-                issue_formatter_agent_graph,
-                task_decomposer_agent_graph,
+                get_chat_with_tools_agent_graph(),
+                get_issue_formatter_agent_graph(),
+                get_task_decomposer_agent_graph(),
             ],
             model=AzureOpenAiWrapper().chat_model,
             prompt=PROMPT,
@@ -33,4 +35,14 @@ class SupervisorAgent:
         )
 
 
-graph = SupervisorAgent().agent.compile()
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return SupervisorAgent().agent.compile()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
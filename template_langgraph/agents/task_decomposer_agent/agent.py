@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from langgraph.graph import END, StateGraph
 from langgraph.types import interrupt
 
@@ -75,4 +77,14 @@ class TaskDecomposerAgent:
         return "loopback"
 
 
-graph = TaskDecomposerAgent().create_graph()
+@lru_cache
+def get_graph():
+    """Build the agent graph on first use and reuse it afterwards."""
+    return TaskDecomposerAgent().create_graph()
+
+
+def __getattr__(name: str):
+    # Compile the graph on first access to `graph` instead of at import time
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,14 +1,36 @@
+import csv
 import os
+from collections.abc import Iterator
+from fnmatch import fnmatch
 from functools import lru_cache
 from glob import glob
+from itertools import islice
+from typing import Any, Literal
 
-from langchain_community.document_loaders.csv_loader import CSVLoader
 from langchain_core.documents import Document
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+ColumnType = Literal["str", "int", "float", "bool"]
+
+
+class CsvSource(BaseModel):
+    """How to read the CSV files whose name matches ``pattern``."""
+
+    pattern: str = "*.csv"
+    # Columns rendered into page_content; empty means every column not used as metadata
+    content_columns: list[str] = []
+    # Columns copied into metadata, converted to the given type
+    metadata_columns: dict[str, ColumnType] = {}
+    encoding: str = "utf-8"
+    delimiter: str = ","
+
 
 class Settings(BaseSettings):
     csv_loader_data_dir_path: str = "./data"
+    csv_loader_batch_size: int = 1000
+    # First matching source wins, files matching none use CsvSource() defaults
+    csv_loader_sources: list[CsvSource] = []
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -23,6 +45,34 @@ def get_csv_loader_settings() -> Settings:
     return Settings()
 
 
+def convert_value(value: str | None, column_type: ColumnType) -> Any:
+    """Convert a raw CSV cell to the configured metadata type."""
+    if column_type == "str":
+        return value
+    if value is None or value.strip() == "":
+        return None
+    if column_type == "int":
+        return int(value)
+    if column_type == "float":
+        return float(value)
+    return value.strip().lower() in ("1", "true", "yes")
+
+
+def format_row(row: dict, columns: list[str] | None) -> str:
+    """Render a row as ``column: value`` lines, the same layout as langchain's CSVLoader."""
+    lines = []
+    for key, value in row.items():
+        if columns is not None and key not in columns:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, list):
+            # Extra cells of a row longer than the header
+            value = ",".join(v.strip() for v in value)
+        lines.append(f"{key.strip() if key is not None else key}: {value}")
+    return "\n".join(lines)
+
+
 class CsvLoaderWrapper:
     def __init__(
         self,
@@ -32,16 +82,54 @@ class CsvLoaderWrapper:
             settings = get_csv_loader_settings()
         self.settings = settings
 
+    def list_csv_paths(self) -> list[str]:
+        """List the CSV files under the data directory."""
+        return sorted(
+            glob(
+                os.path.join(self.settings.csv_loader_data_dir_path, "**", "*.csv"),
+                recursive=True,
+            )
+        )
+
+    def get_source(self, path: str) -> CsvSource:
+        """Return the source configuration for a CSV file."""
+        for source in self.settings.csv_loader_sources:
+            if fnmatch(os.path.basename(path), source.pattern):
+                return source
+        return CsvSource()
+
     def load_csv_docs(self) -> list[Document]:
         """Load CSV documents from the specified directory."""
-        csv_path = glob(
-            os.path.join(self.settings.csv_loader_data_dir_path, "**", "*.csv"),
-            recursive=True,
-        )
-        docs = []
+        return list(self.lazy_load_csv_docs())
+
+    def lazy_load_csv_docs(self, paths: list[str] | None = None) -> Iterator[Document]:
+        """Yield CSV documents from the given files, or from every file under the data directory."""
+        if paths is None:
+            paths = self.list_csv_paths()
+        for path in paths:
+            for batch in self.iter_csv_batches(path):
+                yield from batch
+
+    def iter_csv_batches(self, path: str) -> Iterator[list[Document]]:
+        """Read a CSV file in batches of ``csv_loader_batch_size`` rows.
 
-        for path in csv_path:
-            loader = CSVLoader(file_path=path)
-            docs.extend(loader.load())
+        Only one batch is held at a time, so memory does not grow with the file size.
+        """
+        source = self.get_source(path)
+        with open(path, newline="", encoding=source.encoding) as f:
+            reader = csv.DictReader(f, delimiter=source.delimiter)
+            content_columns = source.content_columns or None
+            if content_columns is None and source.metadata_columns:
+                content_columns = [name for name in reader.fieldnames or [] if name not in source.metadata_columns]
+            rows = enumerate(reader)
+            while batch := list(islice(rows, self.settings.csv_loader_batch_size)):
+                yield [self._to_document(path, source, content_columns, i, row) for i, row in batch]
 
-        return docs
+    @staticmethod
+    def _to_document(path: str, source: CsvSource, content_columns: list[str] | None, i: int, row: dict) -> Document:
+        metadata = {"source": path, "row": i}
+        for column, column_type in source.metadata_columns.items():
+            if column not in row:
+                raise ValueError(f"Metadata column '{column}' not found in CSV file {path}")
+            metadata[column] = convert_value(row[column], column_type)
+        return Document(page_content=format_row(row, content_columns), metadata=metadata)
@@ -0,0 +1,140 @@
+"""Batched, concurrent embedding pipeline for document ingestion."""
+
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+from typing import Any
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class Settings(BaseSettings):
+    embedding_pipeline_batch_size: int = 64
+    embedding_pipeline_max_concurrency: int = 4
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_embedding_pipeline_settings() -> Settings:
+    """Get embedding pipeline settings."""
+    return Settings()
+
+
+@dataclass
+class EmbeddedBatch:
+    offset: int
+    texts: list[str]
+    vectors: list[list[float]]
+    # The inputs the texts were taken from, e.g. documents with their metadata
+    items: list[Any] = field(default_factory=list)
+
+
+@dataclass
+class IngestionProgress:
+    total: int | None = None
+    start_offset: int = 0
+    done: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def next_offset(self) -> int:
+        """Offset to pass as ``start_offset`` to resume after the last completed batch."""
+        return self.start_offset + self.done
+
+    @property
+    def rate(self) -> float:
+        """Items per second since the pipeline started."""
+        elapsed = time.monotonic() - self.started_at
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self) -> str:
+        total = f"/{self.total}" if self.total is not None else ""
+        return f"{self.next_offset}{total} items ({self.rate:.1f} items/s)"
+
+
+class EmbeddingPipeline:
+    """Embed texts in batches with a bounded number of batches in flight.
+
+    Batches are handed to the sink in input order, so every item before
+    ``progress.next_offset`` has been written once a batch has been sunk. A failed
+    run can therefore be resumed by passing that offset as ``start_offset``.
+    """
+
+    def __init__(
+        self,
+        embed_documents: Callable[[list[str]], list[list[float]]],
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_embedding_pipeline_settings()
+        self.embed_documents = embed_documents
+        self.batch_size = settings.embedding_pipeline_batch_size
+        self.max_concurrency = settings.embedding_pipeline_max_concurrency
+
+    def run(
+        self,
+        texts: Iterable[Any],
+        sink: Callable[[EmbeddedBatch], None],
+        start_offset: int = 0,
+        total: int | None = None,
+        to_text: Callable[[Any], str] | None = None,
+    ) -> IngestionProgress:
+        """Embed every text from ``start_offset`` on and pass each batch to ``sink``.
+
+        With ``to_text``, ``texts`` may be any items, such as a generator of documents;
+        each batch then carries its items next to the texts embedded from them.
+        """
+        progress = IngestionProgress(total=total, start_offset=start_offset)
+        try:
+            for batch in self.iter_batches(texts, start_offset=start_offset, to_text=to_text):
+                sink(batch)
+                progress.done += len(batch.texts)
+                logger.info(f"Ingested {progress}")
+        except Exception:
+            logger.error(f"Ingestion stopped, resume with start_offset={progress.next_offset}")
+            raise
+        return progress
+
+    def iter_batches(
+        self,
+        texts: Iterable[Any],
+        start_offset: int = 0,
+        to_text: Callable[[Any], str] | None = None,
+    ) -> Iterator[EmbeddedBatch]:
+        """Yield embedded batches in input order while later batches are being embedded.
+
+        Items are pulled from ``texts`` lazily, at most ``max_concurrency`` batches ahead.
+        """
+        iterator = islice(iter(texts), start_offset, None)
+        offset = start_offset
+        pending: deque[tuple[int, list[Any], list[str], Future]] = deque()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            try:
+                while True:
+                    while len(pending) < self.max_concurrency:
+                        items = list(islice(iterator, self.batch_size))
+                        if not items:
+                            break
+                        chunk = [to_text(item) for item in items] if to_text else items
+                        pending.append((offset, items, chunk, executor.submit(self.embed_documents, chunk)))
+                        offset += len(chunk)
+                    if not pending:
+                        return
+                    batch_offset, items, chunk, future = pending.popleft()
+                    yield EmbeddedBatch(offset=batch_offset, texts=chunk, vectors=future.result(), items=items)
+            finally:
+                for _, _, _, future in pending:
+                    future.cancel()
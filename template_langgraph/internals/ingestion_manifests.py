@@ -0,0 +1,200 @@
+"""Change-detecting manifest for incremental document ingestion.
+
+The manifest records, per ingestion target (e.g. a Qdrant collection), the path,
+mtime, size and content hash of every source file plus the ids of the chunks it
+produced. On the next run, files whose mtime and size are unchanged are skipped
+without being read, files whose content hash is unchanged are skipped without
+being parsed, and only chunks that did not exist before are emitted. Chunks that
+disappeared, including those of deleted files, are reported so that the caller can
+delete them from the index.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+
+from langchain_core.documents import Document
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class Settings(BaseSettings):
+    ingestion_manifest_dir_path: str = "./.ingestion"
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_ingestion_manifest_settings() -> Settings:
+    """Get ingestion manifest settings."""
+    return Settings()
+
+
+def hash_file(path: str) -> str:
+    """Return the sha256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_chunk_id(source: str, content: str) -> str:
+    """Return a stable id for a chunk, derived from its source and content."""
+    return hashlib.sha256(f"{source}\0{content}".encode()).hexdigest()
+
+
+@dataclass
+class FileEntry:
+    mtime: float
+    size: int
+    sha256: str
+    chunk_ids: list[str] = field(default_factory=list)
+
+
+class IngestionPlan:
+    """Files to (re)load for one run, and the chunk changes they produce."""
+
+    def __init__(
+        self,
+        entries: dict[str, FileEntry],
+        previous: dict[str, FileEntry],
+        changed_paths: list[str],
+        deleted_paths: list[str],
+        full: bool = False,
+    ):
+        self.entries = entries
+        self.previous = previous
+        self.changed_paths = changed_paths
+        self.deleted_paths = deleted_paths
+        self.full = full
+        self.added_ids: list[str] = []
+        self._deleted_ids = [chunk_id for path in deleted_paths for chunk_id in previous[path].chunk_ids]
+        self._consumed = not changed_paths
+
+    @property
+    def unchanged_paths(self) -> list[str]:
+        return [path for path in self.entries if path not in self.changed_paths]
+
+    @property
+    def deleted_ids(self) -> list[str]:
+        """Ids of chunks that no longer exist. Complete once ``iter_documents`` is exhausted."""
+        if not self._consumed:
+            raise RuntimeError("iter_documents() must be consumed before reading deleted_ids")
+        return self._deleted_ids
+
+    def iter_documents(self, load_files: Callable[[list[str]], Iterable[Document]]) -> Iterator[Document]:
+        """Load the changed files and yield only their new chunks, with ``metadata["chunk_id"]`` set.
+
+        Every changed file goes to ``load_files`` in one call, so loaders can parse them
+        in parallel. Loaders must set ``metadata["source"]`` to the path they were given;
+        other spellings of the same file are resolved to the planned path, which keys
+        the chunks.
+        """
+        # dicts keep insertion order, so the recorded chunk ids follow the document order
+        chunk_ids: dict[str, dict[str, None]] = {path: {} for path in self.changed_paths}
+        planned_paths = {os.path.realpath(path): path for path in self.changed_paths}
+        previous_ids = {
+            path: set(self.previous[path].chunk_ids) for path in self.changed_paths if path in self.previous
+        }
+        if self.changed_paths:
+            for doc in load_files(self.changed_paths):
+                source = doc.metadata.get("source", "")
+                path = source if source in chunk_ids else planned_paths.get(os.path.realpath(source))
+                if path is None:
+                    raise ValueError(f"Loaded chunk has source {source!r}, which is not one of the planned paths")
+                chunk_id = make_chunk_id(path, doc.page_content)
+                doc.metadata["chunk_id"] = chunk_id
+                ids = chunk_ids[path]
+                if chunk_id in ids:
+                    continue
+                ids[chunk_id] = None
+                if self.full or chunk_id not in previous_ids.get(path, ()):
+                    self.added_ids.append(chunk_id)
+                    yield doc
+        for path in self.changed_paths:
+            self.entries[path].chunk_ids = list(chunk_ids[path])
+            if path in self.previous:
+                self._deleted_ids.extend(
+                    chunk_id for chunk_id in self.previous[path].chunk_ids if chunk_id not in chunk_ids[path]
+                )
+        self._consumed = True
+
+
+class IngestionManifest:
+    """Per-target record of ingested files, stored as JSON under the manifest directory."""
+
+    def __init__(
+        self,
+        target: str,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_ingestion_manifest_settings()
+        self.target = target
+        file_name = re.sub(r"[^A-Za-z0-9_.-]", "_", target) + ".json"
+        self.path = os.path.join(settings.ingestion_manifest_dir_path, file_name)
+        self.files: dict[str, FileEntry] = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.files = {path: FileEntry(**entry) for path, entry in json.load(f)["files"].items()}
+
+    def plan(self, paths: list[str], full: bool = False) -> IngestionPlan:
+        """Compare the given source files with the manifest.
+
+        Args:
+            paths: Source files that make up the corpus now.
+            full: Treat every file as changed and emit all of its chunks, e.g. to rebuild an index.
+        """
+        entries: dict[str, FileEntry] = {}
+        changed_paths = []
+        for path in paths:
+            stat = os.stat(path)
+            previous = self.files.get(path)
+            if not full and previous is not None and (previous.mtime, previous.size) == (stat.st_mtime, stat.st_size):
+                entries[path] = previous
+                continue
+            sha256 = hash_file(path)
+            if not full and previous is not None and previous.sha256 == sha256:
+                entries[path] = FileEntry(stat.st_mtime, stat.st_size, sha256, previous.chunk_ids)
+                continue
+            entries[path] = FileEntry(stat.st_mtime, stat.st_size, sha256)
+            changed_paths.append(path)
+        deleted_paths = [path for path in self.files if path not in entries]
+        plan = IngestionPlan(
+            entries=entries,
+            previous=self.files,
+            changed_paths=changed_paths,
+            deleted_paths=deleted_paths,
+            full=full,
+        )
+        logger.info(
+            f"{self.target}: {len(changed_paths)} changed, {len(plan.unchanged_paths)} unchanged, "
+            f"{len(deleted_paths)} deleted files"
+        )
+        return plan
+
+    def commit(self, plan: IngestionPlan) -> None:
+        """Record the plan's state once its changes have been applied to the index."""
+        self.files = plan.entries
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"target": self.target, "files": {path: asdict(entry) for path, entry in self.files.items()}},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
@@ -65,7 +65,9 @@ class MockNotifier(BaseNotifier):
 class SlackNotifier(BaseNotifier):
     """Slack notifier for sending notifications to a Slack channel."""
 
-    def __init__(self, settings=get_notifier_settings()):
+    def __init__(self, settings=None):
+        if settings is None:
+            settings = get_notifier_settings()
         self.webhook_url = settings.notifier_slack_webhook_url
 
     def notify(self, text: str):
@@ -1,6 +1,10 @@
 import os
-from functools import lru_cache
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache, partial
 from glob import glob
+from itertools import islice
 
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_core.documents import Document
@@ -10,6 +14,10 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     pdf_loader_data_dir_path: str = "./data"
+    pdf_loader_chunk_size: int = 300
+    pdf_loader_chunk_overlap: int = 20
+    # 0 uses one process per CPU, 1 loads in the calling process
+    pdf_loader_max_workers: int = 0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -24,6 +32,21 @@ def get_pdf_loader_settings() -> Settings:
     return Settings()
 
 
+def load_and_split_pdf(path: str, chunk_size: int, chunk_overlap: int) -> list[Document]:
+    """Parse a single pdf file and split it into chunks."""
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        is_separator_regex=False,
+    )
+    documents = PyPDFLoader(path).load_and_split(text_splitter)
+    # The ingestion manifest maps chunks back to the exact path it asked for
+    for document in documents:
+        document.metadata["source"] = path
+    return documents
+
+
 class PdfLoaderWrapper:
     def __init__(
         self,
@@ -35,21 +58,43 @@ class PdfLoaderWrapper:
 
     def load_pdf_docs(self) -> list[Document]:
         """Load pdf documents from the specified directory."""
-        pdf_path = glob(
-            os.path.join(self.settings.pdf_loader_data_dir_path, "**", "*.pdf"),
-            recursive=True,
+        return list(self.lazy_load_pdf_docs())
+
+    def list_pdf_paths(self) -> list[str]:
+        """List the pdf files under the data directory."""
+        return sorted(
+            glob(
+                os.path.join(self.settings.pdf_loader_data_dir_path, "**", "*.pdf"),
+                recursive=True,
+            )
         )
-        docs = []
 
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=300,
-            chunk_overlap=20,
-            length_function=len,
-            is_separator_regex=False,
+    def lazy_load_pdf_docs(self, paths: list[str] | None = None) -> Iterator[Document]:
+        """Yield pdf document chunks in path order, parsing files in a process pool."""
+        pdf_path = self.list_pdf_paths() if paths is None else list(paths)
+        load = partial(
+            load_and_split_pdf,
+            chunk_size=self.settings.pdf_loader_chunk_size,
+            chunk_overlap=self.settings.pdf_loader_chunk_overlap,
         )
-        for path in pdf_path:
-            loader = PyPDFLoader(path)
-            pages = loader.load_and_split(text_splitter)
-            docs.extend(pages)
+        max_workers = min(self.settings.pdf_loader_max_workers or os.cpu_count() or 1, len(pdf_path))
+        if max_workers <= 1:
+            for path in pdf_path:
+                yield from load(path)
+            return
 
-        return docs
+        # Keep a bounded window of files in flight so memory stays flat on large corpora
+        paths = iter(pdf_path)
+        pending: deque[Future] = deque()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                for path in islice(paths, max_workers * 2):
+                    pending.append(executor.submit(load, path))
+                while pending:
+                    docs = pending.popleft().result()
+                    for path in islice(paths, 1):
+                        pending.append(executor.submit(load, path))
+                    yield from docs
+            finally:
+                for future in pending:
+                    future.cancel()
@@ -65,7 +65,9 @@ class MockSummarizer(BaseSummarizer):
 class LlmSummarizer(BaseSummarizer):
     """LLM backed summarizer leveraging structured output."""
 
-    def __init__(self, llm: BaseChatModel | Any = AzureOpenAiWrapper().chat_model):
+    def __init__(self, llm: BaseChatModel | Any = None):
+        if llm is None:
+            llm = AzureOpenAiWrapper().chat_model
         self.llm = llm
 
     def summarize(self, prompt: str, content: str) -> StructuredArticle:  # noqa: D401
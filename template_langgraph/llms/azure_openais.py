@@ -1,12 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import hashlib
 import threading
+import time
+from collections.abc import Callable
 from functools import lru_cache
+from typing import TYPE_CHECKING, Any, NamedTuple
 
+import httpx
+from azure.core.credentials import AccessToken, TokenCredential
 from azure.identity import DefaultAzureCredential
-from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from template_langgraph.llms.embedding_caches import CachedEmbeddings, get_embedding_cache_settings
+from template_langgraph.llms.rate_limiters import get_rate_limit_settings, install_rate_limiting
 from template_langgraph.loggers import get_logger
 
+if TYPE_CHECKING:
+    # langchain_openai is imported when a model is first built
+    from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
+
+    from template_langgraph.llms.chat_routers import RoutingChatModel
+
 logger = get_logger(__name__)
 
 
@@ -18,6 +35,12 @@ class Settings(BaseSettings):
     azure_openai_model_chat: str = "gpt-4o"
     azure_openai_model_embedding: str = "text-embedding-3-small"
     azure_openai_model_reasoning: str = "o4-mini"
+    # Connection pool shared by every model client of an endpoint
+    azure_openai_http_max_connections: int = 100
+    azure_openai_http_max_keepalive_connections: int = 20
+    azure_openai_http_keepalive_expiry_seconds: float = 30.0
+    # Entra ID tokens are refreshed this long before they expire
+    azure_openai_token_refresh_margin_seconds: float = 300.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -31,10 +54,278 @@ def get_azure_openai_settings() -> Settings:
     return Settings()
 
 
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class EntraIdTokenProvider:
+    """Token provider that refreshes the Entra ID token before it expires.
+
+    Models call the provider on every request instead of holding a token string, so
+    they never send an expired token. A timer refreshes the token
+    ``refresh_margin_seconds`` before ``expires_on``. If a caller still finds the
+    token inside that margin, e.g. because the timed refresh failed, it gets the
+    current token while one background refresh runs. Only an expired or missing
+    token blocks, and then a single thread fetches while the others wait for it.
+
+    Refreshes are at least ``min_refresh_interval_seconds`` apart while the token is
+    still valid, and the interval doubles while the credential keeps returning a
+    token that is no fresher, e.g. a cached token with less than the margin left.
+    """
+
+    # Caps the backoff at 2**5 times the minimum interval
+    max_backoff_exponent = 5
+
+    def __init__(
+        self,
+        credential: TokenCredential,
+        scope: str = COGNITIVE_SERVICES_SCOPE,
+        refresh_margin_seconds: float = 300.0,
+        clock: Callable[[], float] = time.time,
+        min_refresh_interval_seconds: float = 30.0,
+    ):
+        self.credential = credential
+        self.scope = scope
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.clock = clock
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        self._token: AccessToken | None = None
+        # A valid token inside the margin is not refreshed again before this time
+        self._retry_at = 0.0
+        self._stale_refreshes = 0
+        # Held while fetching, so that concurrent refreshes do not stampede the credential
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._background: threading.Thread | None = None
+        self._timer: threading.Timer | None = None
+
+    def __call__(self) -> str:
+        return self.get_token()
+
+    def _is_fresh(self, token: AccessToken | None) -> bool:
+        return token is not None and self.clock() < token.expires_on - self.refresh_margin_seconds
+
+    def _is_due(self, token: AccessToken | None) -> bool:
+        if token is None or self.clock() >= token.expires_on:
+            return True
+        return not self._is_fresh(token) and self.clock() >= self._retry_at
+
+    def get_token(self) -> str:
+        """Return a valid token, fetching one only if the current token is missing or expired."""
+        token = self._token
+        if not self._is_due(token):
+            return token.token
+        if token is not None and self.clock() < token.expires_on:
+            self._refresh_in_background()
+            return token.token
+        return self._refresh().token
+
+    async def aget_token(self) -> str:
+        """Async variant for ``azure_ad_async_token_provider``; only a blocking fetch leaves the loop."""
+        token = self._token
+        if token is not None and self.clock() < token.expires_on:
+            return self.get_token()
+        return await asyncio.to_thread(self.get_token)
+
+    def _refresh(self) -> AccessToken:
+        with self._refresh_lock:
+            # Another thread may have refreshed while this one waited
+            previous = self._token
+            if not self._is_due(previous):
+                return previous
+            logger.info("Getting authentication token")
+            try:
+                token = self.credential.get_token(self.scope)
+            except Exception:
+                self._retry_at = self.clock() + self.min_refresh_interval_seconds
+                self._schedule(self.min_refresh_interval_seconds)
+                raise
+            self._token = token
+            if previous is not None and token.expires_on <= previous.expires_on:
+                self._stale_refreshes = min(self._stale_refreshes + 1, self.max_backoff_exponent)
+            else:
+                self._stale_refreshes = 0
+            min_delay = self.min_refresh_interval_seconds * 2**self._stale_refreshes
+            # A token already inside the margin would otherwise be refreshed again at once
+            delay = max(token.expires_on - self.refresh_margin_seconds - self.clock(), min_delay)
+            self._retry_at = self.clock() + delay
+        self._schedule(delay)
+        return token
+
+    def _refresh_quietly(self) -> None:
+        try:
+            self._refresh()
+        except Exception as e:
+            logger.warning(f"Failed to refresh authentication token: {e}")
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._background is not None and self._background.is_alive():
+                return
+            self._background = threading.Thread(
+                target=self._refresh_quietly,
+                name="entra-id-token-refresh",
+                daemon=True,
+            )
+            self._background.start()
+
+    def _schedule(self, delay: float) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self._refresh_quietly)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def close(self) -> None:
+        """Stop the scheduled refresh."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+class ModelKey(NamedTuple):
+    kind: str
+    deployment: str
+    endpoint: str
+    auth_mode: str
+    # Hash of the API key, so that clients for different keys are not shared
+    credential_id: str
+    api_version: str
+    options: tuple
+
+
+class ModelClientCache:
+    """Process-wide cache of model clients and the pooled HTTP clients they share.
+
+    Wrappers are built in every tool call, summarizer and agent constructor. Without
+    this cache each of them would build new model objects, each with its own HTTP
+    connection pool. Models are cached by ``ModelKey`` and every model of an endpoint
+    uses the same sync and async ``httpx`` client. Unless disabled, those clients
+    send their requests through the rate limiters of ``rate_limiters``.
+    """
+
+    def __init__(self):
+        self._models: dict[ModelKey, Any] = {}
+        self._http_clients: dict[tuple, httpx.Client] = {}
+        self._async_http_clients: dict[tuple, httpx.AsyncClient] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _pool_key(settings: Settings) -> tuple:
+        return (
+            settings.azure_openai_endpoint,
+            settings.azure_openai_http_max_connections,
+            settings.azure_openai_http_max_keepalive_connections,
+            settings.azure_openai_http_keepalive_expiry_seconds,
+        )
+
+    @staticmethod
+    def _limits(settings: Settings) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.azure_openai_http_max_connections,
+            max_keepalive_connections=settings.azure_openai_http_max_keepalive_connections,
+            keepalive_expiry=settings.azure_openai_http_keepalive_expiry_seconds,
+        )
+
+    def get_http_client(self, settings: Settings) -> httpx.Client:
+        """Return the pooled sync HTTP client for the endpoint."""
+        key = self._pool_key(settings)
+        with self._lock:
+            if key not in self._http_clients:
+                logger.info(f"Creating pooled HTTP client for {settings.azure_openai_endpoint}")
+                client = httpx.Client(limits=self._limits(settings))
+                if get_rate_limit_settings().llm_rate_limit_enabled:
+                    install_rate_limiting(client)
+                self._http_clients[key] = client
+            return self._http_clients[key]
+
+    def get_async_http_client(self, settings: Settings) -> httpx.AsyncClient:
+        """Return the pooled async HTTP client for the endpoint."""
+        key = self._pool_key(settings)
+        with self._lock:
+            if key not in self._async_http_clients:
+                client = httpx.AsyncClient(limits=self._limits(settings))
+                if get_rate_limit_settings().llm_rate_limit_enabled:
+                    install_rate_limiting(client)
+                self._async_http_clients[key] = client
+            return self._async_http_clients[key]
+
+    def get_or_create(self, key: ModelKey, factory: Callable[[], Any]) -> Any:
+        """Return the cached model for the key, building it on first use."""
+        with self._lock:
+            if key not in self._models:
+                logger.info(f"Creating {key.kind} model client for {key.deployment}")
+                self._models[key] = factory()
+            return self._models[key]
+
+    def stats(self) -> dict:
+        """Describe the live model clients and the utilization of each connection pool."""
+        with self._lock:
+            models = [
+                {
+                    "kind": key.kind,
+                    "deployment": key.deployment,
+                    "endpoint": key.endpoint,
+                    "auth_mode": key.auth_mode,
+                    "api_version": key.api_version,
+                    "options": dict(key.options),
+                }
+                for key in self._models
+            ]
+            clients = [(key, False, client) for key, client in self._http_clients.items()]
+            clients += [(key, True, client) for key, client in self._async_http_clients.items()]
+        http_clients = []
+        for (endpoint, max_connections, max_keepalive_connections, _), is_async, client in clients:
+            # httpx does not expose its pool, so read the transport's httpcore pool if present
+            transport = getattr(client, "_transport", None)
+            # Look through the rate limiting wrapper
+            transport = getattr(transport, "transport", transport)
+            pool = getattr(transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for connection in connections if connection.is_idle())
+            http_clients.append(
+                {
+                    "endpoint": endpoint,
+                    "async": is_async,
+                    "max_connections": max_connections,
+                    "max_keepalive_connections": max_keepalive_connections,
+                    "connections": len(connections),
+                    "active_connections": len(connections) - idle,
+                    "idle_connections": idle,
+                    "utilization": (len(connections) - idle) / max_connections if max_connections else 0.0,
+                }
+            )
+        return {"models": models, "http_clients": http_clients}
+
+    def clear(self) -> None:
+        """Drop every cached model and close the sync HTTP clients. Registered as an ``atexit`` hook."""
+        with self._lock:
+            http_clients = list(self._http_clients.values())
+            self._models.clear()
+            self._http_clients.clear()
+            # Async clients are tied to the loops that used them, so they are only dropped
+            self._async_http_clients.clear()
+        for client in http_clients:
+            client.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+
+@lru_cache
+def get_model_client_cache() -> ModelClientCache:
+    """Get the process-wide model client cache."""
+    cache = ModelClientCache()
+    atexit.register(cache.clear)
+    return cache
+
+
 class AzureOpenAiWrapper:
     # Class-level variables for singleton-like behavior
     _credentials: dict = {}
-    _tokens: dict = {}
+    _token_providers: dict[str, EntraIdTokenProvider] = {}
     _token_lock = threading.Lock()
 
     def __init__(self, settings: Settings = None):
@@ -42,20 +333,16 @@ class AzureOpenAiWrapper:
             settings = get_azure_openai_settings()
 
         self.settings = settings
-        self._chat_model: AzureChatOpenAI | None = None
-        self._reasoning_model: AzureChatOpenAI | None = None
-        self._embedding_model: AzureOpenAIEmbeddings | None = None
-        self._responses_model: AzureChatOpenAI | None = None
+
+    def _uses_entra_id(self) -> bool:
+        return self.settings.azure_openai_use_microsoft_entra_id.lower() == "true"
 
     def _get_auth_key(self) -> str:
         """Generate a key for authentication caching based on settings."""
         return f"{self.settings.azure_openai_endpoint}_{self.settings.azure_openai_use_microsoft_entra_id}"
 
-    def _get_auth_token(self) -> str | None:
-        """Get authentication token with lazy initialization and caching."""
-        if self.settings.azure_openai_use_microsoft_entra_id.lower() != "true":
-            return None
-
+    def _get_token_provider(self) -> EntraIdTokenProvider:
+        """Get the shared token provider of this endpoint, creating the credential on first use."""
         auth_key = self._get_auth_key()
 
         with self._token_lock:
@@ -63,110 +350,124 @@ class AzureOpenAiWrapper:
                 logger.info("Initializing Microsoft Entra ID authentication")
                 self._credentials[auth_key] = DefaultAzureCredential()
 
-            if auth_key not in self._tokens:
-                logger.info("Getting authentication token")
-                self._tokens[auth_key] = (
-                    self._credentials[auth_key].get_token("https://cognitiveservices.azure.com/.default").token
+            if auth_key not in self._token_providers:
+                self._token_providers[auth_key] = EntraIdTokenProvider(
+                    credential=self._credentials[auth_key],
+                    refresh_margin_seconds=self.settings.azure_openai_token_refresh_margin_seconds,
                 )
 
-            return self._tokens[auth_key]
+            return self._token_providers[auth_key]
+
+    def _get_auth_token(self) -> str | None:
+        """Get a valid authentication token, refreshed before it expires."""
+        if not self._uses_entra_id():
+            return None
+        return self._get_token_provider().get_token()
+
+    def _model_key(self, kind: str, deployment: str, **options) -> ModelKey:
+        if self._uses_entra_id():
+            auth_mode, credential_id = "entra_id", ""
+        else:
+            auth_mode = "api_key"
+            credential_id = hashlib.sha256(self.settings.azure_openai_api_key.encode()).hexdigest()[:16]
+        return ModelKey(
+            kind=kind,
+            deployment=deployment,
+            endpoint=self.settings.azure_openai_endpoint,
+            auth_mode=auth_mode,
+            credential_id=credential_id,
+            api_version=self.settings.azure_openai_api_version,
+            options=tuple(sorted(options.items())),
+        )
+
+    def _client_kwargs(self) -> dict:
+        """Authentication, endpoint and pooled HTTP clients shared by every model."""
+        cache = get_model_client_cache()
+        if self._uses_entra_id():
+            provider = self._get_token_provider()
+            # Fetch the first token now, so that authentication errors surface when the model is built
+            provider.get_token()
+            auth = {
+                "azure_ad_token_provider": provider,
+                "azure_ad_async_token_provider": provider.aget_token,
+            }
+        else:
+            logger.info("Using API key for authentication")
+            auth = {"api_key": self.settings.azure_openai_api_key}
+        return {
+            **auth,
+            "azure_endpoint": self.settings.azure_openai_endpoint,
+            "api_version": self.settings.azure_openai_api_version,
+            "http_client": cache.get_http_client(self.settings),
+            "http_async_client": cache.get_async_http_client(self.settings),
+        }
+
+    def _get_chat_model(self, deployment: str, **options) -> AzureChatOpenAI:
+        def factory() -> AzureChatOpenAI:
+            from langchain_openai import AzureChatOpenAI
+
+            return AzureChatOpenAI(**self._client_kwargs(), azure_deployment=deployment, **options)
+
+        return get_model_client_cache().get_or_create(self._model_key("chat", deployment, **options), factory)
 
     @property
-    def chat_model(self) -> AzureChatOpenAI:
-        """Lazily initialize and return chat model."""
-        if self._chat_model is None:
-            if self.settings.azure_openai_use_microsoft_entra_id.lower() == "true":
-                token = self._get_auth_token()
-                self._chat_model = AzureChatOpenAI(
-                    azure_ad_token=token,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_chat,
-                    streaming=True,
-                )
-            else:
-                logger.info("Using API key for authentication")
-                self._chat_model = AzureChatOpenAI(
-                    api_key=self.settings.azure_openai_api_key,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_chat,
-                    streaming=True,
-                )
-        return self._chat_model
+    def chat_model(self) -> AzureChatOpenAI | RoutingChatModel:
+        """Return the shared chat model, building it on first use, or the router when it is enabled."""
+        from template_langgraph.llms.chat_routers import get_chat_router_settings, get_routing_chat_model
+
+        if get_chat_router_settings().chat_router_enabled:
+            return get_routing_chat_model()
+        return self._get_chat_model(self.settings.azure_openai_model_chat, streaming=True, stream_usage=True)
 
     @property
     def reasoning_model(self) -> AzureChatOpenAI:
-        """Lazily initialize and return reasoning model."""
-        if self._reasoning_model is None:
-            if self.settings.azure_openai_use_microsoft_entra_id.lower() == "true":
-                token = self._get_auth_token()
-                self._reasoning_model = AzureChatOpenAI(
-                    azure_ad_token=token,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_reasoning,
-                    streaming=True,
-                )
-            else:
-                self._reasoning_model = AzureChatOpenAI(
-                    api_key=self.settings.azure_openai_api_key,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_reasoning,
-                    streaming=True,
-                )
-        return self._reasoning_model
+        """Return the shared reasoning model, building it on first use."""
+        return self._get_chat_model(self.settings.azure_openai_model_reasoning, streaming=True, stream_usage=True)
 
     @property
     def embedding_model(self) -> AzureOpenAIEmbeddings:
-        """Lazily initialize and return embedding model."""
-        if self._embedding_model is None:
-            if self.settings.azure_openai_use_microsoft_entra_id.lower() == "true":
-                token = self._get_auth_token()
-                self._embedding_model = AzureOpenAIEmbeddings(
-                    azure_ad_token=token,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_embedding,
-                )
-            else:
-                self._embedding_model = AzureOpenAIEmbeddings(
-                    api_key=self.settings.azure_openai_api_key,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_embedding,
-                )
-        return self._embedding_model
+        """Return the shared embedding model, building it on first use."""
+        deployment = self.settings.azure_openai_model_embedding
+
+        def factory() -> AzureOpenAIEmbeddings:
+            from langchain_openai import AzureOpenAIEmbeddings
+
+            return AzureOpenAIEmbeddings(**self._client_kwargs(), azure_deployment=deployment)
+
+        return get_model_client_cache().get_or_create(self._model_key("embedding", deployment), factory)
 
     @property
     def responses_model(self) -> AzureChatOpenAI:
-        """Lazily initialize and return responses API model."""
-        if self._responses_model is None:
-            if self.settings.azure_openai_use_microsoft_entra_id.lower() == "true":
-                token = self._get_auth_token()
-                self._responses_model = AzureChatOpenAI(
-                    azure_ad_token=token,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_chat,
-                    streaming=True,
-                    model=self.settings.azure_openai_model_chat,
-                    output_version="responses/v1",
-                )
-            else:
-                logger.info("Using API key for authentication")
-                self._responses_model = AzureChatOpenAI(
-                    api_key=self.settings.azure_openai_api_key,
-                    azure_endpoint=self.settings.azure_openai_endpoint,
-                    api_version=self.settings.azure_openai_api_version,
-                    azure_deployment=self.settings.azure_openai_model_chat,
-                    streaming=True,
-                    model=self.settings.azure_openai_model_chat,
-                    output_version="responses/v1",
-                )
-        return self._responses_model
+        """Return the shared responses API model, building it on first use."""
+        return self._get_chat_model(
+            self.settings.azure_openai_model_chat,
+            streaming=True,
+            model=self.settings.azure_openai_model_chat,
+            output_version="responses/v1",
+        )
+
+    @property
+    def cached_embedding_model(self) -> CachedEmbeddings | AzureOpenAIEmbeddings:
+        """Return the embedding model behind the process-wide embedding cache."""
+        if not get_embedding_cache_settings().embedding_cache_enabled:
+            return self.embedding_model
+        return CachedEmbeddings(
+            embeddings=self.embedding_model,
+            model=self.settings.azure_openai_model_embedding,
+        )
 
     def create_embedding(self, text: str):
         """Create an embedding for the given text."""
-        return self.embedding_model.embed_query(text)
+        return self.cached_embedding_model.embed_query(text)
+
+    def create_embeddings(self, texts: list[str]):
+        """Create embeddings for the given texts in one request, skipping cached ones."""
+        return self.cached_embedding_model.embed_documents(texts)
+
+    async def acreate_embedding(self, text: str):
+        """Asynchronously create an embedding for the given text."""
+        return await self.cached_embedding_model.aembed_query(text)
+
+    async def acreate_embeddings(self, texts: list[str]):
+        """Asynchronously create embeddings for the given texts in one request, skipping cached ones."""
+        return await self.cached_embedding_model.aembed_documents(texts)
@@ -0,0 +1,478 @@
+"""Routing chat model that spreads requests over several deployments.
+
+``RoutingChatModel`` is a drop-in chat model in front of a weighted pool of
+backends, e.g. regional Azure OpenAI deployments plus Ollama or Foundry Local as
+local fallbacks. For each request the router orders the backends:
+
+1. Remote backends whose circuit is closed and that are below ``max_outstanding``,
+   best first by least outstanding requests or by latency EWMA.
+2. Local backends.
+3. Saturated remote backends, when no local backend is configured.
+
+If a backend fails before producing output, the request moves on to the next one.
+Consecutive failures open the backend's circuit for
+``chat_router_reset_timeout_seconds``, after which a single probe request decides
+whether it closes again. Only failures of the backend itself count: connection
+errors, timeouts, 429 and 5xx. Other errors, e.g. a 400 from the content filter,
+are raised as they are. Latency and errors per backend are recorded through the
+OpenTelemetry metrics API and are available from ``ChatRouter.stats()``.
+
+Set ``CHAT_ROUTER_ENABLED=true`` to make ``AzureOpenAiWrapper.chat_model`` return
+the router, so that every agent uses it.
+"""
+
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Literal
+
+import httpx
+import openai
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from opentelemetry import metrics
+from pydantic import BaseModel, ConfigDict
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.llms.azure_openais import AzureOpenAiWrapper, get_azure_openai_settings
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+meter = metrics.get_meter(__name__)
+duration_histogram = meter.create_histogram(
+    "llm_router.request.duration",
+    unit="s",
+    description="Chat model request duration by backend and outcome",
+)
+requests_counter = meter.create_counter(
+    "llm_router.requests",
+    description="Chat model requests by backend and outcome (success, failure or client_error)",
+)
+
+# LangGraph does not stream the tokens of runs with this tag; the router streams them itself
+NOSTREAM_TAG = "nostream"
+
+
+class RouterBackendConfig(BaseModel):
+    name: str
+    provider: Literal["azure_openai", "ollama", "foundry_local"] = "azure_openai"
+    # Azure OpenAI endpoint, deployment and key; the AZURE_OPENAI_* settings by default
+    endpoint: str | None = None
+    deployment: str | None = None
+    api_key: str | None = None
+    weight: float = 1.0
+    # Requests in flight above which the backend counts as saturated (0: never)
+    max_outstanding: int = 0
+    # Local backends only take requests when no remote one can; Ollama and Foundry Local by default
+    local: bool | None = None
+
+
+class Settings(BaseSettings):
+    chat_router_enabled: bool = False
+    # e.g. [{"name": "japaneast", "endpoint": "https://...", "deployment": "gpt-4o", "max_outstanding": 32}]
+    chat_router_backends: list[RouterBackendConfig] = []
+    chat_router_strategy: Literal["least_outstanding", "latency_ewma"] = "least_outstanding"
+    chat_router_ewma_alpha: float = 0.3
+    chat_router_failure_threshold: int = 5
+    chat_router_reset_timeout_seconds: float = 30.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_chat_router_settings() -> Settings:
+    """Get chat router settings."""
+    return Settings()
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """Whether an error is the backend's fault, so that the request should fail over."""
+    if isinstance(error, ConnectionError | TimeoutError | httpx.TransportError | openai.APIConnectionError):
+        return True
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+
+class CircuitBreaker:
+    """Closed until ``failure_threshold`` consecutive failures, then open for ``reset_timeout`` seconds."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.probing = False
+
+    def state(self, now: float) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if now - self.opened_at >= self.reset_timeout else "open"
+
+    def available(self, now: float) -> bool:
+        state = self.state(now)
+        return state == "closed" or (state == "half_open" and not self.probing)
+
+    def on_start(self, now: float) -> None:
+        if self.state(now) == "half_open":
+            self.probing = True
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def on_failure(self, now: float) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = now
+        self.probing = False
+
+    def on_cancel(self) -> None:
+        # A cancelled probe proves nothing, so the next request probes again
+        self.probing = False
+
+
+@dataclass
+class RouteBackend:
+    name: str
+    model: BaseChatModel
+    weight: float = 1.0
+    max_outstanding: int = 0
+    local: bool = False
+    breaker: CircuitBreaker = field(default_factory=CircuitBreaker)
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    client_errors: int = 0
+    ewma_latency_seconds: float | None = None
+
+    def saturated(self) -> bool:
+        return 0 < self.max_outstanding <= self.outstanding
+
+
+class ChatRouter:
+    """Backend pool with the selection, circuit breaking and statistics of RoutingChatModel."""
+
+    def __init__(
+        self,
+        backends: list[RouteBackend],
+        strategy: str = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        clock=time.monotonic,
+    ):
+        if not backends:
+            raise ValueError("ChatRouter needs at least one backend")
+        self.backends = backends
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.clock = clock
+        self._lock = threading.Lock()
+
+    def _score(self, backend: RouteBackend) -> tuple:
+        load = (backend.outstanding + 1) / backend.weight
+        # Backends without a measurement yet are tried first
+        latency = backend.ewma_latency_seconds or 0.0
+        if self.strategy == "latency_ewma":
+            return latency * load, load
+        return load, latency
+
+    def candidates(self) -> list[RouteBackend]:
+        """Backends to try for a request, in order."""
+        now = self.clock()
+        with self._lock:
+            available = [backend for backend in self.backends if backend.breaker.available(now)]
+            remote = [backend for backend in available if not backend.local and not backend.saturated()]
+            local = [backend for backend in available if backend.local]
+            saturated = [backend for backend in available if not backend.local and backend.saturated()]
+            ordered = sorted(remote, key=self._score) + sorted(local, key=self._score)
+            if not local:
+                ordered += sorted(saturated, key=self._score)
+        return ordered
+
+    def start(self, backend: RouteBackend) -> bool:
+        """Claim a request on a backend, unless its circuit closed in the meantime."""
+        now = self.clock()
+        with self._lock:
+            if not backend.breaker.available(now):
+                return False
+            backend.breaker.on_start(now)
+            backend.outstanding += 1
+            backend.requests += 1
+        return True
+
+    def finish(self, backend: RouteBackend, elapsed: float, error: BaseException | None = None) -> None:
+        if error is None:
+            outcome = "success"
+        elif not isinstance(error, Exception):
+            # Closed stream or cancelled task (GeneratorExit, CancelledError)
+            outcome = "cancelled"
+        elif is_backend_failure(error):
+            outcome = "failure"
+        else:
+            outcome = "client_error"
+        with self._lock:
+            backend.outstanding -= 1
+            if outcome == "cancelled":
+                backend.breaker.on_cancel()
+            elif outcome == "failure":
+                backend.failures += 1
+                backend.breaker.on_failure(self.clock())
+            else:
+                if outcome == "client_error":
+                    backend.client_errors += 1
+                backend.breaker.on_success()
+                if backend.ewma_latency_seconds is None:
+                    backend.ewma_latency_seconds = elapsed
+                else:
+                    backend.ewma_latency_seconds += self.ewma_alpha * (elapsed - backend.ewma_latency_seconds)
+        attributes = {"backend": backend.name, "outcome": outcome}
+        duration_histogram.record(elapsed, attributes)
+        requests_counter.add(1, attributes)
+        if outcome == "failure":
+            logger.warning(f"Chat model backend {backend.name} failed: {error}")
+
+    def stats(self) -> list[dict]:
+        """Describe each backend: load, latency, errors and circuit state."""
+        now = self.clock()
+        with self._lock:
+            return [
+                {
+                    "name": backend.name,
+                    "local": backend.local,
+                    "weight": backend.weight,
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                    "failures": backend.failures,
+                    "client_errors": backend.client_errors,
+                    "ewma_latency_ms": (
+                        backend.ewma_latency_seconds * 1000 if backend.ewma_latency_seconds is not None else None
+                    ),
+                    "circuit": backend.breaker.state(now),
+                }
+                for backend in self.backends
+            ]
+
+
+class RoutingChatModel(BaseChatModel):
+    """Chat model that sends each request to a backend chosen by a ChatRouter."""
+
+    router: ChatRouter
+    # Set by bind_tools and applied to whichever backend serves the request
+    tools: Sequence[Any] | None = None
+    tool_kwargs: dict[str, Any] = {}
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Runnable[LanguageModelInput, AIMessage]:
+        # A shallow copy, so that the bound model shares the router and its statistics
+        return self.model_copy(update={"tools": list(tools), "tool_kwargs": kwargs})
+
+    def _runnable(self, backend: RouteBackend) -> Runnable:
+        if self.tools is None:
+            return backend.model
+        return backend.model.bind_tools(self.tools, **self.tool_kwargs)
+
+    @staticmethod
+    def _config() -> dict:
+        # Callbacks are inherited from the caller's context
+        return {"tags": [NOSTREAM_TAG]}
+
+    def _backends(self) -> list[RouteBackend]:
+        candidates = self.router.candidates()
+        if not candidates:
+            raise RuntimeError("No chat model backend is available, all circuits are open")
+        return candidates
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        error = None
+        for backend in self._backends():
+            if not self.router.start(backend):
+                continue
+            started_at = time.perf_counter()
+            try:
+                message = self._runnable(backend).invoke(messages, config=self._config(), stop=stop, **kwargs)
+            except Exception as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                if not is_backend_failure(e):
+                    raise
+                error = e
+                continue
+            except BaseException as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                raise
+            self.router.finish(backend, time.perf_counter() - started_at)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise error or RuntimeError("No chat model backend is available")
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        error = None
+        for backend in self._backends():
+            if not self.router.start(backend):
+                continue
+            started_at = time.perf_counter()
+            try:
+                message = await self._runnable(backend).ainvoke(messages, config=self._config(), stop=stop, **kwargs)
+            except Exception as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                if not is_backend_failure(e):
+                    raise
+                error = e
+                continue
+            except BaseException as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                raise
+            self.router.finish(backend, time.perf_counter() - started_at)
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise error or RuntimeError("No chat model backend is available")
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        error = None
+        for backend in self._backends():
+            if not self.router.start(backend):
+                continue
+            started_at = time.perf_counter()
+            streamed = False
+            try:
+                for message in self._runnable(backend).stream(messages, config=self._config(), stop=stop, **kwargs):
+                    chunk = ChatGenerationChunk(message=message)
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                # Output already sent cannot be taken back, so only fail over before the first chunk
+                if streamed or not is_backend_failure(e):
+                    raise
+                error = e
+                continue
+            except BaseException as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                raise
+            self.router.finish(backend, time.perf_counter() - started_at)
+            return
+        raise error or RuntimeError("No chat model backend is available")
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        error = None
+        for backend in self._backends():
+            if not self.router.start(backend):
+                continue
+            started_at = time.perf_counter()
+            streamed = False
+            try:
+                async for message in self._runnable(backend).astream(
+                    messages, config=self._config(), stop=stop, **kwargs
+                ):
+                    chunk = ChatGenerationChunk(message=message)
+                    if run_manager:
+                        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                if streamed or not is_backend_failure(e):
+                    raise
+                error = e
+                continue
+            except BaseException as e:
+                self.router.finish(backend, time.perf_counter() - started_at, e)
+                raise
+            self.router.finish(backend, time.perf_counter() - started_at)
+            return
+        raise error or RuntimeError("No chat model backend is available")
+
+
+def build_backend(config: RouterBackendConfig, settings: Settings) -> RouteBackend:
+    """Build the chat model of a configured backend."""
+    if config.provider == "ollama":
+        from template_langgraph.llms.ollamas import OllamaWrapper, get_ollama_settings
+
+        ollama_settings = get_ollama_settings()
+        if config.deployment:
+            ollama_settings = ollama_settings.model_copy(update={"ollama_model_chat": config.deployment})
+        model = OllamaWrapper(settings=ollama_settings).chat_model
+    elif config.provider == "foundry_local":
+        from template_langgraph.llms.foundry_locals import FoundryLocalWrapper, get_foundry_local_settings
+
+        foundry_settings = get_foundry_local_settings()
+        if config.deployment:
+            foundry_settings = foundry_settings.model_copy(update={"foundry_local_model_chat": config.deployment})
+        model = FoundryLocalWrapper(settings=foundry_settings).chat_model
+    else:
+        overrides = {
+            "azure_openai_endpoint": config.endpoint,
+            "azure_openai_model_chat": config.deployment,
+            "azure_openai_api_key": config.api_key,
+        }
+        azure_settings = get_azure_openai_settings().model_copy(
+            update={key: value for key, value in overrides.items() if value is not None}
+        )
+        # Not chat_model, which returns the router itself when it is enabled
+        model = AzureOpenAiWrapper(settings=azure_settings)._get_chat_model(
+            azure_settings.azure_openai_model_chat, streaming=True, stream_usage=True
+        )
+    return RouteBackend(
+        name=config.name,
+        model=model,
+        weight=config.weight,
+        max_outstanding=config.max_outstanding,
+        local=config.local if config.local is not None else config.provider != "azure_openai",
+        breaker=CircuitBreaker(
+            failure_threshold=settings.chat_router_failure_threshold,
+            reset_timeout=settings.chat_router_reset_timeout_seconds,
+        ),
+    )
+
+
+@lru_cache
+def get_routing_chat_model() -> RoutingChatModel:
+    """Get the process-wide routing chat model built from CHAT_ROUTER_BACKENDS."""
+    settings = get_chat_router_settings()
+    configs = settings.chat_router_backends or [RouterBackendConfig(name="default")]
+    router = ChatRouter(
+        backends=[build_backend(config, settings) for config in configs],
+        strategy=settings.chat_router_strategy,
+        ewma_alpha=settings.chat_router_ewma_alpha,
+    )
+    return RoutingChatModel(router=router)
@@ -0,0 +1,282 @@
+"""Two-tier cache for embedding vectors.
+
+Embedding the same text twice returns the same vector, so repeated search keywords
+and re-ingested rows do not need another round trip to the embedding endpoint.
+Vectors are keyed by (model deployment, normalized text hash) and kept in a
+size-bounded in-memory LRU, optionally backed by a size-bounded SQLite file that
+survives process restarts.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+
+from langchain_core.embeddings import Embeddings
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class Settings(BaseSettings):
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_entries: int = 10_000
+    # Empty disables the on-disk tier
+    embedding_cache_path: str = ""
+    embedding_cache_disk_max_entries: int = 1_000_000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_embedding_cache_settings() -> Settings:
+    """Get embedding cache settings."""
+    return Settings()
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so that trivially different inputs share a cache entry."""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def make_key(model: str, text: str) -> str:
+    """Build the cache key for a text embedded with the given model deployment."""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode()).hexdigest()
+
+
+class SqliteEmbeddingStore:
+    """On-disk embedding tier backed by a single SQLite table."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at)")
+        self._conn.commit()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE embeddings SET used_at = ? WHERE key = ?",
+                    [(time.time(), key) for key, _ in rows],
+                )
+                self._conn.commit()
+        return {key: array("d", vector).tolist() for key, vector in rows}
+
+    def put_many(self, items: dict[str, list[float]]) -> int:
+        """Store vectors and return the number of entries evicted to stay within bounds."""
+        if not items:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, used_at) VALUES (?, ?, ?)",
+                [(key, array("d", vector).tobytes(), now) for key, vector in items.items()],
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            evicted = max(0, count - self.max_entries)
+            if evicted:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used_at LIMIT ?)",
+                    (evicted,),
+                )
+            self._conn.commit()
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingCache:
+    """In-memory LRU of embedding vectors, optionally backed by a SQLite store."""
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_embedding_cache_settings()
+        self.settings = settings
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = (
+            SqliteEmbeddingStore(settings.embedding_cache_path, settings.embedding_cache_disk_max_entries)
+            if settings.embedding_cache_path
+            else None
+        )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Return the cached vector for each text, or None where it is not cached."""
+        keys = [make_key(model, text) for text in texts]
+        results: dict[str, list[float]] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[key] = self._memory[key]
+                    self.memory_hits += 1
+        missing = [key for key in dict.fromkeys(keys) if key not in results]
+        if self.disk is not None and missing:
+            found = self.disk.get_many(missing)
+            self._remember(found)
+            results.update(found)
+            with self._lock:
+                self.disk_hits += sum(1 for key in keys if key in found)
+        with self._lock:
+            self.misses += sum(1 for key in keys if key not in results)
+        return [results.get(key) for key in keys]
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]) -> None:
+        """Store the vectors for the given texts in both tiers."""
+        items = {make_key(model, text): list(vector) for text, vector in zip(texts, vectors)}
+        self._remember(items)
+        if self.disk is not None:
+            evicted = self.disk.put_many(items)
+            with self._lock:
+                self.evictions += evicted
+
+    def get(self, model: str, text: str) -> list[float] | None:
+        return self.get_many(model, [text])[0]
+
+    def put(self, model: str, text: str, vector: list[float]) -> None:
+        self.put_many(model, [text], [vector])
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+            }
+        stats["disk_entries"] = len(self.disk) if self.disk is not None else 0
+        return stats
+
+    def clear(self) -> None:
+        """Drop every cached vector and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            self.memory_hits = self.disk_hits = self.misses = self.evictions = 0
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _remember(self, items: dict[str, list[float]]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.settings.embedding_cache_max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the process-wide embedding cache."""
+    return EmbeddingCache()
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings that look vectors up in an EmbeddingCache before calling the wrapped model.
+
+    Only the texts missing from the cache are sent to the model, in a single batch.
+    It is a regular ``Embeddings`` object, so it can be handed to LangChain vector
+    stores such as AzureSearch or AzureCosmosDBNoSqlVectorSearch.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model: str,
+        cache: EmbeddingCache = None,
+    ):
+        if cache is None:
+            cache = get_embedding_cache()
+        self.embeddings = embeddings
+        self.model = model
+        self.cache = cache
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.cache.get_many(self.model, texts)
+        missing = self._missing_texts(texts, vectors)
+        if missing:
+            self._fill(texts, vectors, missing, self.embeddings.embed_documents(missing))
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(self.model, text, vector)
+        return vector
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = self.cache.get_many(self.model, texts)
+        missing = self._missing_texts(texts, vectors)
+        if missing:
+            self._fill(texts, vectors, missing, await self.embeddings.aembed_documents(missing))
+        return vectors
+
+    async def aembed_query(self, text: str) -> list[float]:
+        vector = self.cache.get(self.model, text)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self.cache.put(self.model, text, vector)
+        return vector
+
+    @staticmethod
+    def _missing_texts(texts: list[str], vectors: list[list[float] | None]) -> list[str]:
+        # Deduplicate so that repeated rows in one batch are embedded once
+        return list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+
+    def _fill(
+        self,
+        texts: list[str],
+        vectors: list[list[float] | None],
+        missing: list[str],
+        embedded: list[list[float]],
+    ) -> None:
+        self.cache.put_many(self.model, missing, embedded)
+        by_text = dict(zip(missing, embedded))
+        for i, text in enumerate(texts):
+            if vectors[i] is None:
+                vectors[i] = by_text[text]
@@ -0,0 +1,153 @@
+"""Stable prompt prefixes for provider-side prompt caching.
+
+Azure OpenAI reuses the computation of a prompt prefix it has seen recently
+(1,024 tokens and up), which makes the cached part cheaper and faster. The
+prefix only matches if it is identical from the first token: the system prompt,
+then the tool definitions, then the conversation history. A tool-calling agent
+re-sends the same system prompt and tool schemas every turn, so keeping them
+fixed and in front of the history is what makes the cache hit.
+
+``PromptPrefixCache`` builds the system message, the serialized tool schemas
+and the model bound to them once per (model, tools, system prompt) signature,
+so the tools are not reserialized on every call. ``record_prompt_cache_usage``
+reports the cached prompt tokens of each response through the OpenTelemetry
+metrics API.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from opentelemetry import metrics
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+meter = metrics.get_meter(__name__)
+prompt_tokens_counter = meter.create_counter(
+    "llm.prompt_tokens",
+    description="Prompt tokens sent to the chat model",
+)
+cached_tokens_counter = meter.create_counter(
+    "llm.prompt_tokens.cached",
+    description="Prompt tokens served from the provider's prompt cache",
+)
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """The fixed head of every prompt sent for one (model, tools, system prompt) signature."""
+
+    key: str
+    system_message: SystemMessage | None
+    tool_schemas: list[dict]
+    bound_model: Runnable
+
+    def layout(self, history: Sequence[BaseMessage]) -> list[BaseMessage]:
+        """Return the system message followed by the history; the tools are sent between them."""
+        messages = list(history)
+        if self.system_message is None:
+            return messages
+        if messages and isinstance(messages[0], SystemMessage):
+            if messages[0].content == self.system_message.content:
+                return messages
+        return [self.system_message, *messages]
+
+
+def make_prefix_key(system_prompt: str | None, tool_schemas: list[dict]) -> str:
+    payload = {"system_prompt": system_prompt, "tools": tool_schemas}
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class PromptPrefixCache:
+    """Build prompt prefixes once and reuse them, evicting the least recently used ones."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max(1, max_entries)
+        self.hits = 0
+        self.misses = 0
+        # Entries keep the model and tools alive, so their ids are not reused while cached
+        self._entries: OrderedDict[tuple, tuple[Any, tuple, PromptPrefix]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, llm: BaseChatModel, tools: Sequence, system_prompt: str | None = None) -> PromptPrefix:
+        tools = tuple(tools)
+        signature = (id(llm), tuple(id(tool) for tool in tools), system_prompt)
+        with self._lock:
+            if entry := self._entries.get(signature):
+                self._entries.move_to_end(signature)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        prefix = self._build(llm, tools, system_prompt)
+        with self._lock:
+            self._entries[signature] = (llm, tools, prefix)
+            self._entries.move_to_end(signature)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return prefix
+
+    @staticmethod
+    def _build(llm: BaseChatModel, tools: tuple, system_prompt: str | None) -> PromptPrefix:
+        # Tools keep the caller's order: reordering them would change the prefix
+        tool_schemas = [convert_to_openai_tool(tool) for tool in tools]
+        key = make_prefix_key(system_prompt, tool_schemas)
+        logger.debug(f"Built prompt prefix {key} with {len(tool_schemas)} tools")
+        return PromptPrefix(
+            key=key,
+            system_message=SystemMessage(content=system_prompt) if system_prompt else None,
+            tool_schemas=tool_schemas,
+            bound_model=llm.bind_tools(tools=tool_schemas),
+        )
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the number of cached prefixes."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def clear(self) -> None:
+        """Drop every cached prefix and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+@lru_cache
+def get_prompt_prefix_cache() -> PromptPrefixCache:
+    """Get the process-wide prompt prefix cache."""
+    return PromptPrefixCache()
+
+
+def record_prompt_cache_usage(message: AIMessage, prefix: PromptPrefix) -> dict | None:
+    """Report the prompt and cached tokens of a response, if the provider returned usage.
+
+    Returns:
+        The prefix key, the token counts and the share of prompt tokens read from the cache.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return None
+    input_tokens = usage.get("input_tokens", 0)
+    cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+    attributes = {"prefix": prefix.key}
+    prompt_tokens_counter.add(input_tokens, attributes)
+    cached_tokens_counter.add(cached_tokens, attributes)
+    hit_ratio = cached_tokens / input_tokens if input_tokens else 0.0
+    logger.info(f"Prompt prefix {prefix.key}: {cached_tokens}/{input_tokens} prompt tokens cached ({hit_ratio:.0%})")
+    return {
+        "prefix": prefix.key,
+        "input_tokens": input_tokens,
+        "cached_tokens": cached_tokens,
+        "hit_ratio": hit_ratio,
+    }
@@ -0,0 +1,564 @@
+"""Client-side rate limiting and adaptive concurrency for Azure OpenAI.
+
+Parallel ``Send`` fan-outs in e.g. NewsSummarizerAgent, ImageClassifierAgent and
+ParallelRagAgent all hit the same deployment. Without pacing they trigger 429s,
+and the SDK's retries then make tail latency worse. Every request of the model
+clients goes through ``RateLimitedTransport``, installed on the pooled httpx
+clients of ``azure_openais``. It uses one ``RateLimiter`` per deployment, which
+combines:
+
+- Token buckets for requests and tokens per minute. The tokens of a request are
+  estimated from its body before it is sent. After the response arrives, the
+  buckets are reconciled with the ``x-ratelimit-remaining-*`` headers.
+- The ``retry-after`` of a 429, which pauses the deployment, so the SDK's retries
+  wait instead of piling up.
+- Optionally, a concurrency limit that adapts AIMD-style. It grows additively while
+  requests succeed and shrinks multiplicatively on 429.
+
+Every limit is off by default: only 429 pauses apply until requests or tokens per
+minute, or a maximum concurrency, are configured.
+"""
+
+import asyncio
+import json
+import math
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+import httpx
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+# Shrink the concurrency at most once per this many seconds, so that a burst of 429s counts once
+DECREASE_COOLDOWN_SECONDS = 1.0
+
+
+class Settings(BaseSettings):
+    llm_rate_limit_enabled: bool = True
+    # Per deployment (0: unlimited)
+    llm_rate_limit_requests_per_minute: int = 0
+    llm_rate_limit_tokens_per_minute: int = 0
+    # Per-deployment overrides, e.g. {"gpt-4o": {"requests_per_minute": 300, "tokens_per_minute": 50000}}
+    llm_rate_limit_deployment_limits: dict[str, dict[str, int]] = {}
+    # Adaptive concurrency per deployment (0: unlimited, no adaptive concurrency)
+    llm_rate_limit_max_concurrency: int = 0
+    # 0: start at the maximum
+    llm_rate_limit_initial_concurrency: int = 0
+    llm_rate_limit_min_concurrency: int = 1
+    llm_rate_limit_concurrency_decrease_factor: float = 0.5
+    # Longest wait for a concurrency slot before the request fails with httpx.PoolTimeout
+    llm_rate_limit_acquire_timeout_seconds: float = 60.0
+    # Pause used when a 429 has no retry-after header
+    llm_rate_limit_default_retry_after_seconds: float = 1.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_rate_limit_settings() -> Settings:
+    """Get LLM rate limit settings."""
+    return Settings()
+
+
+def _iter_strings(value: Any) -> Iterator[str]:
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_strings(item)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """Rough token count: about 4 ASCII characters per token and one token per other character."""
+    ascii_chars = sum(1 for char in text if char.isascii())
+    return math.ceil(ascii_chars / 4) + len(text) - ascii_chars
+
+
+def estimate_request_tokens(body: dict) -> int:
+    """Estimate the tokens a request counts against the limit: its prompt plus its completion budget."""
+    prompt = body.get("messages") or body.get("input") or body.get("prompt") or []
+    prompt_tokens = sum(estimate_text_tokens(text) for text in _iter_strings(prompt))
+    completion_tokens = (
+        body.get("max_completion_tokens") or body.get("max_tokens") or body.get("max_output_tokens") or 0
+    )
+    return prompt_tokens + int(completion_tokens)
+
+
+def parse_retry_after(headers: httpx.Headers) -> float | None:
+    """Read the pause requested by a throttled response, in seconds."""
+    for name, scale in (("retry-after-ms", 0.001), ("x-ms-retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value) * scale
+        except ValueError:
+            # An HTTP date; fall back to the default pause
+            continue
+    return None
+
+
+def _header_int(headers: httpx.Headers, name: str) -> int | None:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Bucket of ``per_minute`` units refilled continuously. Reservations may overdraw it."""
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated_at = now
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take ``amount`` units and return how long to wait until they are covered."""
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def sync(self, remaining: float, now: float) -> None:
+        """Lower the level to what the server reports as remaining."""
+        self._refill(now)
+        self.level = min(self.level, remaining)
+
+
+class _SyncWaiter:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def wake(self) -> None:
+        self.event.set()
+
+
+class _AsyncWaiter:
+    def __init__(self, concurrency: "AdaptiveConcurrency", loop: asyncio.AbstractEventLoop):
+        self.concurrency = concurrency
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self) -> None:
+        self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if self.future.cancelled():
+            # The waiter gave up after being handed the slot, so pass it on
+            self.concurrency.release()
+        else:
+            self.future.set_result(None)
+
+
+class AdaptiveConcurrency:
+    """Concurrency limit shared by threads and event loops, adapted AIMD-style.
+
+    Each success raises the limit by ``1 / limit``, i.e. by about one per round of
+    requests, and each throttled request multiplies it by ``decrease_factor``.
+    Waiters are served in arrival order. An ``initial`` of 0 starts at the maximum.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 64,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        if initial <= 0:
+            initial = self.maximum
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.decrease_factor = decrease_factor
+        self.clock = clock
+        self.in_flight = 0
+        self._waiters: deque[_SyncWaiter | _AsyncWaiter] = deque()
+        self._last_decrease_at = -math.inf
+        self._lock = threading.Lock()
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _wake(self) -> None:
+        while self._waiters and self._has_room():
+            self.in_flight += 1
+            self._waiters.popleft().wake()
+
+    def acquire(self, timeout: float | None = None) -> None:
+        """Wait for a slot; raise TimeoutError if none is free within ``timeout`` seconds."""
+        with self._lock:
+            if self._has_room() and not self._waiters:
+                self.in_flight += 1
+                return
+            waiter = _SyncWaiter()
+            self._waiters.append(waiter)
+        if waiter.event.wait(timeout):
+            return
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                raise TimeoutError(f"No concurrency slot within {timeout}s")
+        # The slot was handed over just as the wait timed out
+
+    async def aacquire(self, timeout: float | None = None) -> None:
+        with self._lock:
+            if self._has_room() and not self._waiters:
+                self.in_flight += 1
+                return
+            waiter = _AsyncWaiter(self, asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            # A timeout cancels the wait, which is handled like any other cancellation
+            async with asyncio.timeout(timeout):
+                await waiter.future
+        except (asyncio.CancelledError, TimeoutError):
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Cancelled after the slot was handed over
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._wake()
+
+    def on_throttle(self) -> None:
+        now = self.clock()
+        with self._lock:
+            if now - self._last_decrease_at < DECREASE_COOLDOWN_SECONDS:
+                return
+            self._last_decrease_at = now
+            self.limit = max(self.minimum, self.limit * self.decrease_factor)
+        logger.info(f"Throttled, lowered concurrency limit to {int(self.limit)}")
+
+
+@dataclass
+class Permit:
+    estimated_tokens: int
+    released: bool = False
+
+
+class RateLimiter:
+    """Request and token buckets plus adaptive concurrency for one deployment."""
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        settings: Settings = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if settings is None:
+            settings = get_rate_limit_settings()
+        self.name = name
+        self.settings = settings
+        self.clock = clock
+        self.sleep = sleep
+        now = clock()
+        self.requests = TokenBucket(requests_per_minute, now) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, now) if tokens_per_minute > 0 else None
+        self.concurrency = (
+            AdaptiveConcurrency(
+                initial=settings.llm_rate_limit_initial_concurrency,
+                minimum=settings.llm_rate_limit_min_concurrency,
+                maximum=settings.llm_rate_limit_max_concurrency,
+                decrease_factor=settings.llm_rate_limit_concurrency_decrease_factor,
+                clock=clock,
+            )
+            if settings.llm_rate_limit_max_concurrency > 0
+            else None
+        )
+        self.paused_until = -math.inf
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, estimated_tokens: int) -> float:
+        with self._lock:
+            now = self.clock()
+            wait = max(0.0, self.paused_until - now)
+            if self.requests is not None:
+                wait = max(wait, self.requests.reserve(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.reserve(estimated_tokens, now))
+            self.waited_seconds += wait
+        if wait > 0:
+            logger.debug(f"{self.name}: waiting {wait:.2f}s for rate limit")
+        return wait
+
+    def _refund(self, estimated_tokens: int, now: float) -> None:
+        if self.requests is not None:
+            self.requests.refund(1, now)
+        if self.tokens is not None:
+            self.tokens.refund(estimated_tokens, now)
+
+    def _on_acquire_timeout(self, estimated_tokens: int) -> httpx.PoolTimeout:
+        with self._lock:
+            self._refund(estimated_tokens, self.clock())
+        timeout = self.settings.llm_rate_limit_acquire_timeout_seconds
+        logger.warning(f"{self.name}: no concurrency slot within {timeout}s")
+        return httpx.PoolTimeout(f"No concurrency slot for {self.name} within {timeout}s")
+
+    def acquire(self, estimated_tokens: int) -> Permit:
+        """Wait for budget and a concurrency slot before sending a request."""
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            self.sleep(wait)
+        if self.concurrency is not None:
+            try:
+                self.concurrency.acquire(self.settings.llm_rate_limit_acquire_timeout_seconds)
+            except TimeoutError:
+                raise self._on_acquire_timeout(estimated_tokens) from None
+        return Permit(estimated_tokens=estimated_tokens)
+
+    async def aacquire(self, estimated_tokens: int) -> Permit:
+        wait = self._reserve(estimated_tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self.concurrency is not None:
+            try:
+                await self.concurrency.aacquire(self.settings.llm_rate_limit_acquire_timeout_seconds)
+            except TimeoutError:
+                raise self._on_acquire_timeout(estimated_tokens) from None
+        return Permit(estimated_tokens=estimated_tokens)
+
+    def complete(self, permit: Permit, status_code: int, headers: httpx.Headers) -> None:
+        """Reconcile the buckets with the response headers and adapt the concurrency."""
+        with self._lock:
+            now = self.clock()
+            remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+            remaining_tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+            if self.requests is not None and remaining_requests is not None:
+                self.requests.sync(remaining_requests, now)
+            if self.tokens is not None and remaining_tokens is not None:
+                self.tokens.sync(remaining_tokens, now)
+            if status_code == 429:
+                self.throttled += 1
+                retry_after = parse_retry_after(headers)
+                if retry_after is None:
+                    retry_after = self.settings.llm_rate_limit_default_retry_after_seconds
+                self.paused_until = max(self.paused_until, now + retry_after)
+                # The throttled request used nothing, and its retry reserves again
+                self._refund(permit.estimated_tokens, now)
+        if status_code == 429:
+            logger.warning(f"{self.name}: throttled, pausing for {retry_after:.2f}s")
+            if self.concurrency is not None:
+                self.concurrency.on_throttle()
+        elif status_code < 400 and self.concurrency is not None:
+            self.concurrency.on_success()
+
+    def release(self, permit: Permit) -> None:
+        """Free the concurrency slot of a finished request."""
+        with self._lock:
+            if permit.released:
+                return
+            permit.released = True
+        if self.concurrency is not None:
+            self.concurrency.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "concurrency_limit": int(self.concurrency.limit) if self.concurrency is not None else None,
+                "in_flight": self.concurrency.in_flight if self.concurrency is not None else None,
+                "requests_available": self.requests.level if self.requests is not None else None,
+                "tokens_available": self.tokens.level if self.tokens is not None else None,
+                "throttled": self.throttled,
+                "waited_seconds": self.waited_seconds,
+            }
+
+
+class RateLimiterRegistry:
+    """One RateLimiter per (host, deployment), shared by every model client."""
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_rate_limit_settings()
+        self.settings = settings
+        self._limiters: dict[tuple[str, str], RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str, deployment: str) -> RateLimiter:
+        with self._lock:
+            key = (host, deployment)
+            if key not in self._limiters:
+                limits = self.settings.llm_rate_limit_deployment_limits.get(deployment, {})
+                self._limiters[key] = RateLimiter(
+                    name=f"{host}/{deployment}",
+                    requests_per_minute=limits.get(
+                        "requests_per_minute", self.settings.llm_rate_limit_requests_per_minute
+                    ),
+                    tokens_per_minute=limits.get("tokens_per_minute", self.settings.llm_rate_limit_tokens_per_minute),
+                    settings=self.settings,
+                )
+            return self._limiters[key]
+
+    def for_request(self, request: httpx.Request) -> tuple[RateLimiter, int]:
+        """Find the limiter of the request's deployment and estimate its tokens."""
+        try:
+            body = json.loads(request.content) if request.content else {}
+        except (ValueError, httpx.RequestNotRead):
+            # e.g. multipart audio uploads
+            body = {}
+        if not isinstance(body, dict):
+            body = {}
+        match = re.search(r"/deployments/([^/]+)/", request.url.path)
+        deployment = match.group(1) if match else str(body.get("model", "default"))
+        return self.get(request.url.host, deployment), estimate_request_tokens(body)
+
+    def stats(self) -> list[dict]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return [limiter.stats() for limiter in limiters]
+
+
+@lru_cache
+def get_rate_limiter_registry() -> RateLimiterRegistry:
+    """Get the process-wide rate limiter registry."""
+    return RateLimiterRegistry()
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self.stream = stream
+        self.release = release
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self.stream
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            self.release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self.stream = stream
+        self.release = release
+
+    async def __aiter__(self):
+        async for chunk in self.stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            self.release()
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Transport that paces requests through the rate limiter of their deployment.
+
+    The concurrency slot is held until the response body is closed, so that
+    streamed completions count as in flight while they stream. A response that is
+    dropped without being closed frees its slot when it is garbage collected.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, registry: RateLimiterRegistry = None):
+        self.transport = transport
+        self.registry = registry or get_rate_limiter_registry()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        limiter, estimated_tokens = self.registry.for_request(request)
+        permit = limiter.acquire(estimated_tokens)
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException:
+            limiter.release(permit)
+            raise
+        limiter.complete(permit, response.status_code, response.headers)
+        if response.is_closed:
+            # The body is already in memory, e.g. from a mock transport
+            limiter.release(permit)
+        else:
+            response.stream = _ReleasingStream(response.stream, lambda: limiter.release(permit))
+            weakref.finalize(response, limiter.release, permit)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of RateLimitedTransport, sharing the same limiters."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, registry: RateLimiterRegistry = None):
+        self.transport = transport
+        self.registry = registry or get_rate_limiter_registry()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        limiter, estimated_tokens = self.registry.for_request(request)
+        permit = await limiter.aacquire(estimated_tokens)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            limiter.release(permit)
+            raise
+        limiter.complete(permit, response.status_code, response.headers)
+        if response.is_closed:
+            # The body is already in memory, e.g. from a mock transport
+            limiter.release(permit)
+        else:
+            response.stream = _AsyncReleasingStream(response.stream, lambda: limiter.release(permit))
+            weakref.finalize(response, limiter.release, permit)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def install_rate_limiting(client: httpx.Client | httpx.AsyncClient) -> None:
+    """Route every request of an httpx client, including proxied ones, through the rate limiters."""
+    # Wrap the built transports rather than passing one, which would disable proxies from the environment
+    wrap = AsyncRateLimitedTransport if isinstance(client, httpx.AsyncClient) else RateLimitedTransport
+    client._transport = wrap(client._transport)
+    client._mounts = {
+        pattern: wrap(transport) if transport is not None else None for pattern, transport in client._mounts.items()
+    }
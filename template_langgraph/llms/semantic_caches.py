@@ -0,0 +1,173 @@
+"""Semantic cache of final agent answers.
+
+FAQ-style questions are often paraphrases of earlier ones. The cache embeds the
+question and looks for a previous question whose embedding is at least
+``semantic_cache_similarity_threshold`` cosine-similar in a small in-process numpy
+index. If one is found, its final answer is returned without calling the LLM or
+any tool. Entries expire after a TTL. They are namespaced, e.g. per system prompt
+and chat model, so an answer is only reused under the instructions it was produced
+with.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+if TYPE_CHECKING:
+    # numpy is imported when the cache is used, so agents with the cache disabled do not pay for it
+    import numpy as np
+
+logger = get_logger(__name__)
+
+
+class Settings(BaseSettings):
+    semantic_cache_enabled: bool = False
+    semantic_cache_similarity_threshold: float = 0.95
+    semantic_cache_ttl_seconds: float = 3600.0
+    # Per namespace, the oldest entries are evicted first
+    semantic_cache_max_entries: int = 1000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_semantic_cache_settings() -> Settings:
+    """Get semantic cache settings."""
+    return Settings()
+
+
+def make_namespace(*parts: str | None) -> str:
+    """Build a namespace from e.g. the system prompt and the chat model deployment."""
+    return hashlib.sha256("\0".join(part or "" for part in parts).encode()).hexdigest()[:16]
+
+
+@dataclass
+class SemanticCacheHit:
+    question: str
+    answer: str
+    similarity: float
+
+
+@dataclass
+class _Namespace:
+    # Unit-length question embeddings, one row per entry
+    vectors: np.ndarray | None = None
+    questions: list[str] = field(default_factory=list)
+    answers: list[str] = field(default_factory=list)
+    expires_at: list[float] = field(default_factory=list)
+
+    def remove(self, keep: np.ndarray) -> None:
+        import numpy as np
+
+        self.vectors = self.vectors[keep]
+        indices = np.flatnonzero(keep)
+        self.questions = [self.questions[i] for i in indices]
+        self.answers = [self.answers[i] for i in indices]
+        self.expires_at = [self.expires_at[i] for i in indices]
+
+
+class SemanticResponseCache:
+    """Cache of final answers looked up by question similarity."""
+
+    def __init__(
+        self,
+        embed: Callable[[str], list[float]],
+        settings: Settings = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if settings is None:
+            settings = get_semantic_cache_settings()
+        self.embed = embed
+        self.settings = settings
+        self.clock = clock
+        self._namespaces: dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, question: str) -> np.ndarray:
+        import numpy as np
+
+        vector = np.asarray(self.embed(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, namespace: str, question: str) -> SemanticCacheHit | None:
+        """Return the cached answer of the most similar live question, if similar enough."""
+        import numpy as np
+
+        with self._lock:
+            entries = self._namespaces.get(namespace)
+            if entries is None or not entries.questions:
+                return None
+        vector = self._embed(question)
+        with self._lock:
+            if entries.vectors is None or not entries.questions:
+                return None
+            similarities = entries.vectors @ vector
+            similarities[np.asarray(entries.expires_at) <= self.clock()] = -np.inf
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.settings.semantic_cache_similarity_threshold:
+                return None
+            hit = SemanticCacheHit(
+                question=entries.questions[best],
+                answer=entries.answers[best],
+                similarity=similarity,
+            )
+        logger.info(f"Semantic cache hit ({similarity:.3f}) for question: {question}")
+        return hit
+
+    def store(self, namespace: str, question: str, answer: str) -> None:
+        """Record the final answer to a question."""
+        import numpy as np
+
+        vector = self._embed(question)
+        now = self.clock()
+        with self._lock:
+            entries = self._namespaces.setdefault(namespace, _Namespace())
+            # A fresh answer to the same question replaces the cached one
+            if question in entries.questions:
+                entries.remove(np.array([q != question for q in entries.questions]))
+            if entries.vectors is None or not entries.questions:
+                entries.vectors = vector[None, :]
+            else:
+                entries.vectors = np.vstack([entries.vectors, vector])
+            entries.questions.append(question)
+            entries.answers.append(answer)
+            entries.expires_at.append(now + self.settings.semantic_cache_ttl_seconds)
+            # Drop expired entries, then the oldest ones beyond the size limit
+            keep = np.asarray(entries.expires_at) > now
+            overflow = int(keep.sum()) - self.settings.semantic_cache_max_entries
+            if overflow > 0:
+                keep[np.flatnonzero(keep)[:overflow]] = False
+            if not keep.all():
+                entries.remove(keep)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._namespaces.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries.questions) for entries in self._namespaces.values())
+
+
+@lru_cache
+def get_semantic_response_cache() -> SemanticResponseCache:
+    """Get the process-wide semantic response cache, embedding with Azure OpenAI."""
+    from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+
+    return SemanticResponseCache(embed=AzureOpenAiWrapper().create_embedding)
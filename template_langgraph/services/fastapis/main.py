@@ -1,8 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from template_langgraph.services.fastapis.routers import agents as agents_router
+from template_langgraph.tools.client_registry import get_client_registry
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release pooled tool clients on shutdown
+    get_client_registry().close_all()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 app.include_router(
@@ -1,10 +1,9 @@
 import logging
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from pydantic import BaseModel, ConfigDict
 
-from template_langgraph.agents.chat_with_tools_agent.agent import AgentState
-from template_langgraph.agents.chat_with_tools_agent.agent import graph as chat_with_tools_agent
+from template_langgraph.agents.chat_with_tools_agent.agent import AgentState, get_graph
 from template_langgraph.loggers import get_logger
 
 router = APIRouter()
@@ -31,9 +30,13 @@ class RunChatWithToolsAgentResponse(BaseModel):
 )
 async def run_chat_with_tools_agent(
     request: RunChatWithToolsAgentRequest,
+    x_semantic_cache_bypass: bool = Header(
+        default=False,
+        description="Skip the semantic response cache lookup for this request",
+    ),
 ) -> RunChatWithToolsAgentResponse:
     try:
-        async for event in chat_with_tools_agent.astream(
+        async for event in get_graph().astream(
             input=AgentState(
                 messages=[
                     {
@@ -44,10 +47,14 @@ async def run_chat_with_tools_agent(
             ),
             config={
                 "recursion_limit": 30,
+                "configurable": {
+                    "semantic_cache_bypass": x_semantic_cache_bypass,
+                },
             },
         ):
             logger.debug(f"Event received: {event}")
-        response = event["chat_with_tools"]["messages"][0].content
+        # The last event comes from chat_with_tools, or from semantic_cache on a cache hit
+        response = next(iter(event.values()))["messages"][-1].content
         return RunChatWithToolsAgentResponse(response=response)
     except Exception as e:
         logger.error(f"Error processing event: {e}")
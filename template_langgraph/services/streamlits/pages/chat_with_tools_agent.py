@@ -16,7 +16,6 @@ from langfuse.langchain import CallbackHandler
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.store.sqlite import SqliteStore
-from langgraph_checkpoint_cosmosdb import CosmosDBSaver
 
 from template_langgraph.agents.chat_with_tools_agent.agent import (
     AgentState,
@@ -118,6 +117,8 @@ def get_checkpointer():
         conn = sqlite3.connect("checkpoints.sqlite", check_same_thread=False)
         return SqliteSaver(conn=conn)
     if checkpoint_type is CheckpointType.COSMOSDB:
+        from langgraph_checkpoint_cosmosdb import CosmosDBSaver
+
         from template_langgraph.tools.cosmosdb_tool import get_cosmosdb_settings
 
         settings = get_cosmosdb_settings()
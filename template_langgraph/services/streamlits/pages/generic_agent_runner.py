@@ -5,7 +5,7 @@ from langchain_community.callbacks.streamlit import (
 from langgraph.graph.state import CompiledStateGraph
 
 from template_langgraph.agents.demo_agents.parallel_rag_agent.agent import ParallelRagAgent
-from template_langgraph.agents.demo_agents.weather_agent import graph as weather_agent_graph
+from template_langgraph.agents.demo_agents.weather_agent import get_graph as get_weather_agent_graph
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
 from template_langgraph.tools.common import get_default_tools
 
@@ -34,7 +34,7 @@ def _make_weather_graph(_tools=None):
         }
 
     return {
-        "graph": weather_agent_graph,
+        "graph": get_weather_agent_graph(),
         "build_input": build_input,
     }
 
@@ -1,7 +1,5 @@
 import logging
 
-import whisper
-
 from template_langgraph.loggers import get_logger
 
 logger = get_logger(
@@ -15,6 +13,9 @@ class SttWrapper:
         self.model = None
 
     def load_model(self, model_size: str):
+        # whisper pulls in torch, so it is only imported when a model is loaded
+        import whisper
+
         logger.info(f"Loading Whisper model: {model_size}")
         self.model = whisper.load_model(model_size)
 
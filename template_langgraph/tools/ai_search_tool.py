@@ -1,18 +1,27 @@
+from collections.abc import Iterable
 from functools import lru_cache
+from itertools import islice
 
 from langchain_community.vectorstores.azuresearch import AzureSearch
 from langchain_core.documents import Document
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+from template_langgraph.loggers import get_logger
+from template_langgraph.tools.client_registry import get_client_registry
+from template_langgraph.tools.result_caches import cache_results
+from template_langgraph.tools.single_flights import coalesce_calls
+
+logger = get_logger(__name__)
 
 
 class Settings(BaseSettings):
     ai_search_key: str = "<your-ai-search-key>"
     ai_search_endpoint: str = "<your-ai-search-endpoint>"
     ai_search_index_name: str = "<your-ai-index-name>"
+    ai_search_index_batch_size: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -27,6 +36,11 @@ def get_ai_search_settings() -> Settings:
     return Settings()
 
 
+def get_ai_search_target() -> str:
+    """Name of the configured index for ingestion manifests and index versions."""
+    return f"ai_search:{get_ai_search_settings().ai_search_index_name}"
+
+
 class AiSearchClientWrapper:
     def __init__(
         self,
@@ -34,20 +48,63 @@ class AiSearchClientWrapper:
     ):
         if settings is None:
             settings = get_ai_search_settings()
+        self.settings = settings
         self.vector_store: AzureSearch = AzureSearch(
             azure_search_endpoint=settings.ai_search_endpoint,
             azure_search_key=settings.ai_search_key,
             index_name=settings.ai_search_index_name,
-            embedding_function=AzureOpenAiWrapper().embedding_model.embed_query,
+            # Pass the embeddings object (not embed_query) so the async search path awaits aembed_query
+            embedding_function=AzureOpenAiWrapper().cached_embedding_model,
         )
 
+    def close(self) -> None:
+        """Close the underlying AI Search client."""
+        self.vector_store.client.close()
+
+    async def aclose(self) -> None:
+        """Close the underlying async AI Search client."""
+        await self.vector_store.async_client.close()
+
     def add_documents(
         self,
         documents: list[Document],
+        ids: list[str] | None = None,
     ) -> list[str]:
         """Add documents to a Cosmos DB container."""
         return self.vector_store.add_documents(
             documents=documents,
+            ids=ids,
+        )
+
+    def index_documents(
+        self,
+        documents: Iterable[Document],
+        batch_size: int | None = None,
+    ) -> int:
+        """Add documents in batches, keyed by ``metadata["chunk_id"]``, and return how many were added.
+
+        Documents are consumed lazily, so a generator keeps memory flat regardless of
+        corpus size.
+        """
+        batch_size = batch_size or self.settings.ai_search_index_batch_size
+        documents = iter(documents)
+        added = 0
+        while batch := list(islice(documents, batch_size)):
+            ids = self.add_documents(
+                documents=batch,
+                ids=[doc.metadata["chunk_id"] for doc in batch],
+            )
+            added += len(ids)
+            logger.debug(f"Added {added} documents so far")
+        return added
+
+    def delete_documents(
+        self,
+        ids: list[str],
+    ) -> bool | None:
+        """Delete documents from the AI Search index."""
+        return self.vector_store.delete(
+            ids=ids,
         )
 
     def similarity_search(
@@ -61,6 +118,41 @@ class AiSearchClientWrapper:
             k=k,  # Number of results to return
         )
 
+    async def asimilarity_search(
+        self,
+        query: str,
+        k: int = 5,
+    ) -> list[Document]:
+        """Asynchronously perform a similarity search in the AI Search index."""
+        return await self.vector_store.asimilarity_search(
+            query=query,
+            k=k,  # Number of results to return
+        )
+
+
+def get_ai_search_client_wrapper(settings: Settings = None) -> AiSearchClientWrapper:
+    """Get the pooled AiSearchClientWrapper for the given settings."""
+    if settings is None:
+        settings = get_ai_search_settings()
+    return get_client_registry().get_or_create(
+        backend="ai_search",
+        factory=lambda: AiSearchClientWrapper(settings=settings),
+        settings=settings,
+        close=AiSearchClientWrapper.close,
+    )
+
+
+def get_async_ai_search_client_wrapper(settings: Settings = None) -> AiSearchClientWrapper:
+    """Get the pooled AiSearchClientWrapper for async use on the running event loop."""
+    if settings is None:
+        settings = get_ai_search_settings()
+    return get_client_registry().get_or_create_for_loop(
+        backend="ai_search_async",
+        factory=lambda: AiSearchClientWrapper(settings=settings),
+        settings=settings,
+        aclose=AiSearchClientWrapper.aclose,
+    )
+
 
 class AiSearchInput(BaseModel):
     query: str = Field(
@@ -78,8 +170,21 @@ class AiSearchOutput(BaseModel):
     id: str = Field(description="ID of the document")
 
 
-@tool(args_schema=AiSearchInput)
-def search_ai_search(query: str, k: int = 5) -> list[AiSearchOutput]:
+def _to_outputs(documents: list[Document]) -> list[AiSearchOutput]:
+    outputs = []
+    for document in documents:
+        outputs.append(
+            {
+                "content": document.page_content,
+                "id": document.id,
+            }
+        )
+    return outputs
+
+
+@cache_results("search_ai_search", targets=lambda: [get_ai_search_target()])
+@coalesce_calls("search_ai_search")
+def _search_ai_search(query: str, k: int = 5) -> list[AiSearchOutput]:
     """Search for similar documents in AI Search index.
 
     Args:
@@ -89,17 +194,28 @@ def search_ai_search(query: str, k: int = 5) -> list[AiSearchOutput]:
     Returns:
         AiSearchOutput: A Pydantic model containing the search results
     """
-    wrapper = AiSearchClientWrapper()
+    wrapper = get_ai_search_client_wrapper()
     documents = wrapper.similarity_search(
         query=query,
         k=k,
     )
-    outputs = []
-    for document in documents:
-        outputs.append(
-            {
-                "content": document.page_content,
-                "id": document.id,
-            }
-        )
-    return outputs
+    return _to_outputs(documents)
+
+
+@cache_results("search_ai_search", targets=lambda: [get_ai_search_target()])
+@coalesce_calls("search_ai_search")
+async def _asearch_ai_search(query: str, k: int = 5) -> list[AiSearchOutput]:
+    wrapper = get_async_ai_search_client_wrapper()
+    documents = await wrapper.asimilarity_search(
+        query=query,
+        k=k,
+    )
+    return _to_outputs(documents)
+
+
+search_ai_search = StructuredTool.from_function(
+    func=_search_ai_search,
+    coroutine=_asearch_ai_search,
+    name="search_ai_search",
+    args_schema=AiSearchInput,
+)
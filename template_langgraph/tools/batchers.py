@@ -0,0 +1,179 @@
+"""Micro-batching of concurrent search calls.
+
+Fan-out agents such as ParallelRagAgent run many independent ``search_*`` calls at
+once, and each call would be its own embedding request and its own backend
+request. A ``MicroBatcher`` collects the calls that arrive within
+``search_batch_window_ms`` and runs them through one batch function: one
+embedding request for all query strings, then one ``query_batch_points`` or
+``msearch`` request. Each caller gets back its own result. With a window of 0, the
+default, every call runs on its own immediately.
+"""
+
+import asyncio
+import threading
+import weakref
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Generic, TypeVar
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class Settings(BaseSettings):
+    # How long the first call of a batch waits for others to join (0: no batching)
+    search_batch_window_ms: float = 0.0
+    search_batch_max_size: int = 32
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_batcher_settings() -> Settings:
+    """Get search batcher settings."""
+    return Settings()
+
+
+class _SyncBatch:
+    def __init__(self):
+        self.items: list = []
+        self.futures: list[Future] = []
+        self.full = threading.Event()
+
+
+class _AsyncBatch:
+    def __init__(self):
+        self.items: list = []
+        self.futures: list[asyncio.Future] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class MicroBatcher(Generic[K, V]):
+    """Run the calls that arrive within a short window as one batch call.
+
+    ``batch_fn`` and ``abatch_fn`` take the collected items and return one result per
+    item, in the same order. If the batch function raises or returns the wrong
+    number of results, every caller of that batch gets the exception. If the batch
+    is interrupted or cancelled, every caller's future is cancelled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list[K]], list[V]],
+        abatch_fn: Callable[[list[K]], Awaitable[list[V]]],
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_batcher_settings()
+        self.name = name
+        self.batch_fn = batch_fn
+        self.abatch_fn = abatch_fn
+        self.window_seconds = settings.search_batch_window_ms / 1000
+        self.max_size = max(1, settings.search_batch_max_size)
+        self._lock = threading.Lock()
+        self._sync_batch: _SyncBatch | None = None
+        # One open batch per event loop, since asyncio futures are bound to their loop
+        self._async_batches: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncBatch] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Strong references to running batch tasks, which the loop only holds weakly
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, item: K) -> V:
+        """Add an item to the open batch and block until its result is ready."""
+        if self.window_seconds <= 0:
+            return self.batch_fn([item])[0]
+        future: Future = Future()
+        with self._lock:
+            batch = self._sync_batch
+            leader = batch is None
+            if leader:
+                batch = self._sync_batch = _SyncBatch()
+            batch.items.append(item)
+            batch.futures.append(future)
+            if len(batch.items) >= self.max_size:
+                # Close the batch now so later calls start a new one
+                self._sync_batch = None
+                batch.full.set()
+        if leader:
+            batch.full.wait(self.window_seconds)
+            with self._lock:
+                if self._sync_batch is batch:
+                    self._sync_batch = None
+            self._run(batch.items, batch.futures)
+        return future.result()
+
+    async def asubmit(self, item: K) -> V:
+        """Add an item to the open batch of the running loop and await its result."""
+        if self.window_seconds <= 0:
+            return (await self.abatch_fn([item]))[0]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._async_batches.get(loop)
+        if batch is None:
+            batch = self._async_batches[loop] = _AsyncBatch()
+            batch.timer = loop.call_later(self.window_seconds, self._aflush, loop, batch)
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_size:
+            batch.timer.cancel()
+            self._aflush(loop, batch)
+        return await future
+
+    def _check(self, items: list[K], results: list[V]) -> list[V]:
+        if len(results) != len(items):
+            raise ValueError(f"{self.name}: batch function returned {len(results)} results for {len(items)} items")
+        return results
+
+    def _run(self, items: list[K], futures: list[Future]) -> None:
+        logger.debug(f"{self.name}: running a batch of {len(items)}")
+        try:
+            results = self._check(items, self.batch_fn(items))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        except BaseException:
+            # E.g. KeyboardInterrupt in the leader: release the other callers before re-raising
+            for future in futures:
+                future.cancel()
+            raise
+        for future, result in zip(futures, results):
+            future.set_result(result)
+
+    def _aflush(self, loop: asyncio.AbstractEventLoop, batch: _AsyncBatch) -> None:
+        if self._async_batches.get(loop) is batch:
+            del self._async_batches[loop]
+        task = loop.create_task(self._arun(batch.items, batch.futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _arun(self, items: list[K], futures: list[asyncio.Future]) -> None:
+        logger.debug(f"{self.name}: running a batch of {len(items)}")
+        try:
+            results = self._check(items, await self.abatch_fn(items))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # CancelledError when the task is cancelled, e.g. on loop shutdown
+            for future in futures:
+                future.cancel()
+            raise
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,306 @@
+"""Process-wide registry of long-lived backend clients for the tool wrappers.
+
+Tool functions such as ``search_qdrant`` are invoked once per tool call. Building a
+fresh SDK client on every call means paying TCP/TLS setup and SDK initialization
+each time, so the tools resolve their clients through this registry instead. One
+client is kept per (backend, settings) pair and reused until it fails a health
+check, sits idle for too long, or the process shuts down.
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+
+class Settings(BaseSettings):
+    client_registry_idle_timeout_seconds: float = 600.0
+    client_registry_health_check_interval_seconds: float = 60.0
+    # Replaced clients may still serve a call in another thread, so they are closed this much later
+    client_registry_close_grace_seconds: float = 300.0
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_client_registry_settings() -> Settings:
+    """Get client registry settings."""
+    return Settings()
+
+
+@dataclass
+class RegistryEntry:
+    backend: str
+    client: Any
+    health_check: Callable[[Any], bool] | None
+    close: Callable[[Any], None] | None
+    created_at: float
+    last_used_at: float
+    last_checked_at: float
+    loop: asyncio.AbstractEventLoop | None = None
+
+
+class ClientRegistry:
+    """Keep one client per (backend, settings) pair for the process lifetime.
+
+    The registry lock is never held while a client is built or health checked;
+    those run under a per-key lock, so a slow backend only delays its own callers.
+    Clients that fail a health check or go idle are dropped at once but closed only
+    after ``client_registry_close_grace_seconds``, since a call that resolved them
+    earlier may still be using them.
+    """
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_client_registry_settings()
+        self.settings = settings
+        self._entries: dict[tuple[str, str], RegistryEntry] = {}
+        self._retired: list[tuple[float, RegistryEntry]] = []
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(backend: str, settings: BaseSettings | None = None) -> tuple[str, str]:
+        """Build the registry key for a backend and its settings."""
+        return backend, settings.model_dump_json() if settings is not None else ""
+
+    def get_or_create(
+        self,
+        backend: str,
+        factory: Callable[[], Any],
+        settings: BaseSettings | None = None,
+        health_check: Callable[[Any], bool] | None = None,
+        close: Callable[[Any], None] | None = None,
+    ) -> Any:
+        """Return the pooled client for the backend, creating it on first use.
+
+        Args:
+            backend: Logical backend name, e.g. ``"qdrant"``.
+            factory: Callable building a new client.
+            settings: Settings the client was built from; part of the registry key.
+            health_check: Optional callable returning False when the client is unusable.
+            close: Optional callable releasing the client's resources.
+        """
+        return self._get_or_create(self.make_key(backend, settings), backend, factory, health_check, close)
+
+    def _get_or_create(
+        self,
+        key: tuple[str, str],
+        backend: str,
+        factory: Callable[[], Any],
+        health_check: Callable[[Any], bool] | None,
+        close: Callable[[Any], None] | None,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> Any:
+        now = time.monotonic()
+        self.evict_idle(now=now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_check_due(entry, now):
+                entry.last_used_at = now
+                return entry.client
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if entry is not None and not key_lock.acquire(blocking=False):
+            # Another caller is checking this client; keep using it meanwhile
+            return entry.client
+        if entry is None:
+            key_lock.acquire()
+        try:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and self._is_check_due(entry, now) and not self._is_healthy(entry, now):
+                logger.warning(f"Client for {backend} failed health check, recreating")
+                self._discard(key, entry)
+                entry = None
+            if entry is None:
+                logger.info(f"Creating pooled client for {backend}")
+                now = time.monotonic()
+                entry = RegistryEntry(
+                    backend=backend,
+                    client=factory(),
+                    health_check=health_check,
+                    close=close,
+                    created_at=now,
+                    last_used_at=now,
+                    last_checked_at=now,
+                    loop=loop,
+                )
+                with self._lock:
+                    self._entries[key] = entry
+            with self._lock:
+                entry.last_used_at = time.monotonic()
+            return entry.client
+        finally:
+            key_lock.release()
+
+    def get_or_create_for_loop(
+        self,
+        backend: str,
+        factory: Callable[[], Any],
+        settings: BaseSettings | None = None,
+        aclose: Callable[[Any], Awaitable[None]] | None = None,
+    ) -> Any:
+        """Return the pooled async client for the backend on the running event loop.
+
+        Async SDK clients hold connections bound to the loop they were first used on,
+        so async clients are pooled per event loop rather than per process. A client
+        is closed while its loop shuts down, e.g. at the end of ``asyncio.run``, and
+        clients of loops closed some other way are dropped on the next lookup.
+        """
+        loop = asyncio.get_running_loop()
+        self._drop_closed_loops()
+        backend = f"{backend}@{id(loop)}"
+        key = self.make_key(backend, settings)
+        if aclose is None:
+            return self._get_or_create(key, backend, factory, None, None, loop=loop)
+
+        watchers: dict[int, asyncio.Task] = {}
+
+        async def close_on_shutdown(client: Any) -> None:
+            try:
+                # Cancelled by the registry, or by asyncio.run cancelling the remaining tasks
+                await loop.create_future()
+            finally:
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry.client is client:
+                        del self._entries[key]
+                try:
+                    await aclose(client)
+                except Exception as e:
+                    logger.warning(f"Error closing client for {backend}: {e}")
+
+        def create() -> Any:
+            client = factory()
+            # Tasks are only weakly referenced by the loop, so the registry keeps the watcher alive
+            watchers[id(client)] = loop.create_task(close_on_shutdown(client))
+            return client
+
+        def close(client: Any) -> None:
+            watcher = watchers.pop(id(client), None)
+            if watcher is None or loop.is_closed():
+                return
+            if loop.is_running():
+                loop.call_soon_threadsafe(watcher.cancel)
+            else:
+                watcher.cancel()
+                loop.run_until_complete(asyncio.gather(watcher, return_exceptions=True))
+
+        return self._get_or_create(key, backend, create, None, close, loop=loop)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop clients idle for longer than the configured timeout and close retired ones."""
+        if now is None:
+            now = time.monotonic()
+        timeout = self.settings.client_registry_idle_timeout_seconds
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if now - entry.last_used_at > timeout]
+            for key in expired:
+                entry = self._entries.pop(key)
+                logger.info(f"Evicting idle client for {entry.backend}")
+                self._retired.append((now, entry))
+            closable = self._pop_retired(now)
+        for entry in closable:
+            self._close_entry(entry)
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Close every pooled client. Registered as an ``atexit`` hook."""
+        with self._lock:
+            entries = list(self._entries.values()) + [entry for _, entry in self._retired]
+            self._entries.clear()
+            self._retired.clear()
+        for entry in entries:
+            self._close_entry(entry)
+
+    def stats(self) -> list[dict]:
+        """Describe the live clients: backend, age and idle time in seconds."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "backend": entry.backend,
+                    "age_seconds": now - entry.created_at,
+                    "idle_seconds": now - entry.last_used_at,
+                }
+                for entry in self._entries.values()
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _discard(self, key: tuple[str, str], entry: RegistryEntry) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            self._retired.append((now, entry))
+            closable = self._pop_retired(now)
+        for retired in closable:
+            self._close_entry(retired)
+
+    def _pop_retired(self, now: float) -> list[RegistryEntry]:
+        grace = self.settings.client_registry_close_grace_seconds
+        closable = [entry for retired_at, entry in self._retired if now - retired_at >= grace]
+        self._retired = [(retired_at, entry) for retired_at, entry in self._retired if now - retired_at < grace]
+        return closable
+
+    def _drop_closed_loops(self) -> None:
+        # Their clients cannot be closed any more, and id() of a closed loop may be reused by a new one
+        with self._lock:
+            closed = [key for key, entry in self._entries.items() if entry.loop is not None and entry.loop.is_closed()]
+            for key in closed:
+                logger.info(f"Dropping client for {self._entries.pop(key).backend} of a closed event loop")
+            self._retired = [
+                (retired_at, entry)
+                for retired_at, entry in self._retired
+                if entry.loop is None or not entry.loop.is_closed()
+            ]
+
+    def _is_check_due(self, entry: RegistryEntry, now: float) -> bool:
+        if entry.health_check is None:
+            return False
+        return now - entry.last_checked_at >= self.settings.client_registry_health_check_interval_seconds
+
+    def _is_healthy(self, entry: RegistryEntry, now: float) -> bool:
+        entry.last_checked_at = now
+        try:
+            return bool(entry.health_check(entry.client))
+        except Exception as e:
+            logger.warning(f"Health check for {entry.backend} raised: {e}")
+            return False
+
+    @staticmethod
+    def _close_entry(entry: RegistryEntry) -> None:
+        if entry.close is None:
+            return
+        try:
+            entry.close(entry.client)
+        except Exception as e:
+            logger.warning(f"Error closing client for {entry.backend}: {e}")
+
+
+@lru_cache
+def get_client_registry() -> ClientRegistry:
+    """Get the process-wide client registry."""
+    registry = ClientRegistry()
+    atexit.register(registry.close_all)
+    return registry
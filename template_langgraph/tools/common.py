@@ -1,35 +1,116 @@
-from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+import threading
+from collections.abc import Callable
+from functools import lru_cache
+
+from langchain_core.tools.base import BaseTool
+
 from template_langgraph.loggers import get_logger
-from template_langgraph.tools.ai_search_tool import search_ai_search
-from template_langgraph.tools.cosmosdb_tool import search_cosmosdb
-from template_langgraph.tools.dify_tool import run_dify_workflow
-from template_langgraph.tools.elasticsearch_tool import search_elasticsearch
-from template_langgraph.tools.mcp_tool import McpClientWrapper
-from template_langgraph.tools.qdrant_tool import search_qdrant
-from template_langgraph.tools.sql_database_tool import SqlDatabaseClientWrapper
 
 logger = get_logger(__name__)
-mcp_tools = McpClientWrapper().get_tools()
-
-
-def get_default_tools():
-    return (
-        [
-            search_ai_search,
-            search_cosmosdb,
-            run_dify_workflow,
-            search_qdrant,
-            search_elasticsearch,
-        ]
-        + SqlDatabaseClientWrapper().get_tools(
-            llm=AzureOpenAiWrapper().chat_model,
-        )
-        + mcp_tools
+
+
+def load_search_tools() -> list[BaseTool]:
+    from template_langgraph.tools.ai_search_tool import search_ai_search
+    from template_langgraph.tools.cosmosdb_tool import search_cosmosdb
+    from template_langgraph.tools.dify_tool import run_dify_workflow
+    from template_langgraph.tools.elasticsearch_tool import search_elasticsearch
+    from template_langgraph.tools.hybrid_search_tool import search_hybrid
+    from template_langgraph.tools.qdrant_tool import search_qdrant
+
+    return [
+        search_ai_search,
+        search_cosmosdb,
+        run_dify_workflow,
+        search_qdrant,
+        search_elasticsearch,
+        search_hybrid,
+    ]
+
+
+def load_sql_database_tools() -> list[BaseTool]:
+    from template_langgraph.tools.sql_database_tool import SqlDatabaseClientWrapper, get_sql_database_settings
+
+    # Skip building the chat model when no database is configured
+    if get_sql_database_settings().sql_database_uri == "":
+        return []
+
+    from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+
+    return SqlDatabaseClientWrapper().get_tools(
+        llm=AzureOpenAiWrapper().chat_model,
     )
 
 
+def load_mcp_tools() -> list[BaseTool]:
+    from template_langgraph.tools.mcp_tool import McpClientWrapper
+
+    return McpClientWrapper().get_tools()
+
+
+DEFAULT_TOOL_PROVIDERS: list[Callable[[], list[BaseTool]]] = [
+    load_search_tools,
+    load_sql_database_tools,
+    load_mcp_tools,
+]
+
+
+class ToolRegistry:
+    """Resolve tools from their providers on first use and cache the result.
+
+    Importing this module no longer imports the tool SDKs, connects to MCP
+    servers or builds the SQL toolkit; that happens the first time the tools
+    are requested, once per process.
+    """
+
+    def __init__(
+        self,
+        providers: list[Callable[[], list[BaseTool]]] = None,
+    ):
+        if providers is None:
+            providers = DEFAULT_TOOL_PROVIDERS
+        self.providers = providers
+        self._tools: list[BaseTool] | None = None
+        self._async_only_tool_names: frozenset[str] = frozenset()
+        self._lock = threading.Lock()
+
+    def get_tools(self) -> list[BaseTool]:
+        """Return the resolved tools, resolving the providers on first call."""
+        if self._tools is None:
+            with self._lock:
+                if self._tools is None:
+                    tools = []
+                    for provider in self.providers:
+                        tools.extend(provider())
+                    logger.info(f"Resolved {len(tools)} tools")
+                    self._async_only_tool_names = frozenset(
+                        tool.name for tool in tools if getattr(tool, "func", None) is None
+                    )
+                    self._tools = tools
+        return list(self._tools)
+
+    def is_async_call_required(self, tool_name: str) -> bool:
+        """Return True if the tool only has a coroutine implementation.
+
+        This does not resolve the tools: nothing is async-only until they are.
+        """
+        return tool_name in self._async_only_tool_names
+
+    def clear(self) -> None:
+        """Drop the resolved tools so the next call resolves them again."""
+        with self._lock:
+            self._tools = None
+            self._async_only_tool_names = frozenset()
+
+
+@lru_cache
+def get_tool_registry() -> ToolRegistry:
+    """Get the process-wide tool registry."""
+    return ToolRegistry()
+
+
+def get_default_tools() -> list[BaseTool]:
+    return get_tool_registry().get_tools()
+
+
 def is_async_call_required(tool_name: str) -> bool:
-    mcp_tool_names = [tool.name for tool in mcp_tools]
-    return tool_name in [
-        *mcp_tool_names,
-    ]
+    return get_tool_registry().is_async_call_required(tool_name)
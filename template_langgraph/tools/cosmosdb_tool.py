@@ -1,13 +1,24 @@
+from collections.abc import Iterable
 from functools import lru_cache
+from itertools import islice
 
-from azure.cosmos import CosmosClient, PartitionKey
+from azure.cosmos import ContainerProxy, CosmosClient, PartitionKey
+from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.partition_key import NonePartitionKeyValue
 from langchain_azure_ai.vectorstores.azure_cosmos_db_no_sql import AzureCosmosDBNoSqlVectorSearch
 from langchain_core.documents import Document
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+from template_langgraph.loggers import get_logger
+from template_langgraph.tools.client_registry import get_client_registry
+from template_langgraph.tools.result_caches import cache_results
+from template_langgraph.tools.single_flights import coalesce_calls
+
+logger = get_logger(__name__)
 
 
 class Settings(BaseSettings):
@@ -16,6 +27,7 @@ class Settings(BaseSettings):
     cosmosdb_database_name: str = "template_langgraph"
     cosmosdb_container_name: str = "kabuto"
     cosmosdb_partition_key: str = "/id"
+    cosmosdb_index_batch_size: int = 100
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -30,6 +42,44 @@ def get_cosmosdb_settings() -> Settings:
     return Settings()
 
 
+def get_cosmosdb_target() -> str:
+    """Name of the configured container for ingestion manifests and index versions."""
+    settings = get_cosmosdb_settings()
+    return f"cosmosdb:{settings.cosmosdb_database_name}:{settings.cosmosdb_container_name}"
+
+
+def delete_items(container: ContainerProxy, ids: list[str], partition_key_path: str, batch_size: int = 100) -> int:
+    """Delete items by id from a container, returning how many were deleted.
+
+    ``delete_item`` needs the partition key value each item is stored under, so it is
+    read from ``partition_key_path`` (e.g. ``/id`` or ``/metadata/source``) first.
+    Items that are already gone are skipped.
+    """
+    parts = partition_key_path.strip("/").split("/")
+    if parts == ["id"]:
+        partition_keys = {id: id for id in ids}
+    else:
+        field = "c" + "".join(f'["{part}"]' for part in parts)
+        partition_keys = {}
+        for start in range(0, len(ids), batch_size):
+            items = container.query_items(
+                query=f"SELECT c.id, {field} AS partition_key FROM c WHERE ARRAY_CONTAINS(@ids, c.id)",
+                parameters=[{"name": "@ids", "value": ids[start : start + batch_size]}],
+                enable_cross_partition_query=True,
+            )
+            for item in items:
+                # Items without a value at the path are stored under the "none" partition key
+                partition_keys[item["id"]] = item.get("partition_key", NonePartitionKeyValue)
+    deleted = 0
+    for id, partition_key in partition_keys.items():
+        try:
+            container.delete_item(item=id, partition_key=partition_key)
+        except CosmosResourceNotFoundError:
+            continue
+        deleted += 1
+    return deleted
+
+
 class CosmosdbClientWrapper:
     def __init__(
         self,
@@ -37,12 +87,14 @@ class CosmosdbClientWrapper:
     ):
         if settings is None:
             settings = get_cosmosdb_settings()
+        self.settings = settings
+        self.cosmos_client = CosmosClient(
+            url=settings.cosmosdb_host,
+            credential=settings.cosmosdb_key,
+        )
         self.vector_store = AzureCosmosDBNoSqlVectorSearch(
-            cosmos_client=CosmosClient(
-                url=settings.cosmosdb_host,
-                credential=settings.cosmosdb_key,
-            ),
-            embedding=AzureOpenAiWrapper().embedding_model,
+            cosmos_client=self.cosmos_client,
+            embedding=AzureOpenAiWrapper().cached_embedding_model,
             vector_embedding_policy={
                 "vectorEmbeddings": [
                     {
@@ -89,23 +141,53 @@ class CosmosdbClientWrapper:
             container_name=settings.cosmosdb_container_name,
         )
 
+    def close(self) -> None:
+        """Close the underlying Cosmos DB client."""
+        self.cosmos_client.__exit__(None, None, None)
+
     def add_documents(
         self,
         documents: list[Document],
+        ids: list[str] | None = None,
     ) -> list[str]:
         """Add documents to a Cosmos DB container."""
         return self.vector_store.add_documents(
             documents=documents,
+            ids=ids,
         )
 
+    def index_documents(
+        self,
+        documents: Iterable[Document],
+        batch_size: int | None = None,
+    ) -> int:
+        """Add documents in batches, keyed by ``metadata["chunk_id"]``, and return how many were added.
+
+        Documents are consumed lazily, so a generator keeps memory flat regardless of
+        corpus size.
+        """
+        batch_size = batch_size or self.settings.cosmosdb_index_batch_size
+        documents = iter(documents)
+        added = 0
+        while batch := list(islice(documents, batch_size)):
+            ids = self.add_documents(
+                documents=batch,
+                ids=[doc.metadata["chunk_id"] for doc in batch],
+            )
+            added += len(ids)
+            logger.debug(f"Added {added} documents so far")
+        return added
+
     def delete_documents(
         self,
         ids: list[str],
-    ) -> bool | None:
+    ) -> int:
         """Delete documents from a Cosmos DB container."""
-        return self.vector_store.delete(
-            ids=ids,
+        # AzureCosmosDBNoSqlVectorSearch.delete passes the partition key definition instead of its value
+        container = self.cosmos_client.get_database_client(self.settings.cosmosdb_database_name).get_container_client(
+            self.settings.cosmosdb_container_name
         )
+        return delete_items(container, ids, self.settings.cosmosdb_partition_key)
 
     def similarity_search(
         self,
@@ -119,6 +201,80 @@ class CosmosdbClientWrapper:
         )
 
 
+class AsyncCosmosdbClientWrapper:
+    """Async similarity search over the container populated by CosmosdbClientWrapper.
+
+    The langchain vector store only ships a sync implementation, so this queries the
+    container directly with the aio Cosmos client using the same vector/text fields.
+    """
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_cosmosdb_settings()
+        self.client = AsyncCosmosClient(
+            url=settings.cosmosdb_host,
+            credential=settings.cosmosdb_key,
+        )
+        self.container = self.client.get_database_client(settings.cosmosdb_database_name).get_container_client(
+            settings.cosmosdb_container_name
+        )
+        self.embedding_model = AzureOpenAiWrapper().cached_embedding_model
+
+    async def close(self) -> None:
+        """Close the underlying Cosmos DB client."""
+        await self.client.close()
+
+    async def similarity_search(
+        self,
+        query: str,
+        k: int = 5,
+    ) -> list[Document]:
+        """Perform a similarity search in the Cosmos DB index."""
+        embedding = await self.embedding_model.aembed_query(query)
+        items = self.container.query_items(
+            query="SELECT TOP @k c.id, c.text, c.metadata FROM c ORDER BY VectorDistance(c.embedding, @embedding)",
+            parameters=[
+                {"name": "@k", "value": k},
+                {"name": "@embedding", "value": embedding},
+            ],
+        )
+        return [
+            Document(
+                id=item["id"],
+                page_content=item["text"],
+                metadata=item.get("metadata") or {},
+            )
+            async for item in items
+        ]
+
+
+def get_cosmosdb_client_wrapper(settings: Settings = None) -> CosmosdbClientWrapper:
+    """Get the pooled CosmosdbClientWrapper for the given settings."""
+    if settings is None:
+        settings = get_cosmosdb_settings()
+    return get_client_registry().get_or_create(
+        backend="cosmosdb",
+        factory=lambda: CosmosdbClientWrapper(settings=settings),
+        settings=settings,
+        close=CosmosdbClientWrapper.close,
+    )
+
+
+def get_async_cosmosdb_client_wrapper(settings: Settings = None) -> AsyncCosmosdbClientWrapper:
+    """Get the pooled AsyncCosmosdbClientWrapper for the running event loop."""
+    if settings is None:
+        settings = get_cosmosdb_settings()
+    return get_client_registry().get_or_create_for_loop(
+        backend="cosmosdb_async",
+        factory=lambda: AsyncCosmosdbClientWrapper(settings=settings),
+        settings=settings,
+        aclose=AsyncCosmosdbClientWrapper.close,
+    )
+
+
 class CosmosdbInput(BaseModel):
     query: str = Field(
         default="禅モード",
@@ -135,8 +291,21 @@ class CosmosdbOutput(BaseModel):
     id: str = Field(description="ID of the document")
 
 
-@tool(args_schema=CosmosdbInput)
-def search_cosmosdb(query: str, k: int = 5) -> list[CosmosdbOutput]:
+def _to_outputs(documents: list[Document]) -> list[CosmosdbOutput]:
+    outputs = []
+    for document in documents:
+        outputs.append(
+            {
+                "content": document.page_content,
+                "id": document.id,
+            }
+        )
+    return outputs
+
+
+@cache_results("search_cosmosdb", targets=lambda: [get_cosmosdb_target()])
+@coalesce_calls("search_cosmosdb")
+def _search_cosmosdb(query: str, k: int = 5) -> list[CosmosdbOutput]:
     """Search for similar documents in CosmosDB vector store.
 
     Args:
@@ -146,17 +315,28 @@ def search_cosmosdb(query: str, k: int = 5) -> list[CosmosdbOutput]:
     Returns:
         CosmosdbOutput: A Pydantic model containing the search results
     """
-    wrapper = CosmosdbClientWrapper()
+    wrapper = get_cosmosdb_client_wrapper()
     documents = wrapper.similarity_search(
         query=query,
         k=k,
     )
-    outputs = []
-    for document in documents:
-        outputs.append(
-            {
-                "content": document.page_content,
-                "id": document.id,
-            }
-        )
-    return outputs
+    return _to_outputs(documents)
+
+
+@cache_results("search_cosmosdb", targets=lambda: [get_cosmosdb_target()])
+@coalesce_calls("search_cosmosdb")
+async def _asearch_cosmosdb(query: str, k: int = 5) -> list[CosmosdbOutput]:
+    wrapper = get_async_cosmosdb_client_wrapper()
+    documents = await wrapper.similarity_search(
+        query=query,
+        k=k,
+    )
+    return _to_outputs(documents)
+
+
+search_cosmosdb = StructuredTool.from_function(
+    func=_search_cosmosdb,
+    coroutine=_asearch_cosmosdb,
+    name="search_cosmosdb",
+    args_schema=CosmosdbInput,
+)
@@ -1,10 +1,12 @@
 from functools import lru_cache
 
 import httpx
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from template_langgraph.tools.client_registry import get_client_registry
+
 
 class Settings(BaseSettings):
     dify_base_url: str = "https://api.dify.ai/v1"
@@ -35,21 +37,82 @@ class DifyClientWrapper:
             "Authorization": f"Bearer {settings.dify_api_key}",
             "Content-Type": "application/json",
         }
+        self.client = httpx.Client()
+
+    def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        self.client.close()
 
     def run_workflow(
         self,
         inputs: dict,
     ) -> dict:
         """Run a Dify workflow."""
-        with httpx.Client() as client:
-            response = client.post(
-                url=f"{self.base_url}/workflows/run",
-                json=inputs,
-                headers=self.headers,
-                timeout=60 * 5,  # Set a timeout for the request
-            )
-            response.raise_for_status()
-            return response.json()
+        response = self.client.post(
+            url=f"{self.base_url}/workflows/run",
+            json=inputs,
+            headers=self.headers,
+            timeout=60 * 5,  # Set a timeout for the request
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class AsyncDifyClientWrapper:
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_dify_settings()
+        self.base_url = settings.dify_base_url
+        self.headers = {
+            "Authorization": f"Bearer {settings.dify_api_key}",
+            "Content-Type": "application/json",
+        }
+        self.client = httpx.AsyncClient()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self.client.aclose()
+
+    async def run_workflow(
+        self,
+        inputs: dict,
+    ) -> dict:
+        """Run a Dify workflow."""
+        response = await self.client.post(
+            url=f"{self.base_url}/workflows/run",
+            json=inputs,
+            headers=self.headers,
+            timeout=60 * 5,  # Set a timeout for the request
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+def get_dify_client_wrapper(settings: Settings = None) -> DifyClientWrapper:
+    """Get the pooled DifyClientWrapper for the given settings."""
+    if settings is None:
+        settings = get_dify_settings()
+    return get_client_registry().get_or_create(
+        backend="dify",
+        factory=lambda: DifyClientWrapper(settings=settings),
+        settings=settings,
+        close=DifyClientWrapper.close,
+    )
+
+
+def get_async_dify_client_wrapper(settings: Settings = None) -> AsyncDifyClientWrapper:
+    """Get the pooled AsyncDifyClientWrapper for the running event loop."""
+    if settings is None:
+        settings = get_dify_settings()
+    return get_client_registry().get_or_create_for_loop(
+        backend="dify_async",
+        factory=lambda: AsyncDifyClientWrapper(settings=settings),
+        settings=settings,
+        aclose=AsyncDifyClientWrapper.close,
+    )
 
 
 class DifyWorkflowInput(BaseModel):
@@ -63,23 +126,45 @@ class DifyWorkflowOutput(BaseModel):
     response: dict = Field(description="Output data from the Dify workflow")
 
 
-@tool(args_schema=DifyWorkflowInput)
-def run_dify_workflow(
+def _build_workflow_inputs(requirements: str) -> dict:
+    return {
+        "inputs": {
+            "requirements": requirements,
+        },
+        "response_mode": "blocking",
+        "user": "abc-123",
+    }
+
+
+def _run_dify_workflow(
     requirements: str = "生成 AI のサービス概要を教えてください。日本語でお願いします",
 ) -> DifyWorkflowOutput:
     """
     Difyワークフローを実行します。
     指定された入力パラメータでワークフローを実行し、結果を返します。
     """
-    wrapper = DifyClientWrapper()
+    wrapper = get_dify_client_wrapper()
     response = wrapper.run_workflow(
-        inputs={
-            "inputs": {
-                "requirements": requirements,
-            },
-            "response_mode": "blocking",
-            "user": "abc-123",
-        }
+        inputs=_build_workflow_inputs(requirements),
     )
 
     return DifyWorkflowOutput(response=response)
+
+
+async def _arun_dify_workflow(
+    requirements: str = "生成 AI のサービス概要を教えてください。日本語でお願いします",
+) -> DifyWorkflowOutput:
+    wrapper = get_async_dify_client_wrapper()
+    response = await wrapper.run_workflow(
+        inputs=_build_workflow_inputs(requirements),
+    )
+
+    return DifyWorkflowOutput(response=response)
+
+
+run_dify_workflow = StructuredTool.from_function(
+    func=_run_dify_workflow,
+    coroutine=_arun_dify_workflow,
+    name="run_dify_workflow",
+    args_schema=DifyWorkflowInput,
+)
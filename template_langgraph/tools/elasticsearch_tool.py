@@ -1,15 +1,29 @@
 import os
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from functools import lru_cache
 
-from elasticsearch import Elasticsearch, helpers
-from langchain.tools import tool
+from elasticsearch import AsyncElasticsearch, Elasticsearch, helpers
 from langchain_core.documents import Document
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from template_langgraph.loggers import get_logger
+from template_langgraph.tools.batchers import MicroBatcher
+from template_langgraph.tools.client_registry import get_client_registry
+from template_langgraph.tools.rerankers import get_reranker
+from template_langgraph.tools.result_caches import cache_results
+from template_langgraph.tools.single_flights import coalesce_calls
+
+logger = get_logger(__name__)
+
 
 class Settings(BaseSettings):
     elasticsearch_url: str = "http://localhost:9200"
+    elasticsearch_bulk_chunk_size: int = 500
+    elasticsearch_bulk_thread_count: int = 4
+    elasticsearch_bulk_max_chunk_bytes: int = 100 * 1024 * 1024
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -24,6 +38,12 @@ def get_elasticsearch_settings() -> Settings:
     return Settings()
 
 
+@dataclass
+class BulkIndexResult:
+    success: int = 0
+    failed: list[dict] = field(default_factory=list)
+
+
 class ElasticsearchClientWrapper:
     def __init__(
         self,
@@ -31,6 +51,7 @@ class ElasticsearchClientWrapper:
     ):
         if settings is None:
             settings = get_elasticsearch_settings()
+        self.settings = settings
         self.client = Elasticsearch(
             settings.elasticsearch_url,
         )
@@ -81,6 +102,14 @@ class ElasticsearchClientWrapper:
             },
         }
 
+    def ping(self) -> bool:
+        """Check that the Elasticsearch cluster is reachable."""
+        return self.client.ping()
+
+    def close(self) -> None:
+        """Close the underlying Elasticsearch transport."""
+        self.client.close()
+
     def create_index(self, index_name: str) -> bool:
         """Create an index in Elasticsearch."""
         if not self.client.indices.exists(index=index_name):
@@ -99,21 +128,113 @@ class ElasticsearchClientWrapper:
     def add_documents(
         self,
         index_name: str,
-        documents: list[Document],
+        documents: Iterable[Document],
     ) -> bool:
         """Add documents to an Elasticsearch index."""
-        actions = [
-            {
+        result = self.index_documents(
+            index_name=index_name,
+            documents=documents,
+        )
+        return result.success > 0
+
+    def index_documents(
+        self,
+        index_name: str,
+        documents: Iterable[Document],
+        chunk_size: int | None = None,
+        thread_count: int | None = None,
+        max_chunk_bytes: int | None = None,
+    ) -> BulkIndexResult:
+        """Stream documents into an index with the bulk helpers.
+
+        Documents are consumed lazily, so a generator keeps memory flat regardless of
+        corpus size. Refresh is disabled while loading and restored afterwards, and
+        documents that fail are reported instead of aborting the load.
+        """
+        chunk_size = chunk_size or self.settings.elasticsearch_bulk_chunk_size
+        thread_count = thread_count or self.settings.elasticsearch_bulk_thread_count
+        max_chunk_bytes = max_chunk_bytes or self.settings.elasticsearch_bulk_max_chunk_bytes
+
+        self.create_index(index_name)
+        refresh_interval = self._get_refresh_interval(index_name)
+        self._set_refresh_interval(index_name, "-1")
+        result = BulkIndexResult()
+        try:
+            actions = self._to_actions(index_name, documents)
+            if thread_count > 1:
+                responses = helpers.parallel_bulk(
+                    self.client,
+                    actions,
+                    thread_count=thread_count,
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                )
+            else:
+                responses = helpers.streaming_bulk(
+                    self.client,
+                    actions,
+                    chunk_size=chunk_size,
+                    max_chunk_bytes=max_chunk_bytes,
+                    raise_on_error=False,
+                    raise_on_exception=False,
+                )
+            for ok, item in responses:
+                if ok:
+                    result.success += 1
+                else:
+                    logger.warning(f"Failed to index document: {item}")
+                    result.failed.append(item)
+        finally:
+            self._set_refresh_interval(index_name, refresh_interval)
+            self.client.indices.refresh(index=index_name)
+        return result
+
+    def delete_documents(
+        self,
+        index_name: str,
+        ids: list[str],
+    ) -> BulkIndexResult:
+        """Delete documents from an index by id, ignoring ids that are already gone."""
+        result = BulkIndexResult()
+        actions = ({"_op_type": "delete", "_index": index_name, "_id": id} for id in ids)
+        for ok, item in helpers.streaming_bulk(
+            self.client,
+            actions,
+            chunk_size=self.settings.elasticsearch_bulk_chunk_size,
+            raise_on_error=False,
+            ignore_status=404,
+        ):
+            if ok:
+                result.success += 1
+            else:
+                logger.warning(f"Failed to delete document: {item}")
+                result.failed.append(item)
+        return result
+
+    @staticmethod
+    def _to_actions(index_name: str, documents: Iterable[Document]) -> Iterator[dict]:
+        for doc in documents:
+            action = {
                 "_index": index_name,
                 "_source": {
                     "filename": os.path.basename(doc.metadata.get("source", "unknown")),
                     "content": doc.page_content,
                 },
             }
-            for doc in documents
-        ]
-        success, _ = helpers.bulk(self.client, actions)
-        return success > 0
+            # Stable ids let incremental ingestion overwrite and delete chunks
+            if "chunk_id" in doc.metadata:
+                action["_id"] = doc.metadata["chunk_id"]
+            yield action
+
+    def _get_refresh_interval(self, index_name: str) -> str | None:
+        response = self.client.indices.get_settings(index=index_name, name="index.refresh_interval")
+        return response.get(index_name, {}).get("settings", {}).get("index", {}).get("refresh_interval")
+
+    def _set_refresh_interval(self, index_name: str, refresh_interval: str | None) -> None:
+        # None resets the index to the cluster default
+        self.client.indices.put_settings(index=index_name, settings={"index": {"refresh_interval": refresh_interval}})
 
     def search(
         self,
@@ -122,27 +243,132 @@ class ElasticsearchClientWrapper:
         max_results: int = 10,
     ) -> list[Document]:
         """Search documents in an Elasticsearch index."""
-        search_query = {
-            "query": {
-                "match": {
-                    "content": query,
-                }
-            },
-            "size": max_results,
-        }
         response = self.client.search(
             index=index_name,
-            body=search_query,
+            body=build_search_query(query=query, max_results=max_results),
         )
-        return [
-            Document(
-                page_content=hit["_source"]["content"],
-                metadata={
-                    "source": hit["_source"]["filename"],
-                },
-            )
-            for hit in response["hits"]["hits"]
-        ]
+        return hits_to_documents(response)
+
+    def msearch(
+        self,
+        index_name: str,
+        queries: list[str],
+        max_results: int = 10,
+    ) -> list[list[Document]]:
+        """Search several queries in one multi-search request, one result list per query."""
+        response = self.client.msearch(searches=build_msearch_body(index_name, queries, max_results))
+        return msearch_to_documents(response)
+
+
+class AsyncElasticsearchClientWrapper:
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_elasticsearch_settings()
+        # httpx is already a dependency, so use it instead of requiring aiohttp
+        self.client = AsyncElasticsearch(
+            settings.elasticsearch_url,
+            node_class="httpxasync",
+        )
+
+    async def close(self) -> None:
+        """Close the underlying Elasticsearch transport."""
+        await self.client.close()
+
+    async def search(
+        self,
+        index_name: str,
+        query: str,
+        max_results: int = 10,
+    ) -> list[Document]:
+        """Search documents in an Elasticsearch index."""
+        response = await self.client.search(
+            index=index_name,
+            body=build_search_query(query=query, max_results=max_results),
+        )
+        return hits_to_documents(response)
+
+    async def msearch(
+        self,
+        index_name: str,
+        queries: list[str],
+        max_results: int = 10,
+    ) -> list[list[Document]]:
+        """Search several queries in one multi-search request, one result list per query."""
+        response = await self.client.msearch(searches=build_msearch_body(index_name, queries, max_results))
+        return msearch_to_documents(response)
+
+
+def build_search_query(query: str, max_results: int = 10) -> dict:
+    """Build the full-text match query used against the ``content`` field."""
+    return {
+        "query": {
+            "match": {
+                "content": query,
+            }
+        },
+        "size": max_results,
+    }
+
+
+def hits_to_documents(response) -> list[Document]:
+    """Convert an Elasticsearch search response into documents."""
+    return [
+        Document(
+            page_content=hit["_source"]["content"],
+            metadata={
+                "source": hit["_source"]["filename"],
+                "score": hit.get("_score"),
+            },
+        )
+        for hit in response["hits"]["hits"]
+    ]
+
+
+def build_msearch_body(index_name: str, queries: list[str], max_results: int = 10) -> list[dict]:
+    """Build the header and body lines of a multi-search request."""
+    searches = []
+    for query in queries:
+        searches.append({"index": index_name})
+        searches.append(build_search_query(query=query, max_results=max_results))
+    return searches
+
+
+def msearch_to_documents(response) -> list[list[Document]]:
+    """Convert a multi-search response into documents, raising if any search failed."""
+    results = []
+    for item in response["responses"]:
+        if "error" in item:
+            raise RuntimeError(f"Elasticsearch multi-search failed: {item['error']}")
+        results.append(hits_to_documents(item))
+    return results
+
+
+def get_elasticsearch_client_wrapper(settings: Settings = None) -> ElasticsearchClientWrapper:
+    """Get the pooled ElasticsearchClientWrapper for the given settings."""
+    if settings is None:
+        settings = get_elasticsearch_settings()
+    return get_client_registry().get_or_create(
+        backend="elasticsearch",
+        factory=lambda: ElasticsearchClientWrapper(settings=settings),
+        settings=settings,
+        health_check=ElasticsearchClientWrapper.ping,
+        close=ElasticsearchClientWrapper.close,
+    )
+
+
+def get_async_elasticsearch_client_wrapper(settings: Settings = None) -> AsyncElasticsearchClientWrapper:
+    """Get the pooled AsyncElasticsearchClientWrapper for the running event loop."""
+    if settings is None:
+        settings = get_elasticsearch_settings()
+    return get_client_registry().get_or_create_for_loop(
+        backend="elasticsearch_async",
+        factory=lambda: AsyncElasticsearchClientWrapper(settings=settings),
+        settings=settings,
+        aclose=AsyncElasticsearchClientWrapper.close,
+    )
 
 
 class ElasticsearchInput(BaseModel):
@@ -154,25 +380,69 @@ class ElasticsearchOutput(BaseModel):
     content: str = Field(description="The content of the file")
 
 
-@tool(args_schema=ElasticsearchInput)
-def search_elasticsearch(
+def _to_outputs(results: list[Document]) -> list[ElasticsearchOutput]:
+    return [
+        ElasticsearchOutput(
+            file_name=result.metadata["source"],
+            content=result.page_content,
+        )
+        for result in results
+    ]
+
+
+def _search_elasticsearch_batch(keywords: list[str]) -> list[list[ElasticsearchOutput]]:
+    """Search all keywords with one multi-search request."""
+    reranker = get_reranker()
+    results = get_elasticsearch_client_wrapper().msearch(
+        index_name="docs_kabuto",
+        queries=keywords,
+        max_results=reranker.fetch_limit(3),
+    )
+    return [_rerank(reranker, keyword, documents) for keyword, documents in zip(keywords, results)]
+
+
+async def _asearch_elasticsearch_batch(keywords: list[str]) -> list[list[ElasticsearchOutput]]:
+    reranker = get_reranker()
+    results = await get_async_elasticsearch_client_wrapper().msearch(
+        index_name="docs_kabuto",
+        queries=keywords,
+        max_results=reranker.fetch_limit(3),
+    )
+    return [_rerank(reranker, keyword, documents) for keyword, documents in zip(keywords, results)]
+
+
+def _rerank(reranker, keywords: str, results: list[Document]) -> list[ElasticsearchOutput]:
+    return _to_outputs(reranker.rerank(keywords, results, get_text=lambda result: result.page_content, k=3))
+
+
+@lru_cache
+def get_elasticsearch_batcher() -> MicroBatcher[str, list[ElasticsearchOutput]]:
+    """Get the batcher that coalesces concurrent search_elasticsearch calls."""
+    return MicroBatcher("search_elasticsearch", _search_elasticsearch_batch, _asearch_elasticsearch_batch)
+
+
+@cache_results("search_elasticsearch", targets=lambda: ["elasticsearch:docs_kabuto"])
+@coalesce_calls("search_elasticsearch")
+def _search_elasticsearch(
     keywords: str,
 ) -> list[ElasticsearchOutput]:
     """
     空想上のシステム「KABUTO」のマニュアルから、関連する情報を取得します。
     """
-    wrapper = ElasticsearchClientWrapper()
-    results = wrapper.search(
-        index_name="docs_kabuto",
-        query=keywords,
-        max_results=3,
-    )
-    outputs = []
-    for result in results:
-        outputs.append(
-            ElasticsearchOutput(
-                file_name=result.metadata["source"],
-                content=result.page_content,
-            ),
-        )
-    return outputs
+    return get_elasticsearch_batcher().submit(keywords)
+
+
+@cache_results("search_elasticsearch", targets=lambda: ["elasticsearch:docs_kabuto"])
+@coalesce_calls("search_elasticsearch")
+async def _asearch_elasticsearch(
+    keywords: str,
+) -> list[ElasticsearchOutput]:
+    return await get_elasticsearch_batcher().asubmit(keywords)
+
+
+search_elasticsearch = StructuredTool.from_function(
+    func=_search_elasticsearch,
+    coroutine=_asearch_elasticsearch,
+    name="search_elasticsearch",
+    args_schema=ElasticsearchInput,
+)
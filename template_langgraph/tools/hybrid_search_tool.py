@@ -0,0 +1,294 @@
+"""Hybrid search over the Elasticsearch (BM25) and Qdrant (vector) backends.
+
+Both backends are queried concurrently and their rankings are fused into one
+top-k, so the agent gets keyword and semantic matches from a single tool call
+instead of calling ``search_elasticsearch`` and ``search_qdrant`` separately.
+"""
+
+import asyncio
+import hashlib
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+from template_langgraph.tools.elasticsearch_tool import (
+    get_async_elasticsearch_client_wrapper,
+    get_elasticsearch_client_wrapper,
+)
+from template_langgraph.tools.qdrant_tool import (
+    get_async_qdrant_client_wrapper,
+    get_embedding_wrapper,
+    get_qdrant_client_wrapper,
+)
+from template_langgraph.tools.rerankers import get_reranker
+from template_langgraph.tools.result_caches import cache_results
+from template_langgraph.tools.single_flights import coalesce_calls
+
+logger = get_logger(__name__)
+
+FusionMethod = Literal["rrf", "weighted"]
+
+
+class Settings(BaseSettings):
+    hybrid_search_elasticsearch_index_name: str = "docs_kabuto"
+    hybrid_search_qdrant_collection_name: str = "qa_kabuto"
+    # Results requested from each backend before fusion
+    hybrid_search_candidates: int = 10
+    hybrid_search_top_k: int = 5
+    hybrid_search_fusion: FusionMethod = "rrf"
+    hybrid_search_rrf_k: int = 60
+    # Used by the weighted fusion only
+    hybrid_search_bm25_weight: float = 0.5
+    hybrid_search_vector_weight: float = 0.5
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_hybrid_search_settings() -> Settings:
+    """Get hybrid search settings."""
+    return Settings()
+
+
+def get_hybrid_search_targets() -> list[str]:
+    """Indexes read by the hybrid search."""
+    settings = get_hybrid_search_settings()
+    return [
+        f"elasticsearch:{settings.hybrid_search_elasticsearch_index_name}",
+        f"qdrant:{settings.hybrid_search_qdrant_collection_name}",
+    ]
+
+
+@dataclass
+class SearchHit:
+    file_name: str
+    content: str
+    score: float | None = None
+
+
+def dedupe_key(hit: SearchHit) -> str:
+    """Return the key under which hits are considered the same chunk."""
+    # Elasticsearch stores the base name while Qdrant stores the source path
+    file_name = os.path.basename(hit.file_name)
+    return hashlib.sha256(f"{file_name}\0{hit.content.strip()}".encode()).hexdigest()
+
+
+def normalize_scores(hits: list[SearchHit]) -> list[float]:
+    """Min-max normalize the scores of one ranking to [0, 1]."""
+    scores = [hit.score or 0.0 for hit in hits]
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def fuse_rankings(
+    rankings: dict[str, list[SearchHit]],
+    method: FusionMethod = "rrf",
+    top_k: int = 5,
+    rrf_k: int = 60,
+    weights: dict[str, float] | None = None,
+) -> list[SearchHit]:
+    """Fuse several rankings into one, merging hits that refer to the same chunk.
+
+    Args:
+        rankings: Hits per backend, best first.
+        method: ``rrf`` sums ``weight / (rrf_k + rank)``, ``weighted`` sums the
+            min-max normalized backend scores multiplied by their weight.
+        top_k: Number of hits to return.
+        rrf_k: Rank offset of the reciprocal rank fusion.
+        weights: Weight per backend, 1.0 when missing.
+    """
+    weights = weights or {}
+    fused: dict[str, SearchHit] = {}
+    for backend, hits in rankings.items():
+        weight = weights.get(backend, 1.0)
+        if method == "rrf":
+            contributions = [weight / (rrf_k + rank) for rank in range(1, len(hits) + 1)]
+        else:
+            contributions = [weight * score for score in normalize_scores(hits)]
+        seen = set()
+        for hit, contribution in zip(hits, contributions):
+            key = dedupe_key(hit)
+            # Only the best rank of a chunk counts within one backend
+            if key in seen:
+                continue
+            seen.add(key)
+            if key in fused:
+                fused[key].score += contribution
+            else:
+                fused[key] = SearchHit(file_name=hit.file_name, content=hit.content, score=contribution)
+    # sorted is stable, so ties keep the order in which the hits were first seen
+    return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)[:top_k]
+
+
+def _elasticsearch_hits(documents) -> list[SearchHit]:
+    return [
+        SearchHit(file_name=doc.metadata["source"], content=doc.page_content, score=doc.metadata.get("score"))
+        for doc in documents
+    ]
+
+
+def _qdrant_hits(points) -> list[SearchHit]:
+    return [
+        SearchHit(file_name=point.payload["file_name"], content=point.payload["content"], score=point.score)
+        for point in points
+    ]
+
+
+def _search_bm25(keywords: str, settings: Settings) -> list[SearchHit]:
+    documents = get_elasticsearch_client_wrapper().search(
+        index_name=settings.hybrid_search_elasticsearch_index_name,
+        query=keywords,
+        max_results=get_reranker().fetch_limit(settings.hybrid_search_candidates),
+    )
+    return _elasticsearch_hits(documents)
+
+
+def _search_vector(keywords: str, settings: Settings) -> list[SearchHit]:
+    points = get_qdrant_client_wrapper().query_points(
+        collection_name=settings.hybrid_search_qdrant_collection_name,
+        query=get_embedding_wrapper().create_embedding(keywords),
+        limit=get_reranker().fetch_limit(settings.hybrid_search_candidates),
+    )
+    return _qdrant_hits(points)
+
+
+async def _asearch_bm25(keywords: str, settings: Settings) -> list[SearchHit]:
+    documents = await get_async_elasticsearch_client_wrapper().search(
+        index_name=settings.hybrid_search_elasticsearch_index_name,
+        query=keywords,
+        max_results=get_reranker().fetch_limit(settings.hybrid_search_candidates),
+    )
+    return _elasticsearch_hits(documents)
+
+
+async def _asearch_vector(keywords: str, settings: Settings) -> list[SearchHit]:
+    query_vector = await get_embedding_wrapper().acreate_embedding(keywords)
+    points = await get_async_qdrant_client_wrapper().query_points(
+        collection_name=settings.hybrid_search_qdrant_collection_name,
+        query=query_vector,
+        limit=get_reranker().fetch_limit(settings.hybrid_search_candidates),
+    )
+    return _qdrant_hits(points)
+
+
+def _collect_rankings(results: dict[str, list[SearchHit] | BaseException]) -> dict[str, list[SearchHit]]:
+    """Keep the rankings of the backends that answered, failing only if none did."""
+    rankings = {}
+    for backend, result in results.items():
+        if isinstance(result, BaseException):
+            logger.warning(f"Hybrid search backend '{backend}' failed: {result}")
+        else:
+            rankings[backend] = result
+    if not rankings:
+        raise next(iter(results.values()))
+    return rankings
+
+
+def _fuse(keywords: str, rankings: dict[str, list[SearchHit]], settings: Settings) -> list[SearchHit]:
+    reranker = get_reranker()
+    fused = fuse_rankings(
+        rankings,
+        method=settings.hybrid_search_fusion,
+        top_k=reranker.fetch_limit(settings.hybrid_search_top_k),
+        rrf_k=settings.hybrid_search_rrf_k,
+        weights={
+            "bm25": settings.hybrid_search_bm25_weight,
+            "vector": settings.hybrid_search_vector_weight,
+        },
+    )
+    return reranker.rerank(keywords, fused, get_text=lambda hit: hit.content, k=settings.hybrid_search_top_k)
+
+
+def hybrid_search(keywords: str, settings: Settings = None) -> list[SearchHit]:
+    """Query both backends in parallel threads and fuse their rankings."""
+    if settings is None:
+        settings = get_hybrid_search_settings()
+    searches: dict[str, Callable[[str, Settings], list[SearchHit]]] = {
+        "bm25": _search_bm25,
+        "vector": _search_vector,
+    }
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+        futures = {backend: executor.submit(search, keywords, settings) for backend, search in searches.items()}
+        for backend, future in futures.items():
+            try:
+                results[backend] = future.result()
+            except Exception as e:
+                results[backend] = e
+    return _fuse(keywords, _collect_rankings(results), settings)
+
+
+async def ahybrid_search(keywords: str, settings: Settings = None) -> list[SearchHit]:
+    """Query both backends concurrently on the event loop and fuse their rankings."""
+    if settings is None:
+        settings = get_hybrid_search_settings()
+    bm25, vector = await asyncio.gather(
+        _asearch_bm25(keywords, settings),
+        _asearch_vector(keywords, settings),
+        return_exceptions=True,
+    )
+    return _fuse(keywords, _collect_rankings({"bm25": bm25, "vector": vector}), settings)
+
+
+class HybridSearchInput(BaseModel):
+    keywords: str = Field(description="Keywords to search")
+
+
+class HybridSearchOutput(BaseModel):
+    file_name: str = Field(description="The file name")
+    content: str = Field(description="The content of the file")
+    score: float = Field(description="The fused relevance score, higher is better")
+
+
+def _to_outputs(results: list[SearchHit]) -> list[HybridSearchOutput]:
+    return [
+        HybridSearchOutput(
+            file_name=result.file_name,
+            content=result.content,
+            score=result.score,
+        )
+        for result in results
+    ]
+
+
+@cache_results("search_hybrid", targets=get_hybrid_search_targets)
+@coalesce_calls("search_hybrid")
+def _search_hybrid(
+    keywords: str,
+) -> list[HybridSearchOutput]:
+    """
+    空想上のシステム「KABUTO」のマニュアルとトラブルシュート事例の両方を、キーワード検索とベクトル検索で横断的に検索し、関連度順に統合した結果を取得します。
+    """
+    return _to_outputs(hybrid_search(keywords))
+
+
+@cache_results("search_hybrid", targets=get_hybrid_search_targets)
+@coalesce_calls("search_hybrid")
+async def _asearch_hybrid(
+    keywords: str,
+) -> list[HybridSearchOutput]:
+    return _to_outputs(await ahybrid_search(keywords))
+
+
+search_hybrid = StructuredTool.from_function(
+    func=_search_hybrid,
+    coroutine=_asearch_hybrid,
+    name="search_hybrid",
+    args_schema=HybridSearchInput,
+)
@@ -0,0 +1,407 @@
+"""Embedded vector index with the subset of the QdrantClient API used by the tools.
+
+For small collections such as ``qa_kabuto``, a round trip to a Qdrant server costs
+more than the search itself. ``LocalQdrantClient`` keeps each collection in a
+single file: a JSON header, a float32 matrix that is memory-mapped when the
+collection is loaded, and a log of ``[id, payload]`` records. The matrix reserves
+spare rows, so an upsert writes its rows and records in place and then commits
+them by rewriting the counts at the start of the file. The file is only rewritten
+when the spare rows run out, the log has grown well past the live points, or
+points are deleted, which keeps batch-by-batch ingestion linear.
+
+Queries are a vectorized top-k over the matrix. When ``hnswlib`` is installed and a
+collection reaches ``qdrant_local_hnsw_min_points`` points, an HNSW index is built
+in memory on first query and used instead. The index is not persisted, so the
+collection file stays the single source of truth.
+
+Results are deterministic, which also makes this backend useful for offline tests
+and benchmarks.
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+from collections.abc import Iterable
+
+import numpy as np
+from qdrant_client.http.models import QueryResponse, UpdateResult, UpdateStatus
+from qdrant_client.models import (
+    CollectionDescription,
+    CollectionsResponse,
+    Distance,
+    PointIdsList,
+    PointStruct,
+    QueryRequest,
+    ScoredPoint,
+    VectorParams,
+)
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b"TLVI0002"
+# Row count, reserved rows and log length; rewritten last to commit an append
+COUNTS = struct.Struct("<QQQ")
+# Matrix rows start on a 64-byte boundary so that the memory map is aligned
+ALIGNMENT = 64
+# A rewrite reserves this many times the live rows, and at least MIN_CAPACITY
+GROWTH_FACTOR = 2
+MIN_CAPACITY = 64
+
+
+def encode_records(records: Iterable[tuple[int | str, dict]]) -> bytes:
+    return b"".join(json.dumps([id, payload], ensure_ascii=False).encode() + b"\n" for id, payload in records)
+
+
+class LocalCollection:
+    """One collection: ids, payloads and a (count, size) float32 matrix in a single file."""
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        distance: Distance = Distance.COSINE,
+        hnsw_min_points: int = 0,
+    ):
+        if distance not in (Distance.COSINE, Distance.DOT):
+            raise ValueError(f"Unsupported distance for the local backend: {distance}")
+        self.path = path
+        self.size = size
+        self.distance = distance
+        self.hnsw_min_points = hnsw_min_points
+        self.ids: list[int | str] = []
+        self.payloads: list[dict] = []
+        self.vectors = np.zeros((0, size), dtype=np.float32)
+        self._positions: dict[int | str, int] = {}
+        self._hnsw = None
+        # File layout, as last read or written
+        self.offset = 0
+        self.capacity = 0
+        self.log_length = 0
+        self.log_records = 0
+        # Modification time of the file this state was read from or written to
+        self.mtime_ns = 0
+        # Guards the state above; queries hold it only to take a snapshot
+        self._lock = threading.Lock()
+
+    @property
+    def row_bytes(self) -> int:
+        return self.size * 4
+
+    @classmethod
+    def load(cls, path: str, hnsw_min_points: int = 0) -> "LocalCollection":
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a local vector index file: {path}")
+            count, capacity, log_length = COUNTS.unpack(f.read(COUNTS.size))
+            (header_length,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_length))
+            collection = cls(path, header["size"], Distance(header["distance"]), hnsw_min_points)
+            collection.offset = -(-f.tell() // ALIGNMENT) * ALIGNMENT
+            f.seek(collection.offset + capacity * collection.row_bytes)
+            log = f.read(log_length)
+        # Later records of an id replace its payload; first ones give its row
+        for line in log.splitlines():
+            id, payload = json.loads(line)
+            position = collection._positions.get(id)
+            if position is None:
+                collection._positions[id] = len(collection.ids)
+                collection.ids.append(id)
+                collection.payloads.append(payload)
+            else:
+                collection.payloads[position] = payload
+            collection.log_records += 1
+        if len(collection.ids) != count:
+            raise ValueError(f"Corrupt local vector index file: {path}")
+        collection.capacity = capacity
+        collection.log_length = log_length
+        collection._map_vectors()
+        collection.mtime_ns = os.stat(path).st_mtime_ns
+        return collection
+
+    def _map_vectors(self) -> None:
+        if self.ids:
+            self.vectors = np.memmap(
+                self.path,
+                dtype=np.float32,
+                mode="r",
+                offset=self.offset,
+                shape=(len(self.ids), self.size),
+            )
+        else:
+            self.vectors = np.zeros((0, self.size), dtype=np.float32)
+
+    def save(self) -> None:
+        """Rewrite the whole file with a compacted log and spare rows."""
+        header = json.dumps({"size": self.size, "distance": self.distance.value}, ensure_ascii=False).encode()
+        offset = len(MAGIC) + COUNTS.size + 8 + len(header)
+        offset = -(-offset // ALIGNMENT) * ALIGNMENT
+        capacity = max(MIN_CAPACITY, GROWTH_FACTOR * len(self.ids))
+        log = encode_records(zip(self.ids, self.payloads))
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(COUNTS.pack(len(self.ids), capacity, len(log)))
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(np.ascontiguousarray(self.vectors, dtype=np.float32).tobytes())
+            # The spare rows are left as a hole
+            f.seek(offset + capacity * self.row_bytes)
+            f.write(log)
+        os.replace(tmp_path, self.path)
+        self.offset = offset
+        self.capacity = capacity
+        self.log_length = len(log)
+        self.log_records = len(self.ids)
+        self._map_vectors()
+        self.mtime_ns = os.stat(self.path).st_mtime_ns
+
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[-1] != self.size:
+            raise ValueError(f"Vector size {vectors.shape[-1]} does not match collection size {self.size}")
+        if self.distance == Distance.COSINE:
+            norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+        return vectors
+
+    def upsert(self, points: list[PointStruct]) -> None:
+        """Write the points to the file, in place unless a rewrite is due."""
+        if not points:
+            return
+        vectors = self._prepare([point.vector for point in points])
+        with self._lock:
+            count = len(self.ids)
+            new_positions: dict[int | str, int] = {}
+            updated: dict[int, np.ndarray] = {}
+            for point, vector in zip(points, vectors):
+                position = self._positions.get(point.id, new_positions.get(point.id))
+                if position is None:
+                    position = new_positions[point.id] = count + len(new_positions)
+                updated[position] = vector
+            new_count = count + len(new_positions)
+            if new_count > self.capacity or self.log_records + len(points) > GROWTH_FACTOR * max(
+                new_count, MIN_CAPACITY
+            ):
+                matrix = np.empty((new_count, self.size), dtype=np.float32)
+                matrix[:count] = self.vectors
+                for position, vector in updated.items():
+                    matrix[position] = vector
+                self._apply(points, new_positions)
+                self.vectors = matrix
+                self.save()
+            else:
+                self._append(points, updated, count, new_count)
+                self._apply(points, new_positions)
+                self._map_vectors()
+            self._hnsw = None
+
+    def _append(self, points: list[PointStruct], updated: dict[int, np.ndarray], count: int, new_count: int) -> None:
+        log = encode_records((point.id, point.payload or {}) for point in points)
+        with open(self.path, "r+b") as f:
+            for position, vector in updated.items():
+                if position < count:
+                    f.seek(self.offset + position * self.row_bytes)
+                    f.write(vector.tobytes())
+            if new_count > count:
+                f.seek(self.offset + count * self.row_bytes)
+                f.write(np.stack([updated[position] for position in range(count, new_count)]).tobytes())
+            f.seek(self.offset + self.capacity * self.row_bytes + self.log_length)
+            f.write(log)
+            f.flush()
+            f.seek(len(MAGIC))
+            f.write(COUNTS.pack(new_count, self.capacity, self.log_length + len(log)))
+        self.log_length += len(log)
+        self.log_records += len(points)
+        self.mtime_ns = os.stat(self.path).st_mtime_ns
+
+    def _apply(self, points: list[PointStruct], new_positions: dict[int | str, int]) -> None:
+        # Lists only grow or change in place here, so query snapshots stay valid
+        for id in new_positions:
+            self._positions[id] = len(self.ids)
+            self.ids.append(id)
+            self.payloads.append({})
+        for point in points:
+            self.payloads[self._positions[point.id]] = point.payload or {}
+
+    def delete(self, ids: list[int | str]) -> None:
+        """Remove the points and rewrite the file."""
+        with self._lock:
+            removed = {self._positions[id] for id in ids if id in self._positions}
+            if not removed:
+                return
+            keep = [i for i in range(len(self.ids)) if i not in removed]
+            # New lists rather than in-place edits, so query snapshots stay valid
+            self.vectors = np.array(self.vectors[keep], dtype=np.float32)
+            self.ids = [self.ids[i] for i in keep]
+            self.payloads = [self.payloads[i] for i in keep]
+            self._positions = {id: i for i, id in enumerate(self.ids)}
+            self._hnsw = None
+            self.save()
+
+    def query(self, query: list[float], limit: int) -> list[ScoredPoint]:
+        return self.query_batch([query], limit)[0]
+
+    def query_batch(self, queries: list[list[float]], limit: int) -> list[list[ScoredPoint]]:
+        """Search several query vectors at once, with one matrix product for all of them."""
+        with self._lock:
+            ids, payloads, matrix = self.ids, self.payloads, self.vectors
+            index = self._get_hnsw()
+        count = len(matrix)
+        if not count or limit <= 0:
+            return [[] for _ in queries]
+        vectors = self._prepare(queries)
+        limit = min(limit, count)
+        if index is not None:
+            labels, distances = index.knn_query(vectors, k=limit)
+            # hnswlib returns 1 - similarity for "cosine" and "ip"
+            rows = zip(labels, 1.0 - distances)
+        else:
+            similarities = np.asarray(vectors @ np.asarray(matrix).T)
+            rows = []
+            for row in similarities:
+                positions = np.argpartition(-row, limit - 1)[:limit]
+                # Order by score, then by insertion order, so that results are deterministic
+                positions = positions[np.lexsort((positions, -row[positions]))]
+                rows.append((positions, row[positions]))
+        return [
+            [
+                ScoredPoint(
+                    id=ids[position],
+                    version=0,
+                    score=float(score),
+                    payload=payloads[position],
+                )
+                for position, score in zip(positions, scores)
+            ]
+            for positions, scores in rows
+        ]
+
+    def _get_hnsw(self):
+        if not self.hnsw_min_points or len(self.ids) < self.hnsw_min_points:
+            return None
+        if self._hnsw is None:
+            try:
+                import hnswlib
+            except ImportError:
+                logger.warning("hnswlib is not installed, falling back to brute-force search")
+                self.hnsw_min_points = 0
+                return None
+            index = hnswlib.Index(space="ip", dim=self.size)
+            index.init_index(max_elements=len(self.ids), ef_construction=200, M=16)
+            index.add_items(np.asarray(self.vectors), np.arange(len(self.ids)))
+            index.set_ef(64)
+            self._hnsw = index
+            logger.info(f"Built HNSW index over {len(self.ids)} points from {self.path}")
+        return self._hnsw
+
+
+class LocalQdrantClient:
+    """Embedded replacement for QdrantClient, storing each collection in ``<path>/<name>.vecs``."""
+
+    def __init__(self, path: str, hnsw_min_points: int = 0):
+        self.path = path
+        self.hnsw_min_points = hnsw_min_points
+        self._collections: dict[str, LocalCollection] = {}
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, collection_name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", collection_name):
+            raise ValueError(f"Invalid collection name: {collection_name}")
+        return os.path.join(self.path, f"{collection_name}.vecs")
+
+    def _get(self, collection_name: str) -> LocalCollection:
+        with self._lock:
+            path = self._file(collection_name)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                self._collections.pop(collection_name, None)
+                raise ValueError(f"Collection {collection_name} not found") from None
+            collection = self._collections.get(collection_name)
+            # Reload when another process, e.g. an ingestion script, rewrote the file
+            if collection is None or collection.mtime_ns != mtime_ns:
+                collection = LocalCollection.load(path, hnsw_min_points=self.hnsw_min_points)
+                self._collections[collection_name] = collection
+            return collection
+
+    def get_collections(self) -> CollectionsResponse:
+        names = sorted(name.removesuffix(".vecs") for name in os.listdir(self.path) if name.endswith(".vecs"))
+        return CollectionsResponse(collections=[CollectionDescription(name=name) for name in names])
+
+    def collection_exists(self, collection_name: str) -> bool:
+        return os.path.exists(self._file(collection_name))
+
+    def create_collection(self, collection_name: str, vectors_config: VectorParams, **kwargs) -> bool:
+        with self._lock:
+            if self.collection_exists(collection_name):
+                raise ValueError(f"Collection {collection_name} already exists")
+            collection = LocalCollection(
+                self._file(collection_name),
+                size=vectors_config.size,
+                distance=vectors_config.distance,
+                hnsw_min_points=self.hnsw_min_points,
+            )
+            collection.save()
+            self._collections[collection_name] = collection
+        return True
+
+    def delete_collection(self, collection_name: str, **kwargs) -> bool:
+        with self._lock:
+            self._collections.pop(collection_name, None)
+            if not self.collection_exists(collection_name):
+                return False
+            os.remove(self._file(collection_name))
+        return True
+
+    def upsert(self, collection_name: str, points: list[PointStruct], **kwargs) -> UpdateResult:
+        with self._lock:
+            self._get(collection_name).upsert(points)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def delete(self, collection_name: str, points_selector: PointIdsList, **kwargs) -> UpdateResult:
+        with self._lock:
+            self._get(collection_name).delete(points_selector.points)
+        return UpdateResult(operation_id=0, status=UpdateStatus.COMPLETED)
+
+    def query_points(self, collection_name: str, query: list[float], limit: int = 10, **kwargs) -> QueryResponse:
+        collection = self._get(collection_name)
+        return QueryResponse(points=collection.query(query, limit))
+
+    def query_batch_points(self, collection_name: str, requests: list[QueryRequest], **kwargs) -> list[QueryResponse]:
+        collection = self._get(collection_name)
+        # Requests of a batch built by the tools share one limit, so group them to search together
+        responses: list[QueryResponse | None] = [None] * len(requests)
+        groups: dict[int, list[int]] = {}
+        for i, request in enumerate(requests):
+            groups.setdefault(request.limit or 10, []).append(i)
+        for limit, indices in groups.items():
+            results = collection.query_batch([requests[i].query for i in indices], limit)
+            for i, points in zip(indices, results):
+                responses[i] = QueryResponse(points=points)
+        return responses
+
+    def close(self) -> None:
+        with self._lock:
+            self._collections.clear()
+
+
+class AsyncLocalQdrantClient:
+    """Async facade over LocalQdrantClient; searches are in-process and fast, so they run inline."""
+
+    def __init__(self, path: str, hnsw_min_points: int = 0):
+        self._client = LocalQdrantClient(path, hnsw_min_points=hnsw_min_points)
+
+    async def query_points(self, collection_name: str, query: list[float], limit: int = 10, **kwargs):
+        return self._client.query_points(collection_name=collection_name, query=query, limit=limit)
+
+    async def query_batch_points(self, collection_name: str, requests: list[QueryRequest], **kwargs):
+        return self._client.query_batch_points(collection_name=collection_name, requests=requests)
+
+    async def close(self) -> None:
+        self._client.close()
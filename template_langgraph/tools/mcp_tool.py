@@ -1,11 +1,33 @@
 import asyncio
+import atexit
 import json
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
 from functools import lru_cache
 
+import anyio
+from langchain_core.tools import StructuredTool
 from langchain_core.tools.base import BaseTool
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp.shared.exceptions import McpError
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+# Errors raised when the stdio server behind a session has gone away
+CONNECTION_ERRORS = (
+    McpError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    BrokenPipeError,
+    ConnectionError,
+)
+
 
 class Settings(BaseSettings):
     mcp_config_path: str = ""
@@ -23,6 +45,171 @@ def get_mcp_settings() -> Settings:
     return Settings()
 
 
+@dataclass
+class McpConnection:
+    task: asyncio.Task
+    tools: dict[str, BaseTool]
+    stop: asyncio.Event
+
+
+class McpSessionManager:
+    """Keep MCP sessions open on a dedicated background event loop.
+
+    ``MultiServerMCPClient.get_tools()`` returns tools that open a new session,
+    and for stdio servers spawn a new process, on every call. The manager instead
+    holds one session per server for the process lifetime and exposes proxy tools
+    that submit their calls to the background loop, so sync callers never need
+    ``asyncio.run``. A session whose server has died is reopened on the next call.
+    """
+
+    def __init__(self, servers: dict):
+        self.client = MultiServerMCPClient(servers)
+        self.server_names = list(servers.keys())
+        self._connections: dict[str, McpConnection] = {}
+        self._connect_locks: dict[str, asyncio.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, coro) -> Future:
+        """Schedule a coroutine on the background loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout: float | None = None):
+        """Run a coroutine on the background loop and wait for its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("McpSessionManager.run() cannot be called from its own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+    def get_tools(self) -> list[BaseTool]:
+        """Open a session per server and return proxy tools bound to the manager."""
+        tools_by_server = self.run(self._connect_all())
+        return [
+            self._make_proxy_tool(server_name, tool) for server_name, tools in tools_by_server.items() for tool in tools
+        ]
+
+    async def ainvoke_tool(self, server_name: str, tool_name: str, args: dict):
+        """Invoke a tool on the server's session, reconnecting once if the server died."""
+        for attempt in range(2):
+            connection = await self._ensure_connected(server_name)
+            try:
+                return await connection.tools[tool_name].ainvoke(args)
+            except CONNECTION_ERRORS as e:
+                if attempt > 0:
+                    raise
+                logger.warning(f"MCP server {server_name} connection lost ({e!r}), reconnecting")
+                await self._disconnect(server_name)
+
+    def close(self) -> None:
+        """Close every session and stop the background loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._disconnect_all(), loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"Error closing MCP sessions: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="mcp-session-manager",
+                    daemon=True,
+                )
+                self._thread.start()
+            return self._loop
+
+    async def _connect_all(self) -> dict[str, list[BaseTool]]:
+        connections = await asyncio.gather(*(self._ensure_connected(name) for name in self.server_names))
+        return {name: list(connection.tools.values()) for name, connection in zip(self.server_names, connections)}
+
+    async def _ensure_connected(self, server_name: str) -> McpConnection:
+        lock = self._connect_locks.setdefault(server_name, asyncio.Lock())
+        async with lock:
+            connection = self._connections.get(server_name)
+            if connection is not None and not connection.task.done():
+                return connection
+            logger.info(f"Opening MCP session for {server_name}")
+            ready: asyncio.Future = asyncio.get_running_loop().create_future()
+            stop = asyncio.Event()
+            task = asyncio.create_task(self._serve(server_name, ready, stop))
+            tools = await ready
+            connection = McpConnection(task=task, tools=tools, stop=stop)
+            self._connections[server_name] = connection
+            return connection
+
+    async def _serve(self, server_name: str, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        # The session must be entered and exited by the same task, so one task owns it for its lifetime
+        try:
+            async with self.client.session(server_name) as session:
+                tools = await load_mcp_tools(session)
+                ready.set_result({tool.name: tool for tool in tools})
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP session for {server_name} ended: {e!r}")
+
+    async def _disconnect(self, server_name: str) -> None:
+        connection = self._connections.pop(server_name, None)
+        if connection is None:
+            return
+        connection.stop.set()
+        try:
+            await asyncio.wait_for(connection.task, timeout=5)
+        except Exception as e:
+            logger.warning(f"Error closing MCP session for {server_name}: {e!r}")
+
+    async def _disconnect_all(self) -> None:
+        await asyncio.gather(*(self._disconnect(name) for name in list(self._connections)))
+
+    def _make_proxy_tool(self, server_name: str, tool: BaseTool) -> BaseTool:
+        tool_name = tool.name
+
+        def func(**kwargs):
+            return self.run(self.ainvoke_tool(server_name, tool_name, kwargs))
+
+        async def coroutine(**kwargs):
+            return await asyncio.wrap_future(self.submit(self.ainvoke_tool(server_name, tool_name, kwargs)))
+
+        return StructuredTool(
+            name=tool_name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            func=func,
+            coroutine=coroutine,
+            metadata=tool.metadata,
+        )
+
+
+_session_managers: dict[str, McpSessionManager] = {}
+_session_managers_lock = threading.Lock()
+
+
+def get_mcp_session_manager(config_path: str) -> McpSessionManager:
+    """Get the process-wide McpSessionManager for an MCP config file."""
+    with _session_managers_lock:
+        if config_path not in _session_managers:
+            with open(config_path) as f:
+                config = json.load(f)
+            for _, value in config["servers"].items():
+                value["transport"] = "stdio"
+            manager = McpSessionManager(config["servers"])
+            atexit.register(manager.close)
+            _session_managers[config_path] = manager
+        return _session_managers[config_path]
+
+
 class McpClientWrapper:
     def __init__(
         self,
@@ -36,10 +223,7 @@ class McpClientWrapper:
     def get_tools(self) -> list[BaseTool]:
         if self.settings.mcp_config_path == "":
             return []
-        with open(self.settings.mcp_config_path) as f:
-            config = json.load(f)
-            for _, value in config["servers"].items():
-                value["transport"] = "stdio"
-            self.client = MultiServerMCPClient(config["servers"])
-            self.tools = asyncio.run(self.client.get_tools())
-            return self.tools
+        manager = get_mcp_session_manager(self.settings.mcp_config_path)
+        self.client = manager.client
+        self.tools = manager.get_tools()
+        return self.tools
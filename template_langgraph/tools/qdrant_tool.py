@@ -1,17 +1,47 @@
+import time
 from functools import lru_cache
+from typing import Literal
 
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http.models import UpdateResult
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionStatus,
+    Distance,
+    HnswConfigDiff,
+    PointIdsList,
+    PointStruct,
+    QuantizationSearchParams,
+    QueryRequest,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    ScoredPoint,
+    SearchParams,
+    VectorParams,
+)
 
-from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+from template_langgraph.llms.azure_openais import AzureOpenAiWrapper, get_azure_openai_settings
+from template_langgraph.tools.batchers import MicroBatcher
+from template_langgraph.tools.client_registry import get_client_registry
+from template_langgraph.tools.rerankers import get_reranker
+from template_langgraph.tools.result_caches import cache_results
+from template_langgraph.tools.single_flights import coalesce_calls
 
 
 class Settings(BaseSettings):
     qdrant_url: str = "http://localhost:6333"
+    # "local" keeps collections in-process, one file each under qdrant_local_path
+    qdrant_backend: Literal["server", "local"] = "server"
+    qdrant_local_path: str = "./.qdrant"
+    # Collections with at least this many points are searched with HNSW if hnswlib is installed (0: never)
+    qdrant_local_hnsw_min_points: int = 0
+    # Name of a COLLECTION_PROFILES entry used to create and search collections
+    qdrant_collection_profile: str = "default"
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -26,6 +56,113 @@ def get_qdrant_settings() -> Settings:
     return Settings()
 
 
+class CollectionProfile(BaseModel):
+    """Storage, index and search options of a collection; None keeps the Qdrant default."""
+
+    name: str
+    # Keep the original float32 vectors on disk (memory-mapped) instead of in RAM
+    on_disk: bool = False
+    quantization: Literal["none", "scalar", "binary"] = "none"
+    # Keep the quantized vectors in RAM even when the original vectors are on disk
+    quantization_always_ram: bool = True
+    hnsw_m: int | None = None
+    hnsw_ef_construct: int | None = None
+    search_hnsw_ef: int | None = None
+    # Fetch limit * oversampling candidates with the quantized vectors, then rescore them
+    search_oversampling: float | None = None
+    search_rescore: bool | None = None
+
+    def vectors_config(self, vector_size: int) -> VectorParams:
+        return VectorParams(
+            size=vector_size,
+            distance=Distance.COSINE,
+            on_disk=self.on_disk or None,
+        )
+
+    def hnsw_config(self) -> HnswConfigDiff | None:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self) -> ScalarQuantization | BinaryQuantization | None:
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=self.quantization_always_ram,
+                )
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=self.quantization_always_ram))
+        return None
+
+    def search_params(self) -> SearchParams | None:
+        quantization = None
+        if self.quantization != "none" and (self.search_oversampling is not None or self.search_rescore is not None):
+            quantization = QuantizationSearchParams(
+                oversampling=self.search_oversampling,
+                rescore=self.search_rescore,
+            )
+        if self.search_hnsw_ef is None and quantization is None:
+            return None
+        return SearchParams(hnsw_ef=self.search_hnsw_ef, quantization=quantization)
+
+    def estimate_ram_bytes(self, count: int, vector_size: int) -> int:
+        """Rough RAM needed to serve ``count`` vectors: resident vectors plus HNSW links."""
+        ram = 0 if self.on_disk else count * vector_size * 4
+        if self.quantization_always_ram:
+            if self.quantization == "scalar":
+                ram += count * vector_size
+            elif self.quantization == "binary":
+                ram += count * -(-vector_size // 8)
+        # Layer 0 holds up to 2 * m links of 4 bytes per point
+        ram += count * 2 * (self.hnsw_m or 16) * 4
+        return ram
+
+
+COLLECTION_PROFILES: dict[str, CollectionProfile] = {
+    profile.name: profile
+    for profile in [
+        CollectionProfile(name="default"),
+        CollectionProfile(
+            name="scalar",
+            quantization="scalar",
+            search_oversampling=2.0,
+            search_rescore=True,
+        ),
+        CollectionProfile(
+            name="scalar_on_disk",
+            on_disk=True,
+            quantization="scalar",
+            search_oversampling=2.0,
+            search_rescore=True,
+        ),
+        # Binary quantization suits high-dimensional embeddings such as text-embedding-3-*
+        CollectionProfile(
+            name="binary_on_disk",
+            on_disk=True,
+            quantization="binary",
+            search_oversampling=3.0,
+            search_rescore=True,
+        ),
+        CollectionProfile(
+            name="high_recall",
+            hnsw_m=32,
+            hnsw_ef_construct=256,
+            search_hnsw_ef=256,
+        ),
+    ]
+}
+
+
+def get_collection_profile(name: str) -> CollectionProfile:
+    """Look up a collection profile by name."""
+    if name not in COLLECTION_PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}', expected one of {sorted(COLLECTION_PROFILES)}")
+    return COLLECTION_PROFILES[name]
+
+
 class QdrantClientWrapper:
     def __init__(
         self,
@@ -33,25 +170,66 @@ class QdrantClientWrapper:
     ):
         if settings is None:
             settings = get_qdrant_settings()
-        self.client = QdrantClient(
-            url=settings.qdrant_url,
-        )
+        self.profile = get_collection_profile(settings.qdrant_collection_profile)
+        if settings.qdrant_backend == "local":
+            from template_langgraph.tools.local_vector_indexes import LocalQdrantClient
+
+            self.client = LocalQdrantClient(
+                path=settings.qdrant_local_path,
+                hnsw_min_points=settings.qdrant_local_hnsw_min_points,
+            )
+        else:
+            self.client = QdrantClient(
+                url=settings.qdrant_url,
+            )
+
+    def ping(self) -> bool:
+        """Check that the Qdrant server is reachable."""
+        self.client.get_collections()
+        return True
+
+    def close(self) -> None:
+        """Close the underlying Qdrant connections."""
+        self.client.close()
 
     def create_collection(
         self,
         collection_name: str,
         vector_size: int = 1536,
+        profile: CollectionProfile | None = None,
     ) -> bool:
-        """Create a collection in Qdrant."""
+        """Create a collection in Qdrant with the given profile, QDRANT_COLLECTION_PROFILE by default."""
+        profile = profile or self.profile
         result = self.client.create_collection(
             collection_name=collection_name,
-            vectors_config=VectorParams(
-                size=vector_size,
-                distance=Distance.COSINE,
-            ),
+            vectors_config=profile.vectors_config(vector_size),
+            hnsw_config=profile.hnsw_config(),
+            quantization_config=profile.quantization_config(),
         )
         return result
 
+    def collection_exists(
+        self,
+        collection_name: str,
+    ) -> bool:
+        """Check whether a collection exists in Qdrant."""
+        return self.client.collection_exists(collection_name=collection_name)
+
+    def wait_until_indexed(
+        self,
+        collection_name: str,
+        timeout: float = 600.0,
+    ) -> None:
+        """Wait for the optimizers to finish building the HNSW and quantized indexes."""
+        if not isinstance(self.client, QdrantClient):
+            # The local backend indexes synchronously
+            return
+        deadline = time.monotonic() + timeout
+        while self.client.get_collection(collection_name=collection_name).status != CollectionStatus.GREEN:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Collection {collection_name} was not indexed within {timeout} seconds")
+            time.sleep(1.0)
+
     def delete_collection(
         self,
         collection_name: str,
@@ -74,19 +252,143 @@ class QdrantClientWrapper:
             wait=True,
         )
 
+    def delete_points(
+        self,
+        collection_name: str,
+        ids: list[int | str],
+    ) -> UpdateResult:
+        """Delete points from a Qdrant collection."""
+        return self.client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),
+            wait=True,
+        )
+
     def query_points(
         self,
         collection_name: str,
         query: list[float],
         limit: int = 3,
+        search_params: SearchParams | None = None,
     ) -> list[PointStruct]:
-        """Query points from a Qdrant collection."""
+        """Query points from a Qdrant collection, with the profile's search params by default."""
         return self.client.query_points(
             collection_name=collection_name,
             query=query,
             limit=limit,
+            search_params=search_params or self.profile.search_params(),
         ).points
 
+    def query_batch(
+        self,
+        collection_name: str,
+        queries: list[list[float]],
+        limit: int = 3,
+        search_params: SearchParams | None = None,
+    ) -> list[list[ScoredPoint]]:
+        """Query several vectors from a Qdrant collection in one request, one result list per vector."""
+        responses = self.client.query_batch_points(
+            collection_name=collection_name,
+            requests=_to_query_requests(queries, limit, search_params or self.profile.search_params()),
+        )
+        return [response.points for response in responses]
+
+
+class AsyncQdrantClientWrapper:
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_qdrant_settings()
+        self.profile = get_collection_profile(settings.qdrant_collection_profile)
+        if settings.qdrant_backend == "local":
+            from template_langgraph.tools.local_vector_indexes import AsyncLocalQdrantClient
+
+            self.client = AsyncLocalQdrantClient(
+                path=settings.qdrant_local_path,
+                hnsw_min_points=settings.qdrant_local_hnsw_min_points,
+            )
+        else:
+            self.client = AsyncQdrantClient(
+                url=settings.qdrant_url,
+            )
+
+    async def close(self) -> None:
+        """Close the underlying Qdrant connections."""
+        await self.client.close()
+
+    async def query_points(
+        self,
+        collection_name: str,
+        query: list[float],
+        limit: int = 3,
+    ) -> list[PointStruct]:
+        """Query points from a Qdrant collection."""
+        response = await self.client.query_points(
+            collection_name=collection_name,
+            query=query,
+            limit=limit,
+            search_params=self.profile.search_params(),
+        )
+        return response.points
+
+    async def query_batch(
+        self,
+        collection_name: str,
+        queries: list[list[float]],
+        limit: int = 3,
+    ) -> list[list[ScoredPoint]]:
+        """Query several vectors from a Qdrant collection in one request, one result list per vector."""
+        responses = await self.client.query_batch_points(
+            collection_name=collection_name,
+            requests=_to_query_requests(queries, limit, self.profile.search_params()),
+        )
+        return [response.points for response in responses]
+
+
+def _to_query_requests(
+    queries: list[list[float]],
+    limit: int,
+    search_params: SearchParams | None,
+) -> list[QueryRequest]:
+    return [QueryRequest(query=query, limit=limit, params=search_params, with_payload=True) for query in queries]
+
+
+def get_qdrant_client_wrapper(settings: Settings = None) -> QdrantClientWrapper:
+    """Get the pooled QdrantClientWrapper for the given settings."""
+    if settings is None:
+        settings = get_qdrant_settings()
+    return get_client_registry().get_or_create(
+        backend="qdrant",
+        factory=lambda: QdrantClientWrapper(settings=settings),
+        settings=settings,
+        health_check=QdrantClientWrapper.ping,
+        close=QdrantClientWrapper.close,
+    )
+
+
+def get_async_qdrant_client_wrapper(settings: Settings = None) -> AsyncQdrantClientWrapper:
+    """Get the pooled AsyncQdrantClientWrapper for the running event loop."""
+    if settings is None:
+        settings = get_qdrant_settings()
+    return get_client_registry().get_or_create_for_loop(
+        backend="qdrant_async",
+        factory=lambda: AsyncQdrantClientWrapper(settings=settings),
+        settings=settings,
+        aclose=AsyncQdrantClientWrapper.close,
+    )
+
+
+def get_embedding_wrapper() -> AzureOpenAiWrapper:
+    """Get the pooled AzureOpenAiWrapper used to embed search keywords."""
+    settings = get_azure_openai_settings()
+    return get_client_registry().get_or_create(
+        backend="azure_openai",
+        factory=lambda: AzureOpenAiWrapper(settings=settings),
+        settings=settings,
+    )
+
 
 class QdrantInput(BaseModel):
     keywords: str = Field(description="Keywords to search")
@@ -97,26 +399,71 @@ class QdrantOutput(BaseModel):
     content: str = Field(description="The content of the file")
 
 
-@tool(args_schema=QdrantInput)
-def search_qdrant(
+def _to_outputs(results: list[PointStruct]) -> list[QdrantOutput]:
+    return [
+        QdrantOutput(
+            file_name=result.payload["file_name"],
+            content=result.payload["content"],
+        )
+        for result in results
+    ]
+
+
+def _search_qdrant_batch(keywords: list[str]) -> list[list[QdrantOutput]]:
+    """Embed all keywords in one request and search them with one batch query."""
+    reranker = get_reranker()
+    query_vectors = get_embedding_wrapper().create_embeddings(keywords)
+    results = get_qdrant_client_wrapper().query_batch(
+        collection_name="qa_kabuto",
+        queries=query_vectors,
+        limit=reranker.fetch_limit(3),
+    )
+    return [_rerank(reranker, keyword, points) for keyword, points in zip(keywords, results)]
+
+
+async def _asearch_qdrant_batch(keywords: list[str]) -> list[list[QdrantOutput]]:
+    reranker = get_reranker()
+    query_vectors = await get_embedding_wrapper().acreate_embeddings(keywords)
+    results = await get_async_qdrant_client_wrapper().query_batch(
+        collection_name="qa_kabuto",
+        queries=query_vectors,
+        limit=reranker.fetch_limit(3),
+    )
+    return [_rerank(reranker, keyword, points) for keyword, points in zip(keywords, results)]
+
+
+def _rerank(reranker, keywords: str, results: list[ScoredPoint]) -> list[QdrantOutput]:
+    return _to_outputs(reranker.rerank(keywords, results, get_text=lambda result: result.payload["content"], k=3))
+
+
+@lru_cache
+def get_qdrant_batcher() -> MicroBatcher[str, list[QdrantOutput]]:
+    """Get the batcher that coalesces concurrent search_qdrant calls."""
+    return MicroBatcher("search_qdrant", _search_qdrant_batch, _asearch_qdrant_batch)
+
+
+@cache_results("search_qdrant", targets=lambda: ["qdrant:qa_kabuto"])
+@coalesce_calls("search_qdrant")
+def _search_qdrant(
     keywords: str,
 ) -> list[QdrantOutput]:
     """
     空想上のシステム「KABUTO」の過去のシステムのトラブルシュート事例が蓄積されたデータベースから、関連する情報を取得します。
     """
-    wrapper = QdrantClientWrapper()
-    query_vector = AzureOpenAiWrapper().create_embedding(keywords)
-    results = wrapper.query_points(
-        collection_name="qa_kabuto",
-        query=query_vector,
-        limit=3,
-    )
-    outputs = []
-    for result in results:
-        outputs.append(
-            QdrantOutput(
-                file_name=result.payload["file_name"],
-                content=result.payload["content"],
-            ),
-        )
-    return outputs
+    return get_qdrant_batcher().submit(keywords)
+
+
+@cache_results("search_qdrant", targets=lambda: ["qdrant:qa_kabuto"])
+@coalesce_calls("search_qdrant")
+async def _asearch_qdrant(
+    keywords: str,
+) -> list[QdrantOutput]:
+    return await get_qdrant_batcher().asubmit(keywords)
+
+
+search_qdrant = StructuredTool.from_function(
+    func=_search_qdrant,
+    coroutine=_asearch_qdrant,
+    name="search_qdrant",
+    args_schema=QdrantInput,
+)
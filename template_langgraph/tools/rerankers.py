@@ -0,0 +1,193 @@
+"""Optional reranking stage for the retrieval tools.
+
+When enabled, a search tool over-fetches ``reranker_candidates`` results, scores
+every (query, candidate) pair on CPU and keeps only the best ``k`` for the prompt.
+The default scorer is a lexical BM25-style scorer vectorized with numpy. It uses a
+tokenizer that also handles Japanese text, which has no spaces. Any callable that
+scores a query against a list of texts can be plugged in instead, e.g. a small
+ONNX cross-encoder. Scores are cached per (scorer, query, text) pair, so repeated
+questions do not score the same candidates again.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Sequence
+from functools import lru_cache
+from typing import TypeVar
+
+import numpy as np
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+Scorer = Callable[[str, Sequence[str]], Sequence[float]]
+
+
+class Settings(BaseSettings):
+    reranker_enabled: bool = False
+    # Results fetched from the backend before reranking
+    reranker_candidates: int = 50
+    reranker_bm25_k1: float = 1.2
+    reranker_bm25_b: float = 0.75
+    # Typical candidate length in tokens, used for length normalization
+    reranker_bm25_avgdl: float = 100.0
+    reranker_cache_max_entries: int = 10000
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_reranker_settings() -> Settings:
+    """Get reranker settings."""
+    return Settings()
+
+
+# Latin words and digits, katakana runs and kanji runs; hiragana is mostly particles and inflections
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|[゠-ヿ]+|[一-鿿]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lexical tokens, using character bigrams for kanji runs."""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if "一" <= token[0] <= "鿿" and len(token) > 1:
+            tokens.extend(token[i : i + 2] for i in range(len(token) - 1))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+class Bm25Scorer:
+    """Score texts against a query with BM25 term saturation and length normalization.
+
+    Terms are weighted by their frequency in the query rather than by an IDF, so that
+    the score of a pair does not depend on the other candidates and can be cached.
+    """
+
+    name = "bm25"
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_reranker_settings()
+        self.k1 = settings.reranker_bm25_k1
+        self.b = settings.reranker_bm25_b
+        self.avgdl = settings.reranker_bm25_avgdl
+
+    def __call__(self, query: str, texts: Sequence[str]) -> np.ndarray:
+        query_terms = Counter(tokenize(query))
+        if not query_terms or not texts:
+            return np.zeros(len(texts))
+        terms = list(query_terms)
+        index = {term: i for i, term in enumerate(terms)}
+        # Term frequency matrix: one row per text, one column per query term
+        tf = np.zeros((len(texts), len(terms)))
+        lengths = np.zeros(len(texts))
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths[row] = len(tokens)
+            for token in tokens:
+                column = index.get(token)
+                if column is not None:
+                    tf[row, column] += 1
+        norm = self.k1 * (1 - self.b + self.b * lengths / self.avgdl)
+        saturated = tf * (self.k1 + 1) / (tf + norm[:, None])
+        weights = np.array([query_terms[term] for term in terms], dtype=float)
+        return saturated @ weights
+
+
+class ScoreCache:
+    """Thread-safe LRU cache of reranker scores keyed by (scorer, query, text)."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(scorer_name: str, query: str, text: str) -> str:
+        return hashlib.sha256(f"{scorer_name}\0{query}\0{text}".encode()).hexdigest()
+
+    def get(self, key: str) -> float | None:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is not None:
+                self._entries.move_to_end(key)
+            return score
+
+    def set(self, key: str, score: float) -> None:
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class Reranker:
+    """Rerank search results with a scorer and a per-pair score cache."""
+
+    def __init__(
+        self,
+        scorer: Scorer = None,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_reranker_settings()
+        if scorer is None:
+            scorer = Bm25Scorer(settings=settings)
+        self.settings = settings
+        self.scorer = scorer
+        self.scorer_name = getattr(scorer, "name", type(scorer).__name__)
+        self.cache = ScoreCache(max_entries=settings.reranker_cache_max_entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.reranker_enabled
+
+    def fetch_limit(self, k: int) -> int:
+        """Return how many results to fetch from a backend to end up with ``k``."""
+        return max(k, self.settings.reranker_candidates) if self.enabled else k
+
+    def score(self, query: str, texts: Sequence[str]) -> list[float]:
+        """Score each text against the query, only calling the scorer for uncached pairs."""
+        keys = [ScoreCache.make_key(self.scorer_name, query, text) for text in texts]
+        scores = [self.cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            computed = self.scorer(query, [texts[i] for i in missing])
+            for i, score in zip(missing, computed):
+                scores[i] = float(score)
+                self.cache.set(keys[i], scores[i])
+        logger.debug(f"Reranked {len(texts)} candidates, {len(texts) - len(missing)} cached")
+        return scores
+
+    def rerank(self, query: str, items: Sequence[T], get_text: Callable[[T], str], k: int) -> list[T]:
+        """Return the ``k`` best items. Without reranking the backend order is kept."""
+        if not self.enabled or len(items) <= 1:
+            return list(items[:k])
+        scores = self.score(query, [get_text(item) for item in items])
+        # Stable sort, so equally scored items keep the backend order
+        order = sorted(range(len(items)), key=lambda i: scores[i], reverse=True)
+        return [items[i] for i in order[:k]]
+
+
+@lru_cache
+def get_reranker() -> Reranker:
+    """Get the process-wide reranker."""
+    return Reranker()
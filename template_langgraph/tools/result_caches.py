@@ -0,0 +1,264 @@
+"""Query-result cache for the retrieval tools.
+
+Helpdesk users ask the same questions over and over, and without a cache each
+``search_*`` call embeds the query and queries its backend again. Results are
+cached in process, keyed by the tool name, the normalized arguments and the
+version of every index the tool reads. Entries expire after a TTL and the least
+recently used ones are evicted once the cache is full.
+
+The ingestion scripts bump the version of an index (e.g. ``qdrant:qa_kabuto``)
+after they change it. Versions are stored as small files, so a bump made by a
+script run in another process changes the key and stale results are never served.
+Hits and misses are counted through the OpenTelemetry metrics API, which is a
+no-op unless a meter provider is configured.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from opentelemetry import metrics
+from pydantic import BaseModel
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+
+logger = get_logger(__name__)
+
+meter = metrics.get_meter(__name__)
+requests_counter = meter.create_counter(
+    "retrieval_cache.requests",
+    description="Retrieval tool calls by cache result (hit or miss)",
+)
+
+
+class Settings(BaseSettings):
+    result_cache_enabled: bool = True
+    result_cache_ttl_seconds: float = 300.0
+    result_cache_max_entries: int = 1024
+    result_cache_index_version_dir_path: str = "./.ingestion/versions"
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_result_cache_settings() -> Settings:
+    """Get result cache settings."""
+    return Settings()
+
+
+class IndexVersionStore:
+    """Version of each index, stored as one file per index so that other processes see bumps."""
+
+    def __init__(
+        self,
+        settings: Settings = None,
+    ):
+        if settings is None:
+            settings = get_result_cache_settings()
+        self.dir_path = settings.result_cache_index_version_dir_path
+        # path -> (mtime_ns, version), so that unchanged files are not read again
+        self._versions: dict[str, tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, target: str) -> str:
+        return os.path.join(self.dir_path, re.sub(r"[^A-Za-z0-9_.-]", "_", target) + ".version")
+
+    def get(self, target: str) -> str:
+        """Return the current version of an index, ``"0"`` if it was never bumped."""
+        path = self._path(target)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return "0"
+        with self._lock:
+            cached = self._versions.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+        with open(path, encoding="utf-8") as f:
+            version = f.read().strip()
+        with self._lock:
+            self._versions[path] = (mtime_ns, version)
+        return version
+
+    def bump(self, target: str) -> str:
+        """Give an index a new version, invalidating the cached results that read it."""
+        path = self._path(target)
+        os.makedirs(self.dir_path, exist_ok=True)
+        version = uuid.uuid4().hex
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, path)
+        logger.info(f"Bumped index version of {target} to {version}")
+        return version
+
+
+@lru_cache
+def get_index_version_store() -> IndexVersionStore:
+    """Get the process-wide index version store."""
+    return IndexVersionStore()
+
+
+def bump_index_version(target: str) -> str:
+    """Invalidate the cached retrieval results of an index after it changed."""
+    return get_index_version_store().bump(target)
+
+
+def normalize_args(value: Any) -> Any:
+    """Normalize tool arguments so that trivially different queries share a key."""
+    if isinstance(value, str):
+        return " ".join(unicodedata.normalize("NFKC", value).split())
+    if isinstance(value, dict):
+        return {key: normalize_args(item) for key, item in sorted(value.items())}
+    if isinstance(value, list | tuple):
+        return [normalize_args(item) for item in value]
+    if isinstance(value, BaseModel):
+        return normalize_args(value.model_dump())
+    return value
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """Thread-safe LRU cache with a TTL for retrieval tool results."""
+
+    def __init__(
+        self,
+        settings: Settings = None,
+        versions: IndexVersionStore = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if settings is None:
+            settings = get_result_cache_settings()
+        if versions is None:
+            versions = IndexVersionStore(settings=settings)
+        self.settings = settings
+        self.versions = versions
+        self.clock = clock
+        self.stats = CacheStats()
+        # key -> (expires_at, value)
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def make_key(self, tool: str, args: dict, targets: list[str]) -> str:
+        payload = {
+            "tool": tool,
+            "args": normalize_args(args),
+            "versions": {target: self.versions.get(target) for target in targets},
+        }
+        return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+    def get(self, tool: str, key: str) -> tuple[bool, Any]:
+        """Return ``(found, value)`` for a key, counting the lookup as a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._entries[key]
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+        requests_counter.add(1, {"tool": tool, "result": "miss" if entry is None else "hit"})
+        return (False, None) if entry is None else (True, entry[1])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self.clock() + self.settings.result_cache_ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings.result_cache_max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@lru_cache
+def get_result_cache() -> ResultCache:
+    """Get the process-wide retrieval result cache."""
+    return ResultCache(versions=get_index_version_store())
+
+
+def cache_results(tool: str, targets: Callable[[], list[str]]):
+    """Cache the results of a sync or async retrieval function.
+
+    Args:
+        tool: Tool name, part of the cache key.
+        targets: Returns the indexes the tool reads, e.g. ``["qdrant:qa_kabuto"]``.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def lookup(args, kwargs) -> tuple[ResultCache | None, str | None, bool, Any]:
+            cache = get_result_cache()
+            if not cache.settings.result_cache_enabled:
+                return None, None, False, None
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache.make_key(tool, dict(bound.arguments), targets())
+            found, value = cache.get(tool, key)
+            return cache, key, found, value
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache, key, found, value = lookup(args, kwargs)
+                if found:
+                    return list(value)
+                value = await func(*args, **kwargs)
+                if cache is not None:
+                    cache.set(key, list(value))
+                return value
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache, key, found, value = lookup(args, kwargs)
+            if found:
+                return list(value)
+            value = func(*args, **kwargs)
+            if cache is not None:
+                cache.set(key, list(value))
+            return value
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,163 @@
+"""Single-flight coalescing of identical in-flight retrieval calls.
+
+When concurrent FastAPI requests or parallel ``Send`` branches issue the same
+``search_*`` call with the same arguments, only the first one, the leader, runs.
+The others wait for the leader and get its result, or its exception. Unlike the
+result cache, nothing is kept once the call finishes, so this also deduplicates
+calls when the cache is disabled or the result is not cached yet. Coalesced calls
+are counted through the OpenTelemetry metrics API.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import weakref
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from functools import lru_cache
+from typing import Any
+
+from opentelemetry import metrics
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from template_langgraph.loggers import get_logger
+from template_langgraph.tools.result_caches import normalize_args
+
+logger = get_logger(__name__)
+
+meter = metrics.get_meter(__name__)
+coalesced_counter = meter.create_counter(
+    "retrieval_single_flight.coalesced",
+    description="Retrieval tool calls served by an identical call already in flight",
+)
+
+
+class Settings(BaseSettings):
+    single_flight_enabled: bool = True
+
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_ignore_empty=True,
+        extra="ignore",
+    )
+
+
+@lru_cache
+def get_single_flight_settings() -> Settings:
+    """Get single-flight settings."""
+    return Settings()
+
+
+class SingleFlight:
+    """Run at most one call per key at a time and share its outcome with every caller."""
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[str, Future] = {}
+        # Tasks are bound to their loop, so in-flight async calls are tracked per loop
+        self._async_calls: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Task]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _count(self, tool: str) -> None:
+        with self._lock:
+            self.coalesced += 1
+        coalesced_counter.add(1, {"tool": tool})
+        logger.debug(f"{tool}: joined an identical call in flight")
+
+    def do(self, tool: str, key: str, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            self._count(tool)
+            return future.result()
+        try:
+            value = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, tool: str, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        calls = self._async_calls.setdefault(loop, {})
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = loop.create_task(func())
+            task.add_done_callback(functools.partial(self._forget, calls, key))
+        else:
+            self._count(tool)
+        # A cancelled caller must not cancel the call the others are waiting for
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _forget(calls: dict[str, asyncio.Task], key: str, task: asyncio.Task) -> None:
+        if calls.get(key) is task:
+            del calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller was cancelled
+            task.exception()
+
+
+@lru_cache
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group."""
+    return SingleFlight()
+
+
+def make_call_key(tool: str, args: dict) -> str:
+    payload = {"tool": tool, "args": normalize_args(args)}
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+
+
+def coalesce_calls(tool: str):
+    """Coalesce identical concurrent calls of a sync or async retrieval function.
+
+    Args:
+        tool: Tool name, part of the call key and the metric attributes.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs) -> str | None:
+            if not get_single_flight_settings().single_flight_enabled:
+                return None
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return make_call_key(tool, dict(bound.arguments))
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                key = make_key(args, kwargs)
+                if key is None:
+                    return await func(*args, **kwargs)
+                # Each caller gets its own list, as with cached results
+                return list(await get_single_flight().ado(tool, key, lambda: func(*args, **kwargs)))
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_key(args, kwargs)
+            if key is None:
+                return func(*args, **kwargs)
+            return list(get_single_flight().do(tool, key, lambda: func(*args, **kwargs)))
+
+        return wrapper
+
+    return decorator
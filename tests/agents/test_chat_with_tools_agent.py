@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+from unittest.mock import Mock
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+
+from template_langgraph.agents.chat_with_tools_agent.agent import BasicToolNode, ChatWithToolsAgent
+from template_langgraph.llms.semantic_caches import SemanticResponseCache, Settings
+
+
+def make_tool(name: str, delay: float = 0.0) -> StructuredTool:
+    def func(query: str) -> str:
+        time.sleep(delay)
+        return f"{name}:{query}"
+
+    async def coroutine(query: str) -> str:
+        await asyncio.sleep(delay)
+        return f"{name}:{query}"
+
+    return StructuredTool.from_function(func=func, coroutine=coroutine, name=name, description=name)
+
+
+def make_inputs(*names: str) -> dict:
+    return {
+        "messages": [
+            AIMessage(
+                content="",
+                tool_calls=[{"name": name, "args": {"query": "q"}, "id": f"call_{i}"} for i, name in enumerate(names)],
+            )
+        ]
+    }
+
+
+class TestBasicToolNode:
+    """Test cases for BasicToolNode concurrent execution."""
+
+    def test_sync_calls_run_concurrently_in_order(self):
+        """Test that sync tool calls overlap and results keep the tool call order."""
+        node = BasicToolNode(tools=[make_tool("slow", 0.3), make_tool("fast", 0.0), make_tool("mid", 0.2)])
+
+        started = time.monotonic()
+        outputs = node(make_inputs("slow", "fast", "mid"))["messages"]
+        elapsed = time.monotonic() - started
+
+        assert [output.tool_call_id for output in outputs] == ["call_0", "call_1", "call_2"]
+        assert [json.loads(output.content) for output in outputs] == ["slow:q", "fast:q", "mid:q"]
+        assert elapsed < 0.45
+
+    def test_async_calls_run_concurrently_in_order(self):
+        """Test that async tool calls are gathered and keep the tool call order."""
+        node = BasicToolNode(tools=[make_tool("slow", 0.3), make_tool("fast", 0.0), make_tool("mid", 0.2)])
+
+        started = time.monotonic()
+        outputs = asyncio.run(node.acall(make_inputs("slow", "fast", "mid")))["messages"]
+        elapsed = time.monotonic() - started
+
+        assert [output.tool_call_id for output in outputs] == ["call_0", "call_1", "call_2"]
+        assert elapsed < 0.45
+
+    def test_concurrency_cap(self):
+        """Test that max_concurrency=1 runs the calls one after another."""
+        node = BasicToolNode(tools=[make_tool("a", 0.1), make_tool("b", 0.1)], max_concurrency=1)
+
+        started = time.monotonic()
+        asyncio.run(node.acall(make_inputs("a", "b")))
+        elapsed = time.monotonic() - started
+
+        assert elapsed >= 0.2
+
+    def test_timeout_returns_error_message(self):
+        """Test that a call exceeding the timeout yields an error ToolMessage."""
+        node = BasicToolNode(tools=[make_tool("slow", 0.5), make_tool("fast")], tool_timeout_seconds=0.1)
+
+        for outputs in (
+            node(make_inputs("slow", "fast"))["messages"],
+            asyncio.run(node.acall(make_inputs("slow", "fast")))["messages"],
+        ):
+            assert "timed out" in json.loads(outputs[0].content)["error"]
+            assert json.loads(outputs[1].content) == "fast:q"
+
+    def test_unknown_tool_returns_error_message(self):
+        """Test that a failing call does not affect the other calls."""
+        node = BasicToolNode(tools=[make_tool("known")])
+
+        outputs = node(make_inputs("unknown", "known"))["messages"]
+
+        assert "error" in json.loads(outputs[0].content)
+        assert json.loads(outputs[1].content) == "known:q"
+
+
+def make_agent(answers: list[str], system_prompt: str | None = None) -> tuple[ChatWithToolsAgent, Mock]:
+    """Build an agent whose LLM answers with the given texts and whose cache embeds by keyword."""
+    cache = SemanticResponseCache(
+        embed=lambda text: [1.0, 0.0] if "KABUTO" in text else [0.0, 1.0],
+        settings=Settings(semantic_cache_similarity_threshold=0.9),
+    )
+    agent = ChatWithToolsAgent(tools=[], system_prompt=system_prompt, semantic_cache=cache)
+    llm = Mock()
+    llm.bind_tools.return_value.invoke.side_effect = [AIMessage(content=answer) for answer in answers]
+    agent.llm = llm
+    return agent, llm
+
+
+def ask(graph, question: str, bypass: bool = False) -> str:
+    result = graph.invoke(
+        {"messages": [{"role": "user", "content": question}]},
+        config={"configurable": {"semantic_cache_bypass": bypass}},
+    )
+    return result["messages"][-1].content
+
+
+class TestSemanticCache:
+    """Test cases for the semantic response cache of ChatWithToolsAgent."""
+
+    def test_similar_question_is_answered_from_cache(self):
+        """Test that a paraphrased question short-circuits the LLM."""
+        agent, llm = make_agent(["Restart KABUTO.", "Unrelated."])
+        graph = agent.create_graph()
+
+        assert ask(graph, "How do I fix KABUTO?") == "Restart KABUTO."
+        assert ask(graph, "KABUTO is broken, what should I do?") == "Restart KABUTO."
+        assert ask(graph, "What is the weather?") == "Unrelated."
+        assert llm.bind_tools.return_value.invoke.call_count == 2
+
+    def test_bypass_skips_the_lookup(self):
+        """Test that the bypass flag calls the LLM and refreshes the cached answer."""
+        agent, llm = make_agent(["Old answer.", "New answer."])
+        graph = agent.create_graph()
+
+        ask(graph, "How do I fix KABUTO?")
+
+        assert ask(graph, "How do I fix KABUTO?", bypass=True) == "New answer."
+        assert ask(graph, "How do I fix KABUTO?") == "New answer."
+
+    def test_namespaces_are_per_system_prompt(self):
+        """Test that answers are not shared between agents with different system prompts."""
+        agent, _ = make_agent(["Answer in English."], system_prompt="Answer in English.")
+        other, other_llm = make_agent(["日本語で回答します。"], system_prompt="日本語で回答してください。")
+        other.semantic_cache = agent.semantic_cache
+
+        ask(agent.create_graph(), "How do I fix KABUTO?")
+
+        assert ask(other.create_graph(), "How do I fix KABUTO?") == "日本語で回答します。"
+        other_llm.bind_tools.return_value.invoke.assert_called_once()
+
+
+class TestPromptPrefix:
+    """Test cases for the prompt prefix of ChatWithToolsAgent."""
+
+    def test_tools_are_bound_once_across_turns(self):
+        """Test that every turn reuses the bound model and leads with the same system message."""
+        agent = ChatWithToolsAgent(tools=[make_tool("search")], system_prompt="Be brief.")
+        llm = Mock()
+        llm.bind_tools.return_value.invoke.side_effect = [AIMessage(content="First."), AIMessage(content="Second.")]
+        agent.llm = llm
+        graph = agent.create_graph()
+
+        graph.invoke({"messages": [{"role": "user", "content": "Hi"}]})
+        graph.invoke({"messages": [{"role": "user", "content": "Hi again"}]})
+
+        llm.bind_tools.assert_called_once()
+        calls = llm.bind_tools.return_value.invoke.call_args_list
+        assert calls[0].args[0][0] is calls[1].args[0][0]
+        assert calls[0].args[0][0].content == "Be brief."
+
+    def test_cached_tokens_are_attached_to_the_response(self):
+        """Test that the cached prompt tokens of a response are added to its metadata."""
+        agent = ChatWithToolsAgent(tools=[], system_prompt="Be brief.")
+        llm = Mock()
+        llm.bind_tools.return_value.invoke.return_value = AIMessage(
+            content="Hi",
+            usage_metadata={
+                "input_tokens": 1200,
+                "output_tokens": 5,
+                "total_tokens": 1205,
+                "input_token_details": {"cache_read": 1024},
+            },
+        )
+        agent.llm = llm
+
+        response = agent.chat_with_tools({"messages": [HumanMessage(content="Hi")]})["messages"][0]
+
+        assert response.response_metadata["prompt_cache"]["cached_tokens"] == 1024
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+from template_langgraph.agents.issue_formatter_agent import agent as issue_formatter_agent
+
+
+class TestLazyGraph:
+    """Test cases for the lazily compiled agent graphs."""
+
+    def test_import_does_not_build_models(self):
+        """Test that importing an agent module neither compiles the graph nor imports langchain_openai."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; import template_langgraph.agents.issue_formatter_agent.agent as m; "
+                "print(m.get_graph.cache_info().currsize, 'langchain_openai' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.split() == ["0", "False"]
+
+    def test_graph_attribute_is_memoized(self):
+        """Test that the module-level graph attribute is built once and reused."""
+        issue_formatter_agent.get_graph.cache_clear()
+
+        graph = issue_formatter_agent.graph
+
+        assert graph is issue_formatter_agent.get_graph()
+        assert issue_formatter_agent.get_graph.cache_info().misses == 1
+
+    def test_unknown_attribute(self):
+        """Test that other missing attributes still raise AttributeError."""
+        with pytest.raises(AttributeError):
+            _ = issue_formatter_agent.not_a_graph
@@ -7,6 +7,7 @@ from langchain_core.documents import Document
 
 from template_langgraph.internals.csv_loaders import (
     CsvLoaderWrapper,
+    CsvSource,
     Settings,
     get_csv_loader_settings,
 )
@@ -160,3 +161,70 @@ class TestCsvLoaderWrapper:
             # CSVLoader should handle malformed CSV gracefully
             docs = wrapper.load_csv_docs()
             assert len(docs) >= 0  # Should not crash, but may return empty or partial results
+
+
+class TestStreamingCsvLoader:
+    """Test cases for batched and column-selective CSV loading."""
+
+    def test_rows_are_read_in_batches(self, tmp_path):
+        """Test that a file is read in batches of csv_loader_batch_size rows."""
+        csv_file = tmp_path / "rows.csv"
+        csv_file.write_text("id,text\n" + "".join(f"{i},row {i}\n" for i in range(5)))
+        wrapper = CsvLoaderWrapper(settings=Settings(csv_loader_batch_size=2))
+
+        batches = list(wrapper.iter_csv_batches(str(csv_file)))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert [doc.metadata["row"] for batch in batches for doc in batch] == [0, 1, 2, 3, 4]
+
+    def test_default_layout_matches_csv_loader(self, tmp_path):
+        """Test that without a source configuration every column is rendered as `column: value`."""
+        csv_file = tmp_path / "qa.csv"
+        csv_file.write_text("q,a\n What? , That.\n")
+
+        docs = CsvLoaderWrapper(settings=Settings(csv_loader_data_dir_path=str(tmp_path))).load_csv_docs()
+
+        assert docs[0].page_content == "q: What?\na: That."
+        assert docs[0].metadata == {"source": str(csv_file), "row": 0}
+
+    def test_content_and_typed_metadata_columns(self, tmp_path):
+        """Test that a matching source selects content columns and converts metadata types."""
+        csv_file = tmp_path / "reports_kabuto.csv"
+        csv_file.write_text("error_code,count,resolved,user_message\nKABUTO-0101,3,true,Screen flickers\n")
+        settings = Settings(
+            csv_loader_sources=[
+                CsvSource(
+                    pattern="reports_*.csv",
+                    content_columns=["user_message"],
+                    metadata_columns={"error_code": "str", "count": "int", "resolved": "bool"},
+                )
+            ]
+        )
+
+        docs = list(CsvLoaderWrapper(settings=settings).lazy_load_csv_docs([str(csv_file)]))
+
+        assert docs[0].page_content == "user_message: Screen flickers"
+        assert docs[0].metadata["error_code"] == "KABUTO-0101"
+        assert docs[0].metadata["count"] == 3
+        assert docs[0].metadata["resolved"] is True
+
+    def test_metadata_columns_are_excluded_from_content_by_default(self, tmp_path):
+        """Test that metadata columns are left out of page_content when no content columns are set."""
+        csv_file = tmp_path / "qa.csv"
+        csv_file.write_text("id,q,a\n7,What?,That.\n")
+        settings = Settings(csv_loader_sources=[CsvSource(metadata_columns={"id": "int"})])
+
+        docs = list(CsvLoaderWrapper(settings=settings).lazy_load_csv_docs([str(csv_file)]))
+
+        assert docs[0].page_content == "q: What?\na: That."
+        assert docs[0].metadata["id"] == 7
+
+    def test_encoding_per_source(self, tmp_path):
+        """Test that each source is decoded with its own encoding."""
+        sjis_file = tmp_path / "legacy.csv"
+        sjis_file.write_bytes("q,a\n起動しない,再起動する\n".encode("shift_jis"))
+        settings = Settings(csv_loader_sources=[CsvSource(pattern="legacy.csv", encoding="shift_jis")])
+
+        docs = list(CsvLoaderWrapper(settings=settings).lazy_load_csv_docs([str(sjis_file)]))
+
+        assert docs[0].page_content == "q: 起動しない\na: 再起動する"
@@ -0,0 +1,117 @@
+import threading
+import time
+
+import pytest
+
+from template_langgraph.internals.embedding_pipelines import EmbeddedBatch, EmbeddingPipeline, Settings
+
+
+def make_settings(batch_size: int = 2, max_concurrency: int = 2) -> Settings:
+    return Settings(
+        embedding_pipeline_batch_size=batch_size,
+        embedding_pipeline_max_concurrency=max_concurrency,
+    )
+
+
+class TestEmbeddingPipeline:
+    """Test cases for EmbeddingPipeline."""
+
+    def test_batches_are_sunk_in_order(self):
+        """Test that texts are embedded in batches and handed to the sink in input order."""
+        calls = []
+
+        def embed_documents(texts: list[str]) -> list[list[float]]:
+            calls.append(list(texts))
+            # Later batches finish first to check ordering
+            time.sleep(0.05 if texts[0] == "a" else 0.0)
+            return [[float(ord(text))] for text in texts]
+
+        batches: list[EmbeddedBatch] = []
+        progress = EmbeddingPipeline(embed_documents, settings=make_settings()).run(
+            texts=["a", "b", "c", "d", "e"],
+            sink=batches.append,
+            total=5,
+        )
+
+        assert sorted(calls) == [["a", "b"], ["c", "d"], ["e"]]
+        assert [batch.offset for batch in batches] == [0, 2, 4]
+        assert [vector[0] for batch in batches for vector in batch.vectors] == [97.0, 98.0, 99.0, 100.0, 101.0]
+        assert progress.done == 5
+        assert progress.next_offset == 5
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency batches are embedded at once."""
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def embed_documents(texts: list[str]) -> list[list[float]]:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return [[0.0] for _ in texts]
+
+        EmbeddingPipeline(embed_documents, settings=make_settings(batch_size=1, max_concurrency=3)).run(
+            texts=[str(i) for i in range(12)],
+            sink=lambda batch: None,
+        )
+
+        assert 1 < peak <= 3
+
+    def test_resume_from_offset(self):
+        """Test that start_offset skips the items already ingested."""
+        batches: list[EmbeddedBatch] = []
+
+        progress = EmbeddingPipeline(lambda texts: [[0.0] for _ in texts], settings=make_settings()).run(
+            texts=["a", "b", "c", "d", "e"],
+            sink=batches.append,
+            start_offset=3,
+        )
+
+        assert [(batch.offset, batch.texts) for batch in batches] == [(3, ["d", "e"])]
+        assert progress.next_offset == 5
+
+    def test_failure_reports_resume_offset(self, caplog):
+        """Test that a failing sink stops the run and logs the offset to resume from."""
+
+        def sink(batch: EmbeddedBatch):
+            if batch.offset == 2:
+                raise RuntimeError("upsert failed")
+
+        with pytest.raises(RuntimeError):
+            EmbeddingPipeline(lambda texts: [[0.0] for _ in texts], settings=make_settings()).run(
+                texts=["a", "b", "c", "d", "e"],
+                sink=sink,
+            )
+
+        assert "start_offset=2" in caplog.text
+
+    def test_items_are_carried_through_batches(self):
+        """Test that a generator of items is pulled lazily and each batch carries its items."""
+        pulled = []
+
+        def items():
+            for i in range(5):
+                pulled.append(i)
+                yield {"id": i, "text": f"text {i}"}
+
+        batches: list[EmbeddedBatch] = []
+
+        def sink(batch: EmbeddedBatch):
+            # At most max_concurrency batches are read ahead of the one being sunk
+            assert len(pulled) <= batch.offset + 2 * 2
+            batches.append(batch)
+
+        progress = EmbeddingPipeline(lambda texts: [[0.0] for _ in texts], settings=make_settings()).run(
+            texts=items(),
+            sink=sink,
+            to_text=lambda item: item["text"],
+        )
+
+        assert [[item["id"] for item in batch.items] for batch in batches] == [[0, 1], [2, 3], [4]]
+        assert batches[0].texts == ["text 0", "text 1"]
+        assert progress.done == 5
@@ -0,0 +1,192 @@
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from langchain_core.documents import Document
+
+from template_langgraph.internals.ingestion_manifests import IngestionManifest, Settings, make_chunk_id
+from template_langgraph.internals.pdf_loaders import PdfLoaderWrapper
+from template_langgraph.internals.pdf_loaders import Settings as PdfLoaderSettings
+
+
+def load_lines(paths: list[str]):
+    """Treat every line of a file as one chunk."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f.read().splitlines():
+                yield Document(page_content=line, metadata={"source": path})
+
+
+def write(path, text: str, mtime: float | None = None):
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def run(manifest: IngestionManifest, paths: list[str], full: bool = False):
+    plan = manifest.plan(paths, full=full)
+    documents = list(plan.iter_documents(load_lines))
+    manifest.commit(plan)
+    return plan, [doc.page_content for doc in documents]
+
+
+class TestIngestionManifest:
+    """Test cases for IngestionManifest."""
+
+    @pytest.fixture
+    def settings(self, tmp_path):
+        return Settings(ingestion_manifest_dir_path=str(tmp_path / "manifests"))
+
+    def test_first_run_emits_every_chunk(self, tmp_path, settings):
+        """Test that every chunk is new on the first run and gets a stable chunk id."""
+        path = write(tmp_path / "a.txt", "one\ntwo")
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+
+        documents = list(plan.iter_documents(load_lines))
+
+        assert [doc.page_content for doc in documents] == ["one", "two"]
+        assert documents[0].metadata["chunk_id"] == make_chunk_id(path, "one")
+        assert plan.deleted_ids == []
+
+    def test_unchanged_files_are_not_loaded(self, tmp_path, settings):
+        """Test that a second run with no changes loads nothing."""
+        path = write(tmp_path / "a.txt", "one\ntwo")
+        run(IngestionManifest("qdrant:test", settings=settings), [path])
+
+        def fail(paths):
+            raise AssertionError(f"unexpected load of {paths}")
+
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+
+        assert list(plan.iter_documents(fail)) == []
+        assert plan.unchanged_paths == [path]
+
+    def test_touched_file_with_same_content_is_not_loaded(self, tmp_path, settings):
+        """Test that a new mtime alone does not trigger a reload when the content hash is unchanged."""
+        path = write(tmp_path / "a.txt", "one\ntwo", mtime=1_000_000)
+        run(IngestionManifest("qdrant:test", settings=settings), [path])
+        os.utime(path, (2_000_000, 2_000_000))
+
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+
+        assert plan.changed_paths == []
+        assert plan.entries[path].mtime == 2_000_000
+
+    def test_changed_file_emits_only_new_chunks_and_deletes_stale_ones(self, tmp_path, settings):
+        """Test that editing a file emits its new chunks and reports the removed ones."""
+        path = write(tmp_path / "a.txt", "one\ntwo", mtime=1_000_000)
+        run(IngestionManifest("qdrant:test", settings=settings), [path])
+        write(tmp_path / "a.txt", "one\nthree", mtime=2_000_000)
+
+        plan, contents = run(IngestionManifest("qdrant:test", settings=settings), [path])
+
+        assert contents == ["three"]
+        assert plan.deleted_ids == [make_chunk_id(path, "two")]
+
+    def test_deleted_file_chunks_are_reported(self, tmp_path, settings):
+        """Test that the chunks of a removed file are reported for deletion."""
+        a = write(tmp_path / "a.txt", "one")
+        b = write(tmp_path / "b.txt", "two")
+        run(IngestionManifest("qdrant:test", settings=settings), [a, b])
+
+        plan, contents = run(IngestionManifest("qdrant:test", settings=settings), [a])
+
+        assert contents == []
+        assert plan.deleted_ids == [make_chunk_id(b, "two")]
+        assert list(IngestionManifest("qdrant:test", settings=settings).files) == [a]
+
+    def test_chunks_are_keyed_by_the_planned_path(self, tmp_path, settings):
+        """Test that a loader spelling the source differently does not cause spurious deletions."""
+
+        def load_absolute(paths: list[str]):
+            for document in load_lines(paths):
+                document.metadata["source"] = os.path.abspath(document.metadata["source"])
+                yield document
+
+        path = os.path.relpath(write(tmp_path / "a.txt", "one\ntwo", mtime=1_000_000))
+        manifest = IngestionManifest("qdrant:test", settings=settings)
+        plan = manifest.plan([path])
+        list(plan.iter_documents(load_absolute))
+        manifest.commit(plan)
+        write(tmp_path / "a.txt", "one\ntwo\nthree", mtime=2_000_000)
+
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+        documents = list(plan.iter_documents(load_absolute))
+
+        assert [doc.page_content for doc in documents] == ["three"]
+        assert documents[0].metadata["chunk_id"] == make_chunk_id(path, "three")
+        assert plan.deleted_ids == []
+        assert len(plan.entries[path].chunk_ids) == 3
+
+    def test_unknown_source_raises(self, tmp_path, settings):
+        """Test that a chunk whose source matches no planned path fails instead of being dropped."""
+
+        def load_renamed(paths: list[str]):
+            for document in load_lines(paths):
+                document.metadata["source"] = "row:1"
+                yield document
+
+        path = write(tmp_path / "a.txt", "one")
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+
+        with pytest.raises(ValueError, match="row:1"):
+            list(plan.iter_documents(load_renamed))
+
+    def test_changed_files_are_loaded_in_one_call(self, tmp_path, settings):
+        """Test that the loader gets every changed file at once."""
+        calls = []
+
+        def load_recorded(paths: list[str]):
+            calls.append(list(paths))
+            yield from load_lines(paths)
+
+        paths = [write(tmp_path / "a.txt", "one"), write(tmp_path / "b.txt", "two")]
+        plan = IngestionManifest("qdrant:test", settings=settings).plan(paths)
+
+        assert [doc.page_content for doc in plan.iter_documents(load_recorded)] == ["one", "two"]
+        assert calls == [paths]
+
+    def test_pdf_plan_uses_the_process_pool(self, tmp_path, settings):
+        """Test that a multi-file pdf plan parses its files in the process pool."""
+        paths = []
+        for name in ["a.pdf", "b.pdf"]:
+            shutil.copy("./data/docs_kabuto.pdf", tmp_path / name)
+            paths.append(str(tmp_path / name))
+        loader = PdfLoaderWrapper(settings=PdfLoaderSettings(pdf_loader_max_workers=2))
+        plan = IngestionManifest("qdrant:test", settings=settings).plan(paths)
+
+        with patch("template_langgraph.internals.pdf_loaders.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+            documents = list(plan.iter_documents(loader.lazy_load_pdf_docs))
+
+        pool.assert_called_once_with(max_workers=2)
+        assert {doc.metadata["source"] for doc in documents} == set(paths)
+        assert all(plan.entries[path].chunk_ids for path in paths)
+
+    def test_full_run_emits_every_chunk(self, tmp_path, settings):
+        """Test that a full run re-emits unchanged chunks."""
+        path = write(tmp_path / "a.txt", "one\ntwo")
+        run(IngestionManifest("qdrant:test", settings=settings), [path])
+
+        _, contents = run(IngestionManifest("qdrant:test", settings=settings), [path], full=True)
+
+        assert contents == ["one", "two"]
+
+    def test_targets_are_tracked_separately(self, tmp_path, settings):
+        """Test that each ingestion target keeps its own manifest."""
+        path = write(tmp_path / "a.txt", "one")
+        run(IngestionManifest("qdrant:test", settings=settings), [path])
+
+        _, contents = run(IngestionManifest("elasticsearch:test", settings=settings), [path])
+
+        assert contents == ["one"]
+
+    def test_deleted_ids_require_consumed_documents(self, tmp_path, settings):
+        """Test that deleted_ids cannot be read before the changed files are loaded."""
+        path = write(tmp_path / "a.txt", "one")
+        plan = IngestionManifest("qdrant:test", settings=settings).plan([path])
+
+        with pytest.raises(RuntimeError):
+            _ = plan.deleted_ids
@@ -1,4 +1,5 @@
 import os
+import shutil
 from unittest.mock import Mock, patch
 
 from langchain_core.documents import Document
@@ -88,7 +89,8 @@ class TestPdfLoaderWrapper:
 
         mock_pdf_loader.side_effect = [mock_loader_instance1, mock_loader_instance2]
 
-        wrapper = PdfLoaderWrapper()
+        # Load in-process so the patched loader is used
+        wrapper = PdfLoaderWrapper(settings=Settings(pdf_loader_max_workers=1))
         docs = wrapper.load_pdf_docs()
 
         # Verify results
@@ -142,3 +144,35 @@ class TestPdfLoaderWrapper:
         # Verify text splitter configuration
         assert hasattr(text_splitter, "_chunk_size")
         assert hasattr(text_splitter, "_chunk_overlap")
+
+    @patch("template_langgraph.internals.pdf_loaders.glob")
+    @patch("template_langgraph.internals.pdf_loaders.PyPDFLoader")
+    def test_load_pdf_docs_uses_configured_chunking(self, mock_pdf_loader, mock_glob):
+        """Test that chunk size and overlap come from the settings."""
+        mock_glob.return_value = ["./data/test.pdf"]
+        mock_pdf_loader.return_value.load_and_split.return_value = []
+
+        PdfLoaderWrapper(settings=Settings(pdf_loader_chunk_size=500, pdf_loader_chunk_overlap=50)).load_pdf_docs()
+
+        text_splitter = mock_pdf_loader.return_value.load_and_split.call_args[0][0]
+        assert text_splitter._chunk_size == 500
+        assert text_splitter._chunk_overlap == 50
+
+    def test_parallel_load_matches_serial_load(self, tmp_path):
+        """Test that the process pool yields the same chunks in the same order as a serial load."""
+        for name in ["b.pdf", "a.pdf", "c.pdf"]:
+            shutil.copy("./data/docs_kabuto.pdf", tmp_path / name)
+
+        serial = PdfLoaderWrapper(
+            settings=Settings(pdf_loader_data_dir_path=str(tmp_path), pdf_loader_max_workers=1)
+        ).load_pdf_docs()
+        parallel = list(
+            PdfLoaderWrapper(
+                settings=Settings(pdf_loader_data_dir_path=str(tmp_path), pdf_loader_max_workers=2)
+            ).lazy_load_pdf_docs()
+        )
+
+        assert [(doc.metadata["source"], doc.page_content) for doc in parallel] == [
+            (doc.metadata["source"], doc.page_content) for doc in serial
+        ]
+        assert [os.path.basename(doc.metadata["source"]) for doc in serial][0] == "a.pdf"
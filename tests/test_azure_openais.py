@@ -1,8 +1,17 @@
+import asyncio
 import logging
 import threading
+import time
 from unittest.mock import Mock, patch
 
-from template_langgraph.llms.azure_openais import AzureOpenAiWrapper, Settings
+from azure.core.credentials import AccessToken
+
+from template_langgraph.llms.azure_openais import (
+    AzureOpenAiWrapper,
+    EntraIdTokenProvider,
+    Settings,
+    get_model_client_cache,
+)
 
 
 class TestAzureOpenAiWrapper:
@@ -11,7 +20,8 @@ class TestAzureOpenAiWrapper:
     def setup_method(self):
         """Reset class-level variables before each test."""
         AzureOpenAiWrapper._credentials.clear()
-        AzureOpenAiWrapper._tokens.clear()
+        AzureOpenAiWrapper._token_providers.clear()
+        get_model_client_cache().clear()
 
     def test_lazy_initialization_api_key(self, caplog):
         """Test that API key authentication uses lazy initialization."""
@@ -53,6 +63,7 @@ class TestAzureOpenAiWrapper:
         mock_credential = Mock()
         mock_token_obj = Mock()
         mock_token_obj.token = "mock_token_123"
+        mock_token_obj.expires_on = time.time() + 3600
         mock_credential.get_token.return_value = mock_token_obj
         mock_credential_class.return_value = mock_credential
 
@@ -88,6 +99,7 @@ class TestAzureOpenAiWrapper:
         mock_credential = Mock()
         mock_token_obj = Mock()
         mock_token_obj.token = "mock_token_123"
+        mock_token_obj.expires_on = time.time() + 3600
         mock_credential.get_token.return_value = mock_token_obj
         mock_credential_class.return_value = mock_credential
 
@@ -180,6 +192,7 @@ class TestAzureOpenAiWrapper:
         mock_credential = Mock()
         mock_token_obj = Mock()
         mock_token_obj.token = "mock_token_123"
+        mock_token_obj.expires_on = time.time() + 3600
         mock_credential.get_token.return_value = mock_token_obj
         mock_credential_class.return_value = mock_credential
 
@@ -210,3 +223,190 @@ class TestAzureOpenAiWrapper:
             # Should see both authentication methods being used
             assert "Using API key for authentication" in caplog.text
             assert "Initializing Microsoft Entra ID authentication" in caplog.text
+
+    def test_models_are_shared_across_instances(self):
+        """Test that wrappers with the same settings share model objects and one HTTP pool."""
+        settings = Settings(
+            azure_openai_use_microsoft_entra_id="false",
+            azure_openai_api_key="dummy_key",
+            azure_openai_endpoint="https://dummy.openai.azure.com/",
+        )
+
+        wrapper1 = AzureOpenAiWrapper(settings)
+        wrapper2 = AzureOpenAiWrapper(settings)
+
+        assert wrapper1.chat_model is wrapper2.chat_model
+        assert wrapper1.embedding_model is wrapper2.embedding_model
+        assert wrapper1.reasoning_model is not wrapper1.chat_model
+        assert wrapper1.chat_model.http_client is wrapper1.embedding_model.http_client
+        assert len(get_model_client_cache()) == 3
+
+    def test_different_keys_do_not_share_models(self):
+        """Test that the API key is part of the cache key."""
+        settings1 = Settings(azure_openai_use_microsoft_entra_id="false", azure_openai_api_key="key1")
+        settings2 = Settings(azure_openai_use_microsoft_entra_id="false", azure_openai_api_key="key2")
+
+        model1 = AzureOpenAiWrapper(settings1).chat_model
+        model2 = AzureOpenAiWrapper(settings2).chat_model
+
+        assert model1 is not model2
+        assert model1.http_client is model2.http_client
+
+    def test_stats(self):
+        """Test that stats describe the live models and pool limits without exposing keys."""
+        settings = Settings(
+            azure_openai_use_microsoft_entra_id="false",
+            azure_openai_api_key="secret_key",
+            azure_openai_endpoint="https://dummy.openai.azure.com/",
+            azure_openai_http_max_connections=10,
+        )
+        _ = AzureOpenAiWrapper(settings).chat_model
+
+        stats = get_model_client_cache().stats()
+
+        assert stats["models"] == [
+            {
+                "kind": "chat",
+                "deployment": "gpt-4o",
+                "endpoint": "https://dummy.openai.azure.com/",
+                "auth_mode": "api_key",
+                "api_version": settings.azure_openai_api_version,
+                "options": {"stream_usage": True, "streaming": True},
+            }
+        ]
+        pools = [(pool["async"], pool["max_connections"], pool["connections"]) for pool in stats["http_clients"]]
+        assert pools == [(False, 10, 0), (True, 10, 0)]
+        assert "secret_key" not in str(stats)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCredential:
+    def __init__(self, lifetime: float = 3600, delay: float = 0.0):
+        self.lifetime = lifetime
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_token(self, *scopes) -> AccessToken:
+        with self.lock:
+            self.calls += 1
+            number = self.calls
+        time.sleep(self.delay)
+        return AccessToken(f"token_{number}", int(time.time() + self.lifetime))
+
+
+class TestEntraIdTokenProvider:
+    """Test cases for EntraIdTokenProvider."""
+
+    def test_fresh_token_is_reused(self):
+        """Test that a token outside the refresh margin is served without calling the credential."""
+        credential = FakeCredential()
+        provider = EntraIdTokenProvider(credential, refresh_margin_seconds=300)
+
+        assert provider() == "token_1"
+        assert provider() == "token_1"
+        assert credential.calls == 1
+        provider.close()
+
+    def test_concurrent_fetches_are_single_flight(self):
+        """Test that threads needing a token at the same time share one credential call."""
+        credential = FakeCredential(delay=0.1)
+        provider = EntraIdTokenProvider(credential)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(provider())) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["token_1"] * 10
+        assert credential.calls == 1
+        provider.close()
+
+    def test_token_inside_margin_is_refreshed_in_background(self):
+        """Test that a token about to expire is still served while a new one is fetched."""
+        credential = FakeCredential(lifetime=3600)
+        provider = EntraIdTokenProvider(credential, refresh_margin_seconds=300)
+        provider()
+        provider.close()
+        # Pretend the first token now expires in 100 seconds and its timed refresh is overdue
+        provider._token = AccessToken("token_1", int(time.time() + 100))
+        provider._retry_at = 0.0
+
+        assert provider() == "token_1"
+        provider._background.join(5)
+        assert provider() == "token_2"
+        provider.close()
+
+    def test_token_is_refreshed_before_expiry_without_callers(self):
+        """Test that the scheduled refresh replaces the token before it expires."""
+        credential = FakeCredential(lifetime=301)
+        provider = EntraIdTokenProvider(credential, refresh_margin_seconds=300, min_refresh_interval_seconds=0.5)
+        provider()
+
+        deadline = time.time() + 5
+        while credential.calls < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        provider.close()
+
+        assert credential.calls >= 2
+
+    def test_token_shorter_than_margin_is_not_refetched_in_a_loop(self):
+        """Test that a token issued inside the refresh margin is not refreshed again right away."""
+        credential = FakeCredential(lifetime=200)
+        provider = EntraIdTokenProvider(credential, refresh_margin_seconds=300)
+
+        deadline = time.time() + 1
+        while time.time() < deadline:
+            assert provider() == "token_1"
+            time.sleep(0.01)
+        provider.close()
+
+        assert credential.calls == 1
+
+    def test_stale_tokens_back_off(self):
+        """Test that the refresh interval doubles while the credential returns no fresher token."""
+        clock = FakeClock()
+        credential = Mock()
+        credential.get_token.return_value = AccessToken("cached", 200)
+        provider = EntraIdTokenProvider(credential, refresh_margin_seconds=300, clock=clock)
+
+        provider()
+        clock.now = 31
+        provider()
+        provider._background.join(5)
+        clock.now = 60
+        provider()
+        provider.close()
+
+        assert credential.get_token.call_count == 2
+        assert provider._retry_at == 91
+
+    @patch("template_langgraph.llms.azure_openais.DefaultAzureCredential")
+    def test_models_use_the_token_provider(self, mock_credential_class):
+        """Test that Entra ID models get a token provider instead of a static token."""
+        AzureOpenAiWrapper._credentials.clear()
+        AzureOpenAiWrapper._token_providers.clear()
+        get_model_client_cache().clear()
+        mock_credential_class.return_value = FakeCredential()
+        settings = Settings(
+            azure_openai_use_microsoft_entra_id="true",
+            azure_openai_endpoint="https://dummy.openai.azure.com/",
+        )
+        wrapper = AzureOpenAiWrapper(settings)
+
+        model = wrapper.chat_model
+
+        provider = wrapper._get_token_provider()
+        assert model.azure_ad_token is None
+        assert model.azure_ad_token_provider is provider
+        assert asyncio.run(model.azure_ad_async_token_provider()) == "token_1"
+        provider.close()
@@ -0,0 +1,249 @@
+import asyncio
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from template_langgraph.llms.azure_openais import AzureOpenAiWrapper
+from template_langgraph.llms.chat_routers import (
+    ChatRouter,
+    CircuitBreaker,
+    RouteBackend,
+    RoutingChatModel,
+    Settings,
+)
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+class FakeChatModel(BaseChatModel):
+    reply: str
+    error: Exception | None = None
+    calls: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=[tool.__name__ for tool in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.reply))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any):
+        if self.error is not None:
+            raise self.error
+        for char in self.reply:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=char))
+
+
+class SlowChatModel(FakeChatModel):
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(10)
+        return self._generate(messages, stop=stop, **kwargs)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_backend(name: str, error: Exception | None = None, **kwargs) -> RouteBackend:
+    return RouteBackend(name=name, model=FakeChatModel(reply=name, error=error, calls=[]), **kwargs)
+
+
+def make_model(*backends: RouteBackend, **kwargs) -> RoutingChatModel:
+    return RoutingChatModel(router=ChatRouter(backends=list(backends), **kwargs))
+
+
+class TestChatRouter:
+    """Test cases for backend selection."""
+
+    def test_least_outstanding_respects_weights(self):
+        """Test that the backend with the lowest weighted load is tried first."""
+        busy = make_backend("busy", weight=2.0, outstanding=3)
+        idle = make_backend("idle", weight=1.0, outstanding=0)
+
+        assert [backend.name for backend in ChatRouter([busy, idle]).candidates()] == ["idle", "busy"]
+
+    def test_latency_ewma_prefers_the_faster_backend(self):
+        """Test that the latency strategy prefers the backend with the lower EWMA."""
+        slow = make_backend("slow", ewma_latency_seconds=2.0)
+        fast = make_backend("fast", ewma_latency_seconds=0.5)
+
+        router = ChatRouter([slow, fast], strategy="latency_ewma")
+
+        assert [backend.name for backend in router.candidates()] == ["fast", "slow"]
+
+    def test_local_backend_only_when_remote_is_saturated(self):
+        """Test that a local backend takes requests only once every remote backend is saturated."""
+        remote = make_backend("remote", max_outstanding=1)
+        local = make_backend("local", local=True)
+        router = ChatRouter([local, remote])
+
+        assert [backend.name for backend in router.candidates()] == ["remote", "local"]
+        remote.outstanding = 1
+        assert [backend.name for backend in router.candidates()] == ["local"]
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_and_recovers_through_a_probe(self):
+        """Test that the circuit opens after consecutive failures and a successful probe closes it."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.on_failure(0)
+        assert breaker.state(0) == "closed"
+        breaker.on_failure(1)
+        assert not breaker.available(10)
+
+        assert breaker.available(31)
+        breaker.on_start(31)
+        assert not breaker.available(31)
+        breaker.on_success()
+        assert breaker.state(32) == "closed"
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe opens the circuit again for the full timeout."""
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        for _ in range(5):
+            breaker.on_failure(0)
+        breaker.on_start(30)
+        breaker.on_failure(30)
+
+        assert breaker.state(59) == "open"
+
+
+class TestRoutingChatModel:
+    """Test cases for RoutingChatModel."""
+
+    def test_fails_over_on_backend_errors(self):
+        """Test that a 5xx moves the request to the next backend and is counted."""
+        model = make_model(make_backend("primary", error=StatusError(503)), make_backend("secondary"))
+
+        assert model.invoke([HumanMessage(content="hi")]).content == "secondary"
+
+        stats = {entry["name"]: entry for entry in model.router.stats()}
+        assert stats["primary"]["failures"] == 1
+        assert stats["secondary"]["requests"] == 1
+        assert stats["secondary"]["ewma_latency_ms"] is not None
+        assert all(entry["outstanding"] == 0 for entry in stats.values())
+
+    def test_client_errors_are_raised(self):
+        """Test that a 400 is raised without failing over or opening the circuit."""
+        model = make_model(make_backend("primary", error=StatusError(400)), make_backend("secondary"))
+
+        with pytest.raises(StatusError):
+            model.invoke("hi")
+
+        stats = {entry["name"]: entry for entry in model.router.stats()}
+        assert stats["primary"]["client_errors"] == 1
+        assert stats["secondary"]["requests"] == 0
+        assert stats["primary"]["circuit"] == "closed"
+
+    def test_open_circuit_skips_the_backend(self):
+        """Test that a backend whose circuit is open receives no requests until the timeout."""
+        clock = FakeClock()
+        primary = make_backend("primary", error=StatusError(429), breaker=CircuitBreaker(failure_threshold=1))
+        model = make_model(primary, make_backend("secondary"), clock=clock)
+
+        model.invoke("hi")
+        model.invoke("hi")
+        clock.now = 31
+        model.invoke("hi")
+
+        assert len(primary.model.calls) == 2
+
+    def test_all_backends_failing_raises_the_last_error(self):
+        """Test that the last backend error is raised when every backend fails."""
+        model = make_model(make_backend("a", error=StatusError(500)), make_backend("b", error=StatusError(502)))
+
+        with pytest.raises(StatusError, match="502"):
+            model.invoke("hi")
+
+    def test_stream_fails_over_before_the_first_chunk(self):
+        """Test that streaming falls back to the next backend when the first fails up front."""
+        model = make_model(make_backend("primary", error=ConnectionError()), make_backend("ok"))
+
+        assert "".join(chunk.content for chunk in model.stream("hi")) == "ok"
+        assert asyncio.run(model.ainvoke("hi")).content == "ok"
+
+    def test_closed_stream_releases_the_backend(self):
+        """Test that streams closed early do not leave the backend saturated."""
+        backend = make_backend("primary", max_outstanding=2)
+        model = make_model(backend)
+
+        for _ in range(3):
+            stream = model.stream("hi")
+            next(stream)
+            stream.close()
+
+        assert backend.outstanding == 0
+        assert not backend.saturated()
+
+    def test_cancelled_request_releases_the_backend(self):
+        """Test that a cancelled ainvoke releases its slot and its half-open probe."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        breaker.on_failure(0)
+        backend = RouteBackend(name="primary", model=SlowChatModel(reply="primary", calls=[]), breaker=breaker)
+        model = make_model(backend, clock=clock)
+        clock.now = 31
+
+        async def cancel():
+            task = asyncio.create_task(model.ainvoke("hi"))
+            await asyncio.sleep(0.05)
+            assert breaker.probing
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel())
+
+        assert backend.outstanding == 0
+        assert not breaker.probing
+        assert breaker.available(clock.now)
+
+    def test_bind_tools_applies_to_the_chosen_backend(self):
+        """Test that bound tools reach the backend and the bound model shares the router."""
+
+        def search_qdrant(keywords: str) -> str:
+            """Search."""
+            return keywords
+
+        backend = make_backend("primary")
+        model = make_model(backend)
+
+        bound = model.bind_tools([search_qdrant])
+        bound.invoke("hi")
+
+        assert backend.model.calls[-1]["tools"] == ["search_qdrant"]
+        assert bound.router is model.router
+        assert model.router.stats()[0]["requests"] == 1
+
+    def test_wrapper_returns_the_router_when_enabled(self):
+        """Test that AzureOpenAiWrapper.chat_model returns the router when CHAT_ROUTER_ENABLED is set."""
+        router_model = make_model(make_backend("primary"))
+
+        with (
+            patch(
+                "template_langgraph.llms.chat_routers.get_chat_router_settings",
+                return_value=Settings(chat_router_enabled=True),
+            ),
+            patch("template_langgraph.llms.chat_routers.get_routing_chat_model", return_value=router_model),
+        ):
+            assert AzureOpenAiWrapper().chat_model is router_model
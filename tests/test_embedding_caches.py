@@ -0,0 +1,95 @@
+import asyncio
+
+from langchain_core.embeddings import Embeddings
+
+from template_langgraph.llms.embedding_caches import CachedEmbeddings, EmbeddingCache, Settings, make_key
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache and CachedEmbeddings."""
+
+    def test_key_normalizes_text_and_includes_model(self):
+        """Test that surrounding whitespace is ignored but the model is part of the key."""
+        assert make_key("model-a", " KABUTO ") == make_key("model-a", "KABUTO")
+        assert make_key("model-a", "KABUTO") != make_key("model-b", "KABUTO")
+
+    def test_memory_tier_hits_and_misses(self):
+        """Test that a repeated query is served from memory."""
+        embeddings = CountingEmbeddings()
+        cache = EmbeddingCache(settings=Settings())
+        cached = CachedEmbeddings(embeddings=embeddings, model="m", cache=cache)
+
+        first = cached.embed_query("hello")
+        second = cached.embed_query("hello")
+
+        assert first == second
+        assert len(embeddings.calls) == 1
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_embed_documents_only_sends_missing_texts(self):
+        """Test that a batch embeds only uncached texts, once each, and keeps the input order."""
+        embeddings = CountingEmbeddings()
+        cached = CachedEmbeddings(embeddings=embeddings, model="m", cache=EmbeddingCache(settings=Settings()))
+        cached.embed_query("a")
+
+        vectors = cached.embed_documents(["bb", "a", "bb", "ccc"])
+
+        assert embeddings.calls[-1] == ["bb", "ccc"]
+        assert [vector[0] for vector in vectors] == [2.0, 1.0, 2.0, 3.0]
+
+    def test_async_paths_use_the_cache(self):
+        """Test that aembed_query and aembed_documents share the cache with the sync paths."""
+        embeddings = CountingEmbeddings()
+        cached = CachedEmbeddings(embeddings=embeddings, model="m", cache=EmbeddingCache(settings=Settings()))
+        cached.embed_documents(["a", "b"])
+
+        asyncio.run(cached.aembed_query("a"))
+        asyncio.run(cached.aembed_documents(["b"]))
+
+        assert len(embeddings.calls) == 1
+
+    def test_memory_tier_is_size_bounded(self):
+        """Test that the least recently used vector is evicted first."""
+        cache = EmbeddingCache(settings=Settings(embedding_cache_max_entries=2))
+        cache.put("m", "a", [1.0])
+        cache.put("m", "b", [2.0])
+        cache.get("m", "a")
+        cache.put("m", "c", [3.0])
+
+        assert cache.get("m", "b") is None
+        assert cache.get("m", "a") == [1.0]
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk_tier_survives_a_new_cache(self, tmp_path):
+        """Test that vectors stored on disk are found by a fresh cache instance."""
+        settings = Settings(embedding_cache_path=str(tmp_path / "embeddings.sqlite"))
+        EmbeddingCache(settings=settings).put("m", "hello", [0.1, 0.2])
+
+        cache = EmbeddingCache(settings=settings)
+
+        assert cache.get("m", "hello") == [0.1, 0.2]
+        assert cache.stats()["disk_hits"] == 1
+
+    def test_disk_tier_is_size_bounded(self, tmp_path):
+        """Test that the disk tier evicts down to its maximum size."""
+        settings = Settings(
+            embedding_cache_path=str(tmp_path / "embeddings.sqlite"),
+            embedding_cache_disk_max_entries=2,
+        )
+        cache = EmbeddingCache(settings=settings)
+        cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+
+        assert cache.stats()["disk_entries"] == 2
@@ -0,0 +1,103 @@
+from unittest.mock import Mock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.tools import StructuredTool
+
+from template_langgraph.llms.prompt_caches import PromptPrefixCache, record_prompt_cache_usage
+
+
+def make_tool(name: str) -> StructuredTool:
+    def func(query: str) -> str:
+        return f"{name}:{query}"
+
+    return StructuredTool.from_function(func=func, name=name, description=f"Search {name}")
+
+
+class TestPromptPrefixCache:
+    """Test cases for PromptPrefixCache."""
+
+    def test_prefix_is_built_once_per_signature(self):
+        """Test that the tools are serialized and bound once for the same model, tools and system prompt."""
+        cache = PromptPrefixCache()
+        llm = Mock()
+        tools = [make_tool("qdrant"), make_tool("elasticsearch")]
+
+        first = cache.get(llm, tools, "Be brief.")
+        second = cache.get(llm, list(tools), "Be brief.")
+
+        assert second is first
+        llm.bind_tools.assert_called_once_with(tools=first.tool_schemas)
+        assert [schema["function"]["name"] for schema in first.tool_schemas] == ["qdrant", "elasticsearch"]
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    def test_signature_changes_build_a_new_prefix(self):
+        """Test that another system prompt or tool set gets its own prefix and key."""
+        cache = PromptPrefixCache()
+        llm = Mock()
+        tools = [make_tool("qdrant")]
+
+        base = cache.get(llm, tools, "Be brief.")
+        other_prompt = cache.get(llm, tools, "Be thorough.")
+        other_tools = cache.get(llm, [*tools, make_tool("elasticsearch")], "Be brief.")
+
+        assert len({base.key, other_prompt.key, other_tools.key}) == 3
+        assert llm.bind_tools.call_count == 3
+
+    def test_least_recently_used_prefix_is_evicted(self):
+        """Test that the cache keeps at most max_entries prefixes."""
+        cache = PromptPrefixCache(max_entries=2)
+        llm = Mock()
+
+        first = cache.get(llm, [], "a")
+        cache.get(llm, [], "b")
+        cache.get(llm, [], "a")
+        cache.get(llm, [], "c")
+
+        assert cache.get(llm, [], "a") is first
+        assert cache.stats()["entries"] == 2
+        cache.get(llm, [], "b")
+        assert cache.stats()["misses"] == 4
+
+    def test_layout_puts_the_system_message_first(self):
+        """Test that the same system message object leads every turn and is not duplicated."""
+        prefix = PromptPrefixCache().get(Mock(), [], "Be brief.")
+        history = [HumanMessage(content="Hi"), AIMessage(content="Hello"), HumanMessage(content="Bye")]
+
+        first = prefix.layout(history[:1])
+        later = prefix.layout(history)
+
+        assert first[0] is later[0] is prefix.system_message
+        assert later[1:] == history
+        carried = [SystemMessage(content="Be brief."), *history]
+        assert prefix.layout(carried) == carried
+        assert PromptPrefixCache().get(Mock(), [], None).layout(history) == history
+
+
+class TestRecordPromptCacheUsage:
+    """Test cases for record_prompt_cache_usage."""
+
+    def test_cached_tokens_are_reported(self):
+        """Test that the cached share of the prompt is read from the usage metadata."""
+        prefix = PromptPrefixCache().get(Mock(), [], "Be brief.")
+        message = AIMessage(
+            content="Hi",
+            usage_metadata={
+                "input_tokens": 2048,
+                "output_tokens": 10,
+                "total_tokens": 2058,
+                "input_token_details": {"cache_read": 1536},
+            },
+        )
+
+        assert record_prompt_cache_usage(message, prefix) == {
+            "prefix": prefix.key,
+            "input_tokens": 2048,
+            "cached_tokens": 1536,
+            "hit_ratio": 0.75,
+        }
+
+    def test_missing_usage_is_ignored(self):
+        """Test that responses without usage metadata report nothing."""
+        prefix = PromptPrefixCache().get(Mock(), [], None)
+
+        assert record_prompt_cache_usage(AIMessage(content="Hi"), prefix) is None
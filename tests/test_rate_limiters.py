@@ -0,0 +1,268 @@
+import asyncio
+import gc
+import json
+import threading
+
+import httpx
+import pytest
+
+from template_langgraph.llms.rate_limiters import (
+    AdaptiveConcurrency,
+    RateLimitedTransport,
+    RateLimiter,
+    RateLimiterRegistry,
+    Settings,
+    estimate_request_tokens,
+    parse_retry_after,
+)
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(fake: FakeTime, **kwargs) -> RateLimiter:
+    settings = Settings(llm_rate_limit_initial_concurrency=4, llm_rate_limit_max_concurrency=8)
+    return RateLimiter("test", settings=settings, clock=fake.clock, sleep=fake.sleep, **kwargs)
+
+
+class TestEstimates:
+    """Test cases for token estimates and header parsing."""
+
+    def test_request_tokens_include_prompt_and_completion_budget(self):
+        """Test that the estimate covers message text and max_tokens, counting Japanese per character."""
+        body = {
+            "messages": [{"role": "user", "content": "abcdefgh"}, {"role": "user", "content": "起動しない"}],
+            "max_tokens": 100,
+        }
+
+        # "user" twice (1 + 1), "abcdefgh" (2), five Japanese characters (5), the completion budget (100)
+        assert estimate_request_tokens(body) == 109
+
+    def test_embedding_input(self):
+        """Test that embedding inputs are estimated too."""
+        assert estimate_request_tokens({"input": ["abcd", "efgh"]}) == 2
+
+    def test_retry_after(self):
+        """Test that millisecond headers take precedence over retry-after."""
+        assert parse_retry_after(httpx.Headers({"retry-after": "2", "retry-after-ms": "500"})) == 0.5
+        assert parse_retry_after(httpx.Headers({"retry-after": "3"})) == 3.0
+        assert parse_retry_after(httpx.Headers({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+
+
+class TestRateLimiter:
+    """Test cases for RateLimiter."""
+
+    def test_requests_per_minute(self):
+        """Test that requests beyond the per-minute budget wait for the bucket to refill."""
+        fake = FakeTime()
+        limiter = make_limiter(fake, requests_per_minute=2)
+
+        for _ in range(3):
+            limiter.release(limiter.acquire(0))
+
+        assert fake.sleeps == [30.0]
+
+    def test_tokens_per_minute_reconciled_from_headers(self):
+        """Test that the token bucket follows the remaining tokens reported by the server."""
+        fake = FakeTime()
+        limiter = make_limiter(fake, tokens_per_minute=600)
+
+        permit = limiter.acquire(100)
+        limiter.complete(permit, 200, httpx.Headers({"x-ratelimit-remaining-tokens": "300"}))
+        limiter.release(permit)
+        limiter.release(limiter.acquire(400))
+
+        # 300 left, so 100 more tokens take 10 seconds at 10 tokens per second
+        assert fake.sleeps == [10.0]
+
+    def test_throttling_pauses_and_shrinks_concurrency(self):
+        """Test that a 429 pauses the deployment for retry-after and halves the concurrency."""
+        fake = FakeTime()
+        limiter = make_limiter(fake, tokens_per_minute=600)
+
+        permit = limiter.acquire(100)
+        limiter.complete(permit, 429, httpx.Headers({"retry-after-ms": "1500"}))
+        limiter.release(permit)
+        limiter.release(limiter.acquire(100))
+
+        assert fake.sleeps == [1.5]
+        assert limiter.concurrency.limit == 2
+        assert limiter.stats()["throttled"] == 1
+        # The throttled request's tokens were refunded
+        assert limiter.tokens.level == 500
+
+    def test_successes_grow_concurrency(self):
+        """Test that successful requests raise the concurrency limit additively."""
+        fake = FakeTime()
+        limiter = make_limiter(fake)
+
+        for _ in range(4):
+            permit = limiter.acquire(0)
+            limiter.complete(permit, 200, httpx.Headers())
+            limiter.release(permit)
+
+        assert int(limiter.concurrency.limit) == 4
+        assert 4.9 < limiter.concurrency.limit < 5
+
+
+class TestAdaptiveConcurrency:
+    """Test cases for AdaptiveConcurrency."""
+
+    def test_threads_wait_for_a_slot(self):
+        """Test that a thread beyond the limit waits until a slot is released."""
+        concurrency = AdaptiveConcurrency(initial=1)
+        concurrency.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (concurrency.acquire(), acquired.set()))
+        thread.start()
+
+        assert not acquired.wait(0.1)
+        concurrency.release()
+        assert acquired.wait(5)
+        thread.join()
+        assert concurrency.in_flight == 1
+
+    def test_async_waiters_are_served_in_order(self):
+        """Test that coroutines beyond the limit run as slots free up, in arrival order."""
+        concurrency = AdaptiveConcurrency(initial=2)
+        order = []
+
+        async def task(name: str):
+            await concurrency.aacquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            concurrency.release()
+
+        async def run():
+            await asyncio.gather(*(task(name) for name in "abcde"))
+
+        asyncio.run(run())
+
+        assert order == list("abcde")
+        assert concurrency.in_flight == 0
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        """Test that cancelling a waiting coroutine leaves the slots consistent."""
+        concurrency = AdaptiveConcurrency(initial=1)
+
+        async def run():
+            await concurrency.aacquire()
+            waiter = asyncio.create_task(concurrency.aacquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            concurrency.release()
+
+        asyncio.run(run())
+
+        assert concurrency.in_flight == 0
+
+
+class TestRateLimitedTransport:
+    """Test cases for RateLimitedTransport."""
+
+    def test_requests_are_limited_per_deployment(self):
+        """Test that requests are paced by their deployment's limiter and free their slot when closed."""
+        responses = iter([httpx.Response(429, headers={"retry-after-ms": "10"}), httpx.Response(200, json={})])
+        registry = RateLimiterRegistry(
+            settings=Settings(
+                llm_rate_limit_deployment_limits={"gpt-4o": {"tokens_per_minute": 60000}},
+                llm_rate_limit_max_concurrency=8,
+            )
+        )
+        client = httpx.Client(transport=RateLimitedTransport(httpx.MockTransport(lambda r: next(responses)), registry))
+        url = "https://dummy.openai.azure.com/openai/deployments/gpt-4o/chat/completions"
+        body = {"messages": [{"role": "user", "content": "hello"}], "max_tokens": 10}
+
+        assert client.post(url, content=json.dumps(body)).status_code == 429
+        assert client.post(url, content=json.dumps(body)).status_code == 200
+
+        limiter = registry.get("dummy.openai.azure.com", "gpt-4o")
+        stats = limiter.stats()
+        assert stats["throttled"] == 1
+        assert stats["in_flight"] == 0
+        assert stats["waited_seconds"] > 0
+        assert limiter.tokens.capacity == 60000
+        assert registry.get("dummy.openai.azure.com", "text-embedding-3-small").tokens is None
+
+    def test_dropped_response_frees_its_slot(self):
+        """Test that a streamed response that is never closed frees its slot once garbage collected."""
+        registry = RateLimiterRegistry(settings=Settings(llm_rate_limit_max_concurrency=1))
+        transport = RateLimitedTransport(
+            httpx.MockTransport(lambda request: httpx.Response(200, stream=httpx.ByteStream(b"{}"))),
+            registry,
+        )
+        request = httpx.Request("POST", "https://dummy.openai.azure.com/openai/deployments/gpt-4o/chat/completions")
+        limiter = registry.get("dummy.openai.azure.com", "gpt-4o")
+
+        response = transport.handle_request(request)
+        assert limiter.stats()["in_flight"] == 1
+        del response
+        gc.collect()
+
+        assert limiter.stats()["in_flight"] == 0
+
+
+class TestDefaults:
+    """Test cases for the default limits."""
+
+    def test_concurrency_is_unlimited_by_default(self):
+        """Test that no concurrency limit applies unless a maximum is configured."""
+        limiter = RateLimiter("test", settings=Settings())
+
+        permits = [limiter.acquire(10) for _ in range(100)]
+
+        assert limiter.concurrency is None
+        assert limiter.stats()["concurrency_limit"] is None
+        for permit in permits:
+            limiter.release(permit)
+
+    def test_initial_concurrency_defaults_to_the_maximum(self):
+        """Test that an initial concurrency of 0 starts at the configured maximum."""
+        limiter = RateLimiter("test", settings=Settings(llm_rate_limit_max_concurrency=32))
+
+        assert limiter.stats()["concurrency_limit"] == 32
+
+
+class TestAcquireTimeout:
+    """Test cases for waiting on a concurrency slot."""
+
+    def test_sync_acquire_times_out(self):
+        """Test that a thread waiting too long for a slot gets httpx.PoolTimeout and leaves the queue."""
+        settings = Settings(llm_rate_limit_max_concurrency=1, llm_rate_limit_acquire_timeout_seconds=0.05)
+        limiter = RateLimiter("test", settings=settings)
+        permit = limiter.acquire(10)
+
+        with pytest.raises(httpx.PoolTimeout):
+            limiter.acquire(10)
+
+        limiter.release(permit)
+        assert limiter.stats()["in_flight"] == 0
+        limiter.release(limiter.acquire(10))
+
+    def test_async_acquire_times_out(self):
+        """Test that a task waiting too long for a slot gets httpx.PoolTimeout without leaking a slot."""
+        settings = Settings(llm_rate_limit_max_concurrency=1, llm_rate_limit_acquire_timeout_seconds=0.05)
+        limiter = RateLimiter("test", settings=settings)
+
+        async def run():
+            permit = await limiter.aacquire(10)
+            with pytest.raises(httpx.PoolTimeout):
+                await limiter.aacquire(10)
+            limiter.release(permit)
+            limiter.release(await limiter.aacquire(10))
+
+        asyncio.run(run())
+
+        assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,96 @@
+import subprocess
+import sys
+
+from template_langgraph.llms.semantic_caches import SemanticResponseCache, Settings, make_namespace
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+VECTORS = {
+    "How do I restart KABUTO?": [1.0, 0.0, 0.0],
+    "How can I restart KABUTO?": [0.99, 0.1, 0.0],
+    "What does error 0101 mean?": [0.0, 1.0, 0.0],
+    "Is KABUTO waterproof?": [0.0, 0.0, 1.0],
+}
+
+
+def make_cache(clock=None, **kwargs) -> SemanticResponseCache:
+    return SemanticResponseCache(
+        embed=lambda text: VECTORS[text],
+        settings=Settings(**kwargs),
+        clock=clock or FakeClock(),
+    )
+
+
+class TestSemanticResponseCache:
+    """Test cases for SemanticResponseCache."""
+
+    def test_paraphrase_above_threshold_hits(self):
+        """Test that a similar question returns the cached answer."""
+        cache = make_cache(semantic_cache_similarity_threshold=0.95)
+        cache.store("ns", "How do I restart KABUTO?", "Hold the power button.")
+
+        hit = cache.lookup("ns", "How can I restart KABUTO?")
+
+        assert hit.answer == "Hold the power button."
+        assert hit.question == "How do I restart KABUTO?"
+        assert hit.similarity > 0.95
+
+    def test_dissimilar_question_misses(self):
+        """Test that an unrelated question is not answered from the cache."""
+        cache = make_cache()
+        cache.store("ns", "How do I restart KABUTO?", "Hold the power button.")
+
+        assert cache.lookup("ns", "What does error 0101 mean?") is None
+
+    def test_namespaces_are_isolated(self):
+        """Test that an entry is only visible in its namespace."""
+        cache = make_cache()
+        cache.store(make_namespace("prompt A", "gpt-4o"), "How do I restart KABUTO?", "A")
+
+        assert cache.lookup(make_namespace("prompt B", "gpt-4o"), "How do I restart KABUTO?") is None
+        assert cache.lookup(make_namespace("prompt A", "gpt-4o"), "How do I restart KABUTO?").answer == "A"
+
+    def test_entries_expire(self):
+        """Test that expired entries are not served and are dropped on the next store."""
+        clock = FakeClock()
+        cache = make_cache(clock=clock, semantic_cache_ttl_seconds=10)
+        cache.store("ns", "How do I restart KABUTO?", "Hold the power button.")
+
+        clock.now = 11
+        assert cache.lookup("ns", "How do I restart KABUTO?") is None
+
+        cache.store("ns", "Is KABUTO waterproof?", "No.")
+        assert len(cache) == 1
+
+    def test_oldest_entries_are_evicted(self):
+        """Test that a namespace keeps at most semantic_cache_max_entries entries."""
+        cache = make_cache(semantic_cache_max_entries=2)
+        cache.store("ns", "How do I restart KABUTO?", "Hold the power button.")
+        cache.store("ns", "What does error 0101 mean?", "Overheating.")
+        cache.store("ns", "Is KABUTO waterproof?", "No.")
+
+        assert len(cache) == 2
+        assert cache.lookup("ns", "How do I restart KABUTO?") is None
+        assert cache.lookup("ns", "Is KABUTO waterproof?").answer == "No."
+
+    def test_agent_import_does_not_load_numpy(self):
+        """Test that importing an agent with the cache disabled does not import numpy."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys; import template_langgraph.agents.chat_with_tools_agent.agent; "
+                "print('numpy' in sys.modules)",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        assert result.stdout.split() == ["False"]
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+
+from template_langgraph.tools.ai_search_tool import AiSearchClientWrapper, Settings
+
+
+class TestIndexDocuments:
+    """Test cases for AiSearchClientWrapper.index_documents."""
+
+    @patch("template_langgraph.tools.ai_search_tool.AzureSearch")
+    def test_documents_are_streamed_in_batches(self, mock_azure_search):
+        """Test that documents are added batch by batch while the generator is still being consumed."""
+        produced = []
+
+        def documents():
+            for i in range(5):
+                produced.append(i)
+                yield Document(page_content=f"chunk {i}", metadata={"chunk_id": f"id_{i}"})
+
+        seen = []
+
+        def add_documents(documents, ids):
+            seen.append((ids, len(produced)))
+            return ids
+
+        mock_azure_search.return_value.add_documents.side_effect = add_documents
+        wrapper = AiSearchClientWrapper(settings=Settings(ai_search_index_batch_size=2))
+
+        assert wrapper.index_documents(documents()) == 5
+        assert seen == [(["id_0", "id_1"], 2), (["id_2", "id_3"], 4), (["id_4"], 5)]
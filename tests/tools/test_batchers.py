@@ -0,0 +1,144 @@
+import asyncio
+import threading
+
+import pytest
+
+from template_langgraph.tools.batchers import MicroBatcher, Settings
+
+
+class Recorder:
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, items: list[str]) -> list[str]:
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [item.upper() for item in items]
+
+    async def acall(self, items: list[str]) -> list[str]:
+        return self(items)
+
+
+def make_batcher(recorder: Recorder, window_ms: float = 50, max_size: int = 32) -> MicroBatcher:
+    settings = Settings(search_batch_window_ms=window_ms, search_batch_max_size=max_size)
+    return MicroBatcher("test", recorder, recorder.acall, settings=settings)
+
+
+def submit_concurrently(batcher: MicroBatcher, items: list[str]) -> dict:
+    results = {}
+
+    def run(item):
+        try:
+            results[item] = batcher.submit(item)
+        except Exception as e:
+            results[item] = e
+
+    threads = [threading.Thread(target=run, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestMicroBatcher:
+    """Test cases for MicroBatcher."""
+
+    def test_no_window_runs_each_call_alone(self):
+        """Test that a window of 0 disables batching."""
+        recorder = Recorder()
+        batcher = make_batcher(recorder, window_ms=0)
+
+        assert batcher.submit("a") == "A"
+        assert batcher.submit("b") == "B"
+        assert recorder.batches == [["a"], ["b"]]
+
+    def test_concurrent_calls_are_coalesced(self):
+        """Test that calls from several threads within the window share one batch."""
+        recorder = Recorder()
+        batcher = make_batcher(recorder, window_ms=200)
+
+        results = submit_concurrently(batcher, ["a", "b", "c"])
+
+        assert results == {"a": "A", "b": "B", "c": "C"}
+        assert len(recorder.batches) == 1
+        assert sorted(recorder.batches[0]) == ["a", "b", "c"]
+
+    def test_full_batch_runs_before_the_window_ends(self):
+        """Test that a batch is closed once it reaches the maximum size."""
+        recorder = Recorder()
+        batcher = make_batcher(recorder, window_ms=60_000, max_size=2)
+
+        results = submit_concurrently(batcher, ["a", "b"])
+
+        assert results == {"a": "A", "b": "B"}
+        assert len(recorder.batches) == 1
+
+    def test_errors_reach_every_caller(self):
+        """Test that a failing batch raises in every call that joined it."""
+        batcher = make_batcher(Recorder(fail=True), window_ms=200)
+
+        results = submit_concurrently(batcher, ["a", "b"])
+
+        assert all(isinstance(result, RuntimeError) for result in results.values())
+
+    def test_async_calls_are_coalesced(self):
+        """Test that concurrent coroutines on one loop share one batch and get their own results."""
+        recorder = Recorder()
+        batcher = make_batcher(recorder, window_ms=20, max_size=3)
+
+        async def run():
+            return await asyncio.gather(*(batcher.asubmit(item) for item in ["a", "b", "c", "d"]))
+
+        assert asyncio.run(run()) == ["A", "B", "C", "D"]
+        assert recorder.batches == [["a", "b", "c"], ["d"]]
+
+    def test_async_errors_reach_every_caller(self):
+        """Test that a failing async batch raises in every coroutine that joined it."""
+        batcher = make_batcher(Recorder(fail=True), window_ms=20)
+
+        async def run():
+            return await asyncio.gather(batcher.asubmit("a"), batcher.asubmit("b"), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.asubmit("c"))
+
+    def test_wrong_result_count_fails_every_caller(self):
+        """Test that a batch function returning too few results fails every call instead of leaving some waiting."""
+        batcher = MicroBatcher(
+            "test",
+            lambda items: items[:1],
+            None,
+            settings=Settings(search_batch_window_ms=200, search_batch_max_size=32),
+        )
+
+        results = submit_concurrently(batcher, ["a", "b"])
+
+        assert all(isinstance(result, ValueError) for result in results.values())
+
+    def test_cancelled_async_batch_cancels_every_caller(self):
+        """Test that cancelling a running async batch cancels the coroutines that joined it."""
+        started = asyncio.Event()
+
+        async def abatch_fn(items: list[str]) -> list[str]:
+            started.set()
+            await asyncio.sleep(60)
+            return items
+
+        batcher = MicroBatcher("test", None, abatch_fn, settings=Settings(search_batch_window_ms=20))
+
+        async def run():
+            callers = asyncio.gather(batcher.asubmit("a"), batcher.asubmit("b"), return_exceptions=True)
+            await started.wait()
+            for task in list(batcher._tasks):
+                task.cancel()
+            return await asyncio.wait_for(callers, timeout=5)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, Mock
+
+from template_langgraph.tools.client_registry import (
+    ClientRegistry,
+    Settings,
+    get_client_registry,
+)
+
+
+class TestClientRegistry:
+    """Test cases for ClientRegistry."""
+
+    def test_get_or_create_reuses_client(self):
+        """Test that the same client is returned for the same backend and settings."""
+        registry = ClientRegistry(settings=Settings())
+        factory = Mock(side_effect=lambda: object())
+
+        client1 = registry.get_or_create(backend="qdrant", factory=factory, settings=Settings())
+        client2 = registry.get_or_create(backend="qdrant", factory=factory, settings=Settings())
+
+        assert client1 is client2
+        assert factory.call_count == 1
+        assert len(registry) == 1
+
+    def test_different_settings_get_different_clients(self):
+        """Test that clients are keyed by settings as well as backend."""
+        registry = ClientRegistry(settings=Settings())
+        factory = Mock(side_effect=lambda: object())
+
+        client1 = registry.get_or_create(backend="qdrant", factory=factory, settings=Settings())
+        client2 = registry.get_or_create(
+            backend="qdrant",
+            factory=factory,
+            settings=Settings(client_registry_idle_timeout_seconds=1.0),
+        )
+
+        assert client1 is not client2
+        assert len(registry) == 2
+
+    def test_unhealthy_client_is_recreated(self):
+        """Test that a client failing its health check is closed and rebuilt."""
+        registry = ClientRegistry(
+            settings=Settings(
+                client_registry_health_check_interval_seconds=0.0,
+                client_registry_close_grace_seconds=0.0,
+            )
+        )
+        factory = Mock(side_effect=lambda: object())
+        close = Mock()
+
+        client1 = registry.get_or_create(
+            backend="elasticsearch",
+            factory=factory,
+            health_check=lambda client: False,
+            close=close,
+        )
+        client2 = registry.get_or_create(
+            backend="elasticsearch",
+            factory=factory,
+            health_check=lambda client: False,
+            close=close,
+        )
+
+        assert client1 is not client2
+        close.assert_called_once_with(client1)
+
+    def test_health_check_error_is_treated_as_unhealthy(self):
+        """Test that an exception raised by the health check triggers recreation."""
+        registry = ClientRegistry(settings=Settings(client_registry_health_check_interval_seconds=0.0))
+        factory = Mock(side_effect=lambda: object())
+
+        def health_check(client):
+            raise ConnectionError("down")
+
+        registry.get_or_create(backend="qdrant", factory=factory, health_check=health_check)
+        registry.get_or_create(backend="qdrant", factory=factory, health_check=health_check)
+
+        assert factory.call_count == 2
+
+    def test_evict_idle(self):
+        """Test that idle clients are closed and dropped."""
+        registry = ClientRegistry(
+            settings=Settings(client_registry_idle_timeout_seconds=10.0, client_registry_close_grace_seconds=0.0)
+        )
+        close = Mock()
+        client = registry.get_or_create(backend="dify", factory=object, close=close)
+
+        assert registry.evict_idle(now=0.0) == 0
+        assert registry.evict_idle(now=10_000_000.0) == 1
+        close.assert_called_once_with(client)
+        assert len(registry) == 0
+
+    def test_evicted_client_is_closed_after_the_grace_period(self):
+        """Test that an evicted client stays open for calls that may still be using it."""
+        registry = ClientRegistry(
+            settings=Settings(client_registry_idle_timeout_seconds=10.0, client_registry_close_grace_seconds=60.0)
+        )
+        close = Mock()
+        client = registry.get_or_create(backend="dify", factory=object, close=close)
+
+        assert registry.evict_idle(now=10_000_000.0) == 1
+        close.assert_not_called()
+        assert len(registry) == 0
+
+        registry.evict_idle(now=10_000_060.0)
+        close.assert_called_once_with(client)
+
+    def test_slow_health_check_does_not_block_other_backends(self):
+        """Test that a health check only delays its own backend, whose callers keep the current client."""
+        registry = ClientRegistry(settings=Settings(client_registry_health_check_interval_seconds=0.0))
+        checking = threading.Event()
+        release = threading.Event()
+
+        def slow_health_check(client):
+            checking.set()
+            release.wait(5)
+            return True
+
+        slow = registry.get_or_create(backend="slow", factory=object, health_check=slow_health_check)
+        thread = threading.Thread(
+            target=registry.get_or_create,
+            kwargs={"backend": "slow", "factory": object, "health_check": slow_health_check},
+        )
+        thread.start()
+        assert checking.wait(5)
+
+        started_at = time.monotonic()
+        registry.get_or_create(backend="other", factory=object)
+        same = registry.get_or_create(backend="slow", factory=object, health_check=slow_health_check)
+        elapsed = time.monotonic() - started_at
+        release.set()
+        thread.join(5)
+
+        assert elapsed < 1.0
+        assert same is slow
+
+    def test_close_all(self):
+        """Test that close_all closes every client and tolerates close errors."""
+        registry = ClientRegistry(settings=Settings())
+        close_ok = Mock()
+        close_error = Mock(side_effect=RuntimeError("boom"))
+        registry.get_or_create(backend="a", factory=object, close=close_ok)
+        registry.get_or_create(backend="b", factory=object, close=close_error)
+
+        registry.close_all()
+
+        close_ok.assert_called_once()
+        close_error.assert_called_once()
+        assert len(registry) == 0
+        assert registry.stats() == []
+
+    def test_get_client_registry_cached(self):
+        """Test that get_client_registry returns a process-wide singleton."""
+        assert get_client_registry() is get_client_registry()
+
+
+class TestClientRegistryForLoop:
+    """Test cases for loop-scoped async clients."""
+
+    def test_clients_are_scoped_per_event_loop(self):
+        """Test that each event loop gets its own async client."""
+        registry = ClientRegistry(settings=Settings())
+
+        async def get_client():
+            return registry.get_or_create_for_loop(backend="qdrant", factory=object)
+
+        async def get_client_twice():
+            return await get_client(), await get_client()
+
+        client1, client2 = asyncio.run(get_client_twice())
+        client3 = asyncio.run(get_client())
+
+        assert client1 is client2
+        assert client1 is not client3
+        # The client of the first loop is dropped once that loop is closed
+        assert len(registry) == 1
+
+    def test_client_is_closed_when_asyncio_run_ends(self):
+        """Test that an async client is closed while its loop shuts down and leaves the registry."""
+        registry = ClientRegistry(settings=Settings())
+        aclose = AsyncMock()
+
+        async def get_client():
+            return registry.get_or_create_for_loop(backend="qdrant", factory=object, aclose=aclose)
+
+        client = asyncio.run(get_client())
+
+        aclose.assert_awaited_once_with(client)
+        assert len(registry) == 0
+
+    def test_clients_of_closed_loops_are_dropped(self):
+        """Test that clients of a loop closed without shutting down are dropped on the next lookup."""
+        registry = ClientRegistry(settings=Settings())
+
+        async def get_client():
+            return registry.get_or_create_for_loop(backend="qdrant", factory=object)
+
+        loop = asyncio.new_event_loop()
+        stale = loop.run_until_complete(get_client())
+        loop.close()
+        fresh = asyncio.run(get_client())
+
+        assert fresh is not stale
+        assert len(registry) == 1
+
+    def test_close_skips_closed_loop(self):
+        """Test that closing an async client whose loop is gone does not raise."""
+        registry = ClientRegistry(settings=Settings())
+        aclose = AsyncMock()
+
+        async def get_client():
+            return registry.get_or_create_for_loop(backend="qdrant", factory=object, aclose=aclose)
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(get_client())
+        loop.close()
+        registry.close_all()
+
+        aclose.assert_not_awaited()
@@ -0,0 +1,67 @@
+from unittest.mock import Mock
+
+from langchain_core.tools import StructuredTool
+
+from template_langgraph.tools.common import ToolRegistry, get_tool_registry
+
+
+def sync_tool(query: str) -> str:
+    """Sync tool."""
+    return query
+
+
+async def async_tool(query: str) -> str:
+    """Async tool."""
+    return query
+
+
+class TestToolRegistry:
+    """Test cases for ToolRegistry."""
+
+    def test_providers_are_resolved_lazily_and_once(self):
+        """Test that providers run on first use only."""
+        provider = Mock(return_value=[StructuredTool.from_function(func=sync_tool)])
+        registry = ToolRegistry(providers=[provider])
+
+        provider.assert_not_called()
+        tools1 = registry.get_tools()
+        tools2 = registry.get_tools()
+
+        provider.assert_called_once()
+        assert [tool.name for tool in tools1] == ["sync_tool"]
+        assert tools1 == tools2
+        assert tools1 is not tools2  # callers get a copy they may modify
+
+    def test_is_async_call_required(self):
+        """Test that only coroutine-only tools require an async call."""
+        registry = ToolRegistry(
+            providers=[
+                lambda: [
+                    StructuredTool.from_function(func=sync_tool),
+                    StructuredTool.from_function(coroutine=async_tool),
+                ]
+            ]
+        )
+
+        # Nothing is async-only before the tools are resolved
+        assert not registry.is_async_call_required("async_tool")
+
+        registry.get_tools()
+        assert registry.is_async_call_required("async_tool")
+        assert not registry.is_async_call_required("sync_tool")
+        assert not registry.is_async_call_required("unknown_tool")
+
+    def test_clear(self):
+        """Test that clear forces the providers to be resolved again."""
+        provider = Mock(return_value=[])
+        registry = ToolRegistry(providers=[provider])
+
+        registry.get_tools()
+        registry.clear()
+        registry.get_tools()
+
+        assert provider.call_count == 2
+
+    def test_get_tool_registry_cached(self):
+        """Test that get_tool_registry returns a process-wide singleton."""
+        assert get_tool_registry() is get_tool_registry()
@@ -0,0 +1,65 @@
+from unittest.mock import Mock, call, patch
+
+from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from azure.cosmos.partition_key import NonePartitionKeyValue
+from langchain_core.documents import Document
+
+from template_langgraph.tools.cosmosdb_tool import CosmosdbClientWrapper, Settings, delete_items
+
+
+class TestDeleteItems:
+    """Test cases for delete_items."""
+
+    def test_id_partition_key_deletes_without_a_lookup(self):
+        """Test that items partitioned by id are deleted with their id as the partition key value."""
+        container = Mock()
+
+        assert delete_items(container, ["a", "b"], "/id") == 2
+
+        container.query_items.assert_not_called()
+        assert container.delete_item.call_args_list == [
+            call(item="a", partition_key="a"),
+            call(item="b", partition_key="b"),
+        ]
+
+    def test_partition_key_value_is_read_from_the_item(self):
+        """Test that the value at a nested partition key path is looked up before deleting."""
+        container = Mock()
+        container.query_items.return_value = [
+            {"id": "a", "partition_key": "docs/kabuto.pdf"},
+            {"id": "b"},
+        ]
+
+        assert delete_items(container, ["a", "b", "gone"], "/metadata/source") == 2
+
+        query = container.query_items.call_args.kwargs["query"]
+        assert 'c["metadata"]["source"] AS partition_key' in query
+        assert container.delete_item.call_args_list == [
+            call(item="a", partition_key="docs/kabuto.pdf"),
+            call(item="b", partition_key=NonePartitionKeyValue),
+        ]
+
+    def test_missing_items_are_skipped(self):
+        """Test that items deleted in an earlier run do not fail the deletion."""
+        container = Mock()
+        container.delete_item.side_effect = [CosmosResourceNotFoundError(message="gone"), None]
+
+        assert delete_items(container, ["a", "b"], "/id") == 1
+
+
+class TestIndexDocuments:
+    """Test cases for CosmosdbClientWrapper.index_documents."""
+
+    @patch("template_langgraph.tools.cosmosdb_tool.CosmosClient")
+    @patch("template_langgraph.tools.cosmosdb_tool.AzureCosmosDBNoSqlVectorSearch")
+    def test_documents_are_added_in_batches(self, mock_vector_search, mock_cosmos_client):
+        """Test that a document generator is added in batches keyed by chunk id."""
+        mock_vector_search.return_value.add_documents.side_effect = lambda documents, ids: ids
+        wrapper = CosmosdbClientWrapper(settings=Settings(cosmosdb_index_batch_size=2))
+        documents = (Document(page_content=f"chunk {i}", metadata={"chunk_id": f"id_{i}"}) for i in range(3))
+
+        assert wrapper.index_documents(documents) == 3
+        assert [c.kwargs["ids"] for c in mock_vector_search.return_value.add_documents.call_args_list] == [
+            ["id_0", "id_1"],
+            ["id_2"],
+        ]
@@ -0,0 +1,113 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from langchain_core.documents import Document
+
+from template_langgraph.tools.elasticsearch_tool import ElasticsearchClientWrapper, Settings
+
+
+def make_wrapper(refresh_interval: str | None = "5s") -> ElasticsearchClientWrapper:
+    wrapper = ElasticsearchClientWrapper(settings=Settings(elasticsearch_bulk_chunk_size=2))
+    wrapper.client = Mock()
+    wrapper.client.indices.exists.return_value = True
+    index_settings = {"refresh_interval": refresh_interval} if refresh_interval else {}
+    wrapper.client.indices.get_settings.return_value = {"docs": {"settings": {"index": index_settings}}}
+    return wrapper
+
+
+def refresh_intervals(wrapper: ElasticsearchClientWrapper) -> list:
+    return [
+        call.kwargs["settings"]["index"]["refresh_interval"]
+        for call in wrapper.client.indices.put_settings.call_args_list
+    ]
+
+
+def fake_bulk(client, actions, **kwargs):
+    for action in actions:
+        if action["_source"]["content"] == "bad":
+            yield False, {"index": {"status": 400, "error": "mapper_parsing_exception"}}
+        else:
+            yield True, {"index": {"status": 201}}
+
+
+class TestIndexDocuments:
+    """Test cases for ElasticsearchClientWrapper.index_documents."""
+
+    def test_streams_documents_and_reports_failures(self):
+        """Test that documents are consumed lazily and failed documents are reported."""
+        wrapper = make_wrapper()
+        documents = (Document(page_content=content, metadata={"source": "a.pdf"}) for content in ["a", "bad", "c"])
+
+        with patch("template_langgraph.tools.elasticsearch_tool.helpers.parallel_bulk", side_effect=fake_bulk) as bulk:
+            result = wrapper.index_documents(index_name="docs", documents=documents, thread_count=2)
+
+        assert result.success == 2
+        assert result.failed == [{"index": {"status": 400, "error": "mapper_parsing_exception"}}]
+        assert bulk.call_args.kwargs["chunk_size"] == 2
+        assert bulk.call_args.kwargs["thread_count"] == 2
+
+    def test_single_thread_uses_streaming_bulk(self):
+        """Test that thread_count=1 streams the bulk requests serially."""
+        wrapper = make_wrapper()
+
+        with patch("template_langgraph.tools.elasticsearch_tool.helpers.streaming_bulk", side_effect=fake_bulk) as bulk:
+            result = wrapper.index_documents(index_name="docs", documents=[Document(page_content="a")], thread_count=1)
+
+        assert bulk.called
+        assert result.success == 1
+
+    def test_refresh_is_disabled_and_restored(self):
+        """Test that refresh is turned off during the load and restored afterwards."""
+        wrapper = make_wrapper(refresh_interval="5s")
+
+        with patch("template_langgraph.tools.elasticsearch_tool.helpers.parallel_bulk", side_effect=fake_bulk):
+            wrapper.index_documents(index_name="docs", documents=[Document(page_content="a")])
+
+        assert refresh_intervals(wrapper) == ["-1", "5s"]
+        wrapper.client.indices.refresh.assert_called_once_with(index="docs")
+
+    def test_refresh_is_restored_on_error(self):
+        """Test that the default refresh interval is restored when the load fails."""
+        wrapper = make_wrapper(refresh_interval=None)
+
+        with (
+            patch(
+                "template_langgraph.tools.elasticsearch_tool.helpers.parallel_bulk",
+                side_effect=RuntimeError("connection lost"),
+            ),
+            pytest.raises(RuntimeError),
+        ):
+            wrapper.index_documents(index_name="docs", documents=[Document(page_content="a")])
+
+        assert refresh_intervals(wrapper) == ["-1", None]
+
+
+class TestMsearch:
+    """Test cases for ElasticsearchClientWrapper.msearch."""
+
+    def test_one_request_for_all_queries(self):
+        """Test that all queries go out in one multi-search request and results keep their order."""
+        wrapper = make_wrapper()
+        wrapper.client.msearch.return_value = {
+            "responses": [
+                {"hits": {"hits": [{"_source": {"filename": "a.pdf", "content": "A"}, "_score": 2.0}]}},
+                {"hits": {"hits": []}},
+            ]
+        }
+
+        results = wrapper.msearch(index_name="docs", queries=["起動", "停止"], max_results=5)
+
+        searches = wrapper.client.msearch.call_args.kwargs["searches"]
+        assert searches[0] == {"index": "docs"}
+        assert searches[1]["query"]["match"]["content"] == "起動"
+        assert searches[3]["size"] == 5
+        assert [[doc.page_content for doc in docs] for docs in results] == [["A"], []]
+        assert results[0][0].metadata == {"source": "a.pdf", "score": 2.0}
+
+    def test_failed_search_raises(self):
+        """Test that an error in any of the searches is raised."""
+        wrapper = make_wrapper()
+        wrapper.client.msearch.return_value = {"responses": [{"error": {"type": "index_not_found_exception"}}]}
+
+        with pytest.raises(RuntimeError):
+            wrapper.msearch(index_name="docs", queries=["起動"])
@@ -0,0 +1,119 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from template_langgraph.tools.hybrid_search_tool import (
+    SearchHit,
+    Settings,
+    ahybrid_search,
+    fuse_rankings,
+    hybrid_search,
+)
+
+BM25 = [
+    SearchHit(file_name="docs_kabuto.pdf", content="startup", score=12.0),
+    SearchHit(file_name="docs_kabuto.pdf", content="shutdown", score=3.0),
+]
+VECTOR = [
+    SearchHit(file_name="./data/qa_kabuto.csv", content="purple light", score=0.9),
+    SearchHit(file_name="./data/docs_kabuto.pdf", content="startup", score=0.8),
+]
+
+
+class TestFuseRankings:
+    """Test cases for fuse_rankings."""
+
+    def test_rrf_promotes_hits_found_by_both_backends(self):
+        """Test that a chunk ranked by both backends is merged and ranked first."""
+        results = fuse_rankings({"bm25": BM25, "vector": VECTOR}, method="rrf", rrf_k=60)
+
+        assert [hit.content for hit in results] == ["startup", "purple light", "shutdown"]
+        assert results[0].score == pytest.approx(1 / 61 + 1 / 62)
+
+    def test_weighted_uses_normalized_scores(self):
+        """Test that weighted fusion combines min-max normalized scores."""
+        results = fuse_rankings(
+            {"bm25": BM25, "vector": VECTOR},
+            method="weighted",
+            weights={"bm25": 0.2, "vector": 0.8},
+        )
+
+        assert results[0].content == "purple light"
+        assert results[0].score == pytest.approx(0.8)
+        assert results[1].content == "startup"
+        assert results[1].score == pytest.approx(0.2)
+
+    def test_duplicates_within_a_backend_count_once(self):
+        """Test that repeated chunks in one ranking are deduplicated."""
+        hits = [SearchHit(file_name="a.pdf", content="x", score=1.0)] * 2
+
+        results = fuse_rankings({"bm25": hits}, method="rrf", rrf_k=0)
+
+        assert len(results) == 1
+        assert results[0].score == pytest.approx(1.0)
+
+    def test_top_k(self):
+        """Test that only top_k hits are returned."""
+        assert len(fuse_rankings({"bm25": BM25, "vector": VECTOR}, top_k=1)) == 1
+
+
+class TestHybridSearch:
+    """Test cases for hybrid_search and ahybrid_search."""
+
+    def test_both_backends_are_fused(self):
+        """Test that the sync search queries both backends."""
+        with (
+            patch("template_langgraph.tools.hybrid_search_tool._search_bm25", return_value=BM25),
+            patch("template_langgraph.tools.hybrid_search_tool._search_vector", return_value=VECTOR),
+        ):
+            results = hybrid_search("startup", settings=Settings())
+
+        assert [hit.content for hit in results] == ["startup", "purple light", "shutdown"]
+
+    def test_failed_backend_is_skipped(self):
+        """Test that one failing backend does not fail the search."""
+        with (
+            patch("template_langgraph.tools.hybrid_search_tool._search_bm25", side_effect=ConnectionError("down")),
+            patch("template_langgraph.tools.hybrid_search_tool._search_vector", return_value=VECTOR),
+        ):
+            results = hybrid_search("startup", settings=Settings())
+
+        assert [hit.content for hit in results] == ["purple light", "startup"]
+
+    def test_all_backends_failing_raises(self):
+        """Test that the error is raised when no backend answered."""
+        with (
+            patch("template_langgraph.tools.hybrid_search_tool._search_bm25", side_effect=ConnectionError("down")),
+            patch("template_langgraph.tools.hybrid_search_tool._search_vector", side_effect=TimeoutError("slow")),
+            pytest.raises(ConnectionError),
+        ):
+            hybrid_search("startup", settings=Settings())
+
+    def test_async_backends_run_concurrently(self):
+        """Test that the async search awaits both backends at the same time."""
+        running = 0
+        peak = 0
+
+        async def track(hits):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return hits
+
+        async def fake_bm25(keywords, settings):
+            return await track(BM25)
+
+        async def fake_vector(keywords, settings):
+            return await track(VECTOR)
+
+        with (
+            patch("template_langgraph.tools.hybrid_search_tool._asearch_bm25", new=fake_bm25),
+            patch("template_langgraph.tools.hybrid_search_tool._asearch_vector", new=fake_vector),
+        ):
+            results = asyncio.run(ahybrid_search("startup", settings=Settings()))
+
+        assert peak == 2
+        assert results[0].content == "startup"
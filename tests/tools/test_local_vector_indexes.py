@@ -0,0 +1,183 @@
+import asyncio
+import os
+import threading
+
+import numpy as np
+import pytest
+from qdrant_client.models import PointIdsList, PointStruct
+
+from template_langgraph.tools.local_vector_indexes import MIN_CAPACITY, LocalQdrantClient
+from template_langgraph.tools.qdrant_tool import (
+    AsyncQdrantClientWrapper,
+    QdrantClientWrapper,
+    Settings,
+)
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(qdrant_backend="local", qdrant_local_path=str(tmp_path / "qdrant"))
+
+
+def make_points(vectors: dict) -> list[PointStruct]:
+    return [
+        PointStruct(id=id, vector=vector, payload={"file_name": "qa.csv", "content": f"doc {id}"})
+        for id, vector in vectors.items()
+    ]
+
+
+class TestLocalBackend:
+    """Test cases for QdrantClientWrapper with the local backend."""
+
+    def test_query_returns_cosine_top_k(self, settings):
+        """Test that the closest points are returned by cosine similarity, best first."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        wrapper.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0], 2: [0.0, 3.0], 3: [2.0, 2.0]}))
+
+        points = wrapper.query_points("qa_kabuto", query=[1.0, 0.1], limit=2)
+
+        assert [point.id for point in points] == [1, 3]
+        assert points[0].score == pytest.approx(1 / np.sqrt(1.01))
+        assert points[0].payload == {"file_name": "qa.csv", "content": "doc 1"}
+
+    def test_collection_persists_in_a_single_file(self, settings, tmp_path):
+        """Test that a new client reads the collection back from its file."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        wrapper.upsert_points("qa_kabuto", make_points({"a": [1.0, 0.0], "b": [0.0, 1.0]}))
+
+        reopened = QdrantClientWrapper(settings=settings)
+
+        assert [path.name for path in (tmp_path / "qdrant").iterdir()] == ["qa_kabuto.vecs"]
+        assert reopened.collection_exists("qa_kabuto")
+        assert reopened.query_points("qa_kabuto", query=[0.0, 1.0], limit=1)[0].id == "b"
+
+    def test_upsert_overwrites_and_delete_removes(self, settings):
+        """Test that upserting an existing id replaces it and deleted points are not returned."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        wrapper.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0], 2: [0.0, 1.0]}))
+        wrapper.upsert_points("qa_kabuto", make_points({1: [0.0, 1.0]}))
+        wrapper.delete_points("qa_kabuto", ids=[2])
+
+        points = wrapper.query_points("qa_kabuto", query=[0.0, 1.0], limit=3)
+
+        assert [(point.id, round(point.score, 3)) for point in points] == [(1, 1.0)]
+
+    def test_changes_from_another_client_are_picked_up(self, settings):
+        """Test that a client reloads a collection rewritten by another process."""
+        reader = QdrantClientWrapper(settings=settings)
+        writer = QdrantClientWrapper(settings=settings)
+        writer.create_collection("qa_kabuto", vector_size=2)
+        writer.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0]}))
+        assert [point.id for point in reader.query_points("qa_kabuto", query=[0.0, 1.0], limit=5)] == [1]
+
+        writer.upsert_points("qa_kabuto", make_points({2: [0.0, 1.0]}))
+
+        assert reader.query_points("qa_kabuto", query=[0.0, 1.0], limit=1)[0].id == 2
+
+    def test_delete_collection(self, settings):
+        """Test that a deleted collection no longer exists."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+
+        assert wrapper.delete_collection("qa_kabuto")
+        assert not wrapper.collection_exists("qa_kabuto")
+        assert not wrapper.delete_collection("qa_kabuto")
+
+    def test_async_wrapper(self, settings):
+        """Test that the async wrapper queries the same files."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        wrapper.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0], 2: [0.0, 1.0]}))
+
+        points = asyncio.run(AsyncQdrantClientWrapper(settings=settings).query_points("qa_kabuto", query=[0.0, 1.0]))
+
+        assert [point.id for point in points] == [2, 1]
+
+    def test_query_batch_matches_single_queries(self, settings):
+        """Test that a batch query returns the same results as one query per vector."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        wrapper.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0], 2: [0.0, 3.0], 3: [2.0, 2.0]}))
+        queries = [[1.0, 0.1], [0.0, 1.0], [1.0, 1.0]]
+
+        batch = wrapper.query_batch("qa_kabuto", queries=queries, limit=2)
+        async_batch = asyncio.run(AsyncQdrantClientWrapper(settings=settings).query_batch("qa_kabuto", queries=queries))
+
+        singles = [wrapper.query_points("qa_kabuto", query=query, limit=2) for query in queries]
+        assert [[point.id for point in points] for points in batch] == [[1, 3], [2, 3], [3, 1]]
+        assert [[point.id for point in points] for points in batch] == [[p.id for p in points] for points in singles]
+        assert [len(points) for points in async_batch] == [3, 3, 3]
+
+    def test_wrong_vector_size_is_rejected(self, tmp_path):
+        """Test that vectors of the wrong size are rejected."""
+        client = LocalQdrantClient(path=str(tmp_path))
+        wrapper_settings = Settings(qdrant_backend="local", qdrant_local_path=str(tmp_path))
+        QdrantClientWrapper(settings=wrapper_settings).create_collection("qa_kabuto", vector_size=3)
+
+        with pytest.raises(ValueError):
+            client.upsert("qa_kabuto", make_points({1: [1.0, 0.0]}))
+
+    def test_upserts_append_in_place(self, settings, tmp_path):
+        """Test that upserts within the reserved rows update the file in place and survive a reload."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        path = tmp_path / "qdrant" / "qa_kabuto.vecs"
+        inode = os.stat(path).st_ino
+
+        wrapper.upsert_points("qa_kabuto", make_points({1: [1.0, 0.0], 2: [0.0, 1.0]}))
+        wrapper.upsert_points("qa_kabuto", make_points({3: [1.0, 1.0]}))
+        wrapper.upsert_points(
+            "qa_kabuto", [PointStruct(id=1, vector=[0.0, 1.0], payload={"file_name": "qa.csv", "content": "new"})]
+        )
+
+        assert os.stat(path).st_ino == inode
+        points = QdrantClientWrapper(settings=settings).query_points("qa_kabuto", query=[0.0, 1.0], limit=3)
+        assert [(point.id, point.payload["content"]) for point in points] == [(1, "new"), (2, "doc 2"), (3, "doc 3")]
+
+    def test_file_is_rewritten_when_reserved_rows_run_out(self, settings, tmp_path):
+        """Test that growing past the reserved rows rewrites the file with every point kept."""
+        wrapper = QdrantClientWrapper(settings=settings)
+        wrapper.create_collection("qa_kabuto", vector_size=2)
+        path = tmp_path / "qdrant" / "qa_kabuto.vecs"
+        inode = os.stat(path).st_ino
+        count = MIN_CAPACITY + 10
+
+        for offset in range(0, count, 8):
+            wrapper.upsert_points(
+                "qa_kabuto", make_points({i: [1.0, float(i)] for i in range(offset, min(offset + 8, count))})
+            )
+
+        assert os.stat(path).st_ino != inode
+        points = QdrantClientWrapper(settings=settings).query_points("qa_kabuto", query=[0.0, 1.0], limit=count)
+        assert sorted(point.id for point in points) == list(range(count))
+
+    def test_queries_are_safe_during_writes(self, tmp_path):
+        """Test that queries running alongside upserts and deletes never see a half-applied change."""
+        client = LocalQdrantClient(path=str(tmp_path))
+        QdrantClientWrapper(
+            settings=Settings(qdrant_backend="local", qdrant_local_path=str(tmp_path))
+        ).create_collection("qa_kabuto", vector_size=2)
+        client.upsert("qa_kabuto", make_points({i: [1.0, float(i)] for i in range(20)}))
+        errors = []
+        done = threading.Event()
+
+        def query():
+            while not done.is_set():
+                try:
+                    client.query_points("qa_kabuto", query=[0.0, 1.0], limit=20)
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        thread = threading.Thread(target=query)
+        thread.start()
+        for i in range(200):
+            client.upsert("qa_kabuto", make_points({100 + i: [float(i), 1.0]}))
+            client.delete("qa_kabuto", points_selector=PointIdsList(points=[i % 20, 100 + i]))
+        done.set()
+        thread.join()
+
+        assert errors == []
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from template_langgraph.tools.mcp_tool import McpClientWrapper, McpSessionManager, Settings
+
+MATH_SERVER_PATH = Path(__file__).parents[2] / "template_langgraph" / "mcps" / "math_server.py"
+
+
+@pytest.fixture
+def manager():
+    manager = McpSessionManager(
+        {
+            "math_server": {
+                "command": sys.executable,
+                "args": [str(MATH_SERVER_PATH)],
+                "env": {"PYTHONPATH": str(MATH_SERVER_PATH.parents[2])},
+                "transport": "stdio",
+            }
+        }
+    )
+    yield manager
+    manager.close()
+
+
+class TestMcpClientWrapper:
+    def test_get_tools_without_config(self):
+        """Test that no tools are returned when no MCP config is set."""
+        assert McpClientWrapper(settings=Settings(mcp_config_path="")).get_tools() == []
+
+
+class TestMcpSessionManager:
+    def test_sync_and_async_calls_share_session(self, manager):
+        """Test that proxy tools can be invoked from sync and async callers."""
+        tools = {tool.name: tool for tool in manager.get_tools()}
+        assert {"add", "multiply"} <= set(tools)
+
+        assert json.loads(str(tools["add"].invoke({"a": 1, "b": 2}))) == 3
+
+        async def call():
+            return await asyncio.gather(*(tools["multiply"].ainvoke({"a": i, "b": 2}) for i in range(3)))
+
+        assert [json.loads(str(result)) for result in asyncio.run(call())] == [0, 2, 4]
+        assert len(manager._connections) == 1
+
+    def test_reconnects_when_session_ends(self, manager):
+        """Test that a call after the session has ended opens a new one."""
+        tools = {tool.name: tool for tool in manager.get_tools()}
+        first_task = manager._connections["math_server"].task
+
+        manager.run(manager._disconnect("math_server"))
+
+        assert json.loads(str(tools["add"].invoke({"a": 2, "b": 2}))) == 4
+        assert manager._connections["math_server"].task is not first_task
+
+    def test_run_rejects_calls_from_own_loop(self, manager):
+        """Test that run() refuses to block its own event loop."""
+
+        async def nested():
+            manager.run(asyncio.sleep(0))
+
+        with pytest.raises(RuntimeError):
+            manager.run(nested())
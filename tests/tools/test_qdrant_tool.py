@@ -0,0 +1,84 @@
+from unittest.mock import Mock
+
+import pytest
+from qdrant_client.models import BinaryQuantization, ScalarQuantization
+
+from template_langgraph.tools.qdrant_tool import (
+    COLLECTION_PROFILES,
+    CollectionProfile,
+    QdrantClientWrapper,
+    Settings,
+    get_collection_profile,
+)
+
+
+class TestCollectionProfile:
+    """Test cases for CollectionProfile."""
+
+    def test_default_profile_keeps_qdrant_defaults(self):
+        """Test that the default profile creates plain float32 cosine vectors."""
+        profile = get_collection_profile("default")
+
+        assert profile.vectors_config(1536).on_disk is None
+        assert profile.hnsw_config() is None
+        assert profile.quantization_config() is None
+        assert profile.search_params() is None
+
+    def test_scalar_on_disk_profile(self):
+        """Test that a quantized profile configures storage and rescoring."""
+        profile = get_collection_profile("scalar_on_disk")
+
+        assert profile.vectors_config(1536).on_disk is True
+        assert isinstance(profile.quantization_config(), ScalarQuantization)
+        assert profile.quantization_config().scalar.always_ram is True
+        assert profile.search_params().quantization.oversampling == 2.0
+        assert profile.search_params().quantization.rescore is True
+
+    def test_binary_profile(self):
+        """Test that the binary profile uses binary quantization."""
+        assert isinstance(get_collection_profile("binary_on_disk").quantization_config(), BinaryQuantization)
+
+    def test_hnsw_options(self):
+        """Test that HNSW build and search options are passed through."""
+        profile = get_collection_profile("high_recall")
+
+        assert (profile.hnsw_config().m, profile.hnsw_config().ef_construct) == (32, 256)
+        assert profile.search_params().hnsw_ef == 256
+        assert profile.search_params().quantization is None
+
+    def test_estimated_ram_shrinks_with_quantization_on_disk(self):
+        """Test that moving vectors to disk and quantizing them lowers the RAM estimate."""
+        ram = {name: profile.estimate_ram_bytes(1_000_000, 1536) for name, profile in COLLECTION_PROFILES.items()}
+
+        assert ram["binary_on_disk"] < ram["scalar_on_disk"] < ram["default"] < ram["scalar"]
+        assert ram["default"] == 1_000_000 * (1536 * 4 + 2 * 16 * 4)
+
+    def test_unknown_profile(self):
+        """Test that an unknown profile name is rejected."""
+        with pytest.raises(ValueError):
+            get_collection_profile("unknown")
+
+
+class TestQdrantClientWrapperProfiles:
+    """Test cases for how QdrantClientWrapper applies profiles."""
+
+    def test_create_and_query_use_the_configured_profile(self):
+        """Test that QDRANT_COLLECTION_PROFILE drives collection creation and search params."""
+        wrapper = QdrantClientWrapper(settings=Settings(qdrant_collection_profile="scalar"))
+        wrapper.client = Mock()
+
+        wrapper.create_collection("qa_kabuto", vector_size=8)
+        wrapper.query_points("qa_kabuto", query=[0.0] * 8)
+
+        create_kwargs = wrapper.client.create_collection.call_args.kwargs
+        assert isinstance(create_kwargs["quantization_config"], ScalarQuantization)
+        assert wrapper.client.query_points.call_args.kwargs["search_params"].quantization.rescore is True
+
+    def test_explicit_profile_overrides_the_setting(self):
+        """Test that a profile passed to create_collection wins over the setting."""
+        wrapper = QdrantClientWrapper(settings=Settings())
+        wrapper.client = Mock()
+
+        wrapper.create_collection("qa_kabuto", vector_size=8, profile=CollectionProfile(name="custom", hnsw_m=8))
+
+        assert wrapper.client.create_collection.call_args.kwargs["hnsw_config"].m == 8
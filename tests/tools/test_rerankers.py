@@ -0,0 +1,96 @@
+from unittest.mock import Mock
+
+import pytest
+
+from template_langgraph.tools.rerankers import Bm25Scorer, Reranker, ScoreCache, Settings, tokenize
+
+
+class TestTokenize:
+    """Test cases for tokenize."""
+
+    def test_latin_words_are_normalized(self):
+        """Test that latin text is lowercased and NFKC normalized."""
+        assert tokenize("KABUTO Ｅｒｒｏｒ 0101") == ["kabuto", "error", "0101"]
+
+    def test_japanese_text(self):
+        """Test that kanji runs become bigrams, katakana runs stay whole and hiragana is dropped."""
+        assert tokenize("画面が紫色に点滅するエラー") == ["画面", "紫色", "点滅", "エラー"]
+
+
+class TestBm25Scorer:
+    """Test cases for Bm25Scorer."""
+
+    def test_matching_text_scores_higher(self):
+        """Test that texts containing more query terms score higher."""
+        scores = Bm25Scorer(settings=Settings())("紫色 点滅", ["起動が遅い", "画面が点滅する", "紫色に点滅する"])
+
+        assert scores[0] == 0
+        assert scores[2] > scores[1] > 0
+
+    def test_score_of_a_pair_does_not_depend_on_other_candidates(self):
+        """Test that pair scores are stable, which makes them cacheable."""
+        scorer = Bm25Scorer(settings=Settings())
+
+        alone = scorer("点滅", ["画面が点滅する"])
+        together = scorer("点滅", ["画面が点滅する", "点滅 点滅 点滅"])
+
+        assert alone[0] == pytest.approx(together[0])
+
+    def test_empty_query(self):
+        """Test that a query without tokens scores every text as zero."""
+        assert list(Bm25Scorer(settings=Settings())("です", ["a", "b"])) == [0, 0]
+
+
+class TestReranker:
+    """Test cases for Reranker."""
+
+    def test_disabled_reranker_keeps_backend_order(self):
+        """Test that a disabled reranker fetches k results and returns them unchanged."""
+        scorer = Mock()
+        reranker = Reranker(scorer=scorer, settings=Settings(reranker_enabled=False))
+
+        assert reranker.fetch_limit(3) == 3
+        assert reranker.rerank("q", ["a", "b", "c", "d"], get_text=str, k=3) == ["a", "b", "c"]
+        scorer.assert_not_called()
+
+    def test_enabled_reranker_over_fetches_and_trims(self):
+        """Test that an enabled reranker over-fetches and returns the k best candidates."""
+        reranker = Reranker(settings=Settings(reranker_enabled=True, reranker_candidates=50))
+
+        results = reranker.rerank(
+            "紫色 点滅",
+            [{"content": "起動が遅い"}, {"content": "画面が点滅する"}, {"content": "紫色に点滅する"}],
+            get_text=lambda item: item["content"],
+            k=2,
+        )
+
+        assert reranker.fetch_limit(3) == 50
+        assert [item["content"] for item in results] == ["紫色に点滅する", "画面が点滅する"]
+
+    def test_scores_are_cached_per_pair(self):
+        """Test that only uncached (query, text) pairs reach the scorer."""
+        scorer = Mock(side_effect=lambda query, texts: [float(len(text)) for text in texts])
+        reranker = Reranker(scorer=scorer, settings=Settings(reranker_enabled=True))
+
+        reranker.rerank("q", ["a", "bb"], get_text=str, k=2)
+        results = reranker.rerank("q", ["bb", "ccc"], get_text=str, k=2)
+
+        assert results == ["ccc", "bb"]
+        assert scorer.call_args_list[1].args == ("q", ["ccc"])
+        assert len(reranker.cache) == 3
+
+
+class TestScoreCache:
+    """Test cases for ScoreCache."""
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the cache keeps at most max_entries scores."""
+        cache = ScoreCache(max_entries=2)
+        cache.set("a", 1.0)
+        cache.set("b", 2.0)
+        cache.get("a")
+        cache.set("c", 3.0)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1.0
+        assert cache.get("c") == 3.0
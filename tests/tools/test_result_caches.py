@@ -0,0 +1,142 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from template_langgraph.tools.result_caches import (
+    IndexVersionStore,
+    ResultCache,
+    Settings,
+    cache_results,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def settings(tmp_path):
+    return Settings(
+        result_cache_ttl_seconds=60,
+        result_cache_max_entries=2,
+        result_cache_index_version_dir_path=str(tmp_path / "versions"),
+    )
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(settings, clock):
+    cache = ResultCache(settings=settings, clock=clock)
+    with patch("template_langgraph.tools.result_caches.get_result_cache", return_value=cache):
+        yield cache
+
+
+class TestIndexVersionStore:
+    """Test cases for IndexVersionStore."""
+
+    def test_bump_is_seen_by_other_instances(self, settings):
+        """Test that a bump made elsewhere, e.g. by an ingestion script, changes the version."""
+        reader = IndexVersionStore(settings=settings)
+        assert reader.get("qdrant:qa_kabuto") == "0"
+
+        version = IndexVersionStore(settings=settings).bump("qdrant:qa_kabuto")
+
+        assert reader.get("qdrant:qa_kabuto") == version
+        assert reader.get("elasticsearch:docs_kabuto") == "0"
+
+
+class TestCacheResults:
+    """Test cases for the cache_results decorator."""
+
+    def test_repeated_query_is_served_from_cache(self, cache):
+        """Test that the same normalized arguments hit the cache."""
+        search = Mock(return_value=["result"])
+        cached = cache_results("search_qdrant", targets=lambda: ["qdrant:qa_kabuto"])(lambda keywords: search(keywords))
+
+        assert cached("KABUTO  起動") == ["result"]
+        assert cached(" ＫＡＢＵＴＯ 起動 ") == ["result"]
+
+        search.assert_called_once()
+        assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    def test_different_tools_do_not_share_entries(self, cache):
+        """Test that the tool name is part of the key."""
+        qdrant = cache_results("search_qdrant", targets=lambda: [])(lambda keywords: ["qdrant"])
+        elasticsearch = cache_results("search_elasticsearch", targets=lambda: [])(lambda keywords: ["es"])
+
+        assert qdrant("q") == ["qdrant"]
+        assert elasticsearch("q") == ["es"]
+
+    def test_bumped_index_version_invalidates(self, cache):
+        """Test that bumping the index version makes the next call a miss."""
+        search = Mock(return_value=["result"])
+        cached = cache_results("search_qdrant", targets=lambda: ["qdrant:qa_kabuto"])(lambda keywords: search(keywords))
+
+        cached("q")
+        IndexVersionStore(settings=cache.settings).bump("qdrant:qa_kabuto")
+        cached("q")
+
+        assert search.call_count == 2
+
+    def test_entries_expire_after_ttl(self, cache, clock):
+        """Test that entries older than the TTL are not served."""
+        search = Mock(return_value=["result"])
+        cached = cache_results("search_qdrant", targets=lambda: [])(lambda keywords: search(keywords))
+
+        cached("q")
+        clock.now = 61
+        cached("q")
+
+        assert search.call_count == 2
+        assert cache.stats.expirations == 1
+
+    def test_least_recently_used_entry_is_evicted(self, cache):
+        """Test that the cache keeps at most max_entries results."""
+        search = Mock(side_effect=lambda keywords: [keywords])
+        cached = cache_results("search_qdrant", targets=lambda: [])(lambda keywords: search(keywords))
+
+        cached("a")
+        cached("b")
+        cached("a")
+        cached("c")
+        cached("a")
+        cached("b")
+
+        assert [call.args[0] for call in search.call_args_list] == ["a", "b", "c", "b"]
+        assert cache.stats.evictions == 2
+
+    def test_async_function_is_cached(self, cache):
+        """Test that coroutine functions are cached too."""
+        calls = []
+
+        @cache_results("search_qdrant", targets=lambda: [])
+        async def search(keywords: str, k: int = 3):
+            calls.append(keywords)
+            return [keywords] * k
+
+        async def run():
+            return [await search("q"), await search("q", k=3)]
+
+        assert asyncio.run(run()) == [["q"] * 3, ["q"] * 3]
+        assert calls == ["q"]
+
+    def test_disabled_cache(self, cache):
+        """Test that nothing is cached when the cache is disabled."""
+        cache.settings.result_cache_enabled = False
+        search = Mock(return_value=["result"])
+        cached = cache_results("search_qdrant", targets=lambda: [])(lambda keywords: search(keywords))
+
+        cached("q")
+        cached("q")
+
+        assert search.call_count == 2
+        assert len(cache) == 0
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from template_langgraph.tools.single_flights import SingleFlight, coalesce_calls
+
+
+@pytest.fixture
+def group():
+    group = SingleFlight()
+    with patch("template_langgraph.tools.single_flights.get_single_flight", return_value=group):
+        yield group
+
+
+class TestCoalesceCalls:
+    """Test cases for the coalesce_calls decorator."""
+
+    def test_identical_concurrent_calls_run_once(self, group):
+        """Test that threads making the same call while it is in flight share one result."""
+        release = threading.Event()
+        calls = []
+
+        @coalesce_calls("search_qdrant")
+        def search(keywords: str):
+            calls.append(keywords)
+            release.wait(5)
+            return [keywords]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(search("KABUTO  起動"))) for _ in range(3)]
+        threads[0].start()
+        while not group._calls:
+            pass
+        for thread in threads[1:]:
+            thread.start()
+        while group.coalesced < 2:
+            pass
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == ["KABUTO  起動"]
+        assert results == [["KABUTO  起動"]] * 3
+        assert group.coalesced == 2
+
+    def test_sequential_calls_are_not_coalesced(self, group):
+        """Test that nothing is remembered once a call has finished."""
+        calls = []
+
+        @coalesce_calls("search_qdrant")
+        def search(keywords: str):
+            calls.append(keywords)
+            return [keywords]
+
+        search("q")
+        search("q")
+
+        assert calls == ["q", "q"]
+        assert group.coalesced == 0
+
+    def test_async_calls_are_coalesced_by_normalized_args(self, group):
+        """Test that concurrent coroutines with equivalent arguments share one call."""
+        calls = []
+
+        @coalesce_calls("search_ai_search")
+        async def search(query: str, k: int = 5):
+            calls.append((query, k))
+            await asyncio.sleep(0.01)
+            return [query] * k
+
+        async def run():
+            return await asyncio.gather(search("q", 2), search(" q ", k=2), search("other", 2))
+
+        results = asyncio.run(run())
+
+        assert results == [["q", "q"], ["q", "q"], ["other", "other"]]
+        assert calls == [("q", 2), ("other", 2)]
+        assert group.coalesced == 1
+
+    def test_async_errors_reach_every_caller(self, group):
+        """Test that the exception of the shared call is raised in every waiting coroutine."""
+
+        @coalesce_calls("search_qdrant")
+        async def search(keywords: str):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        async def run():
+            return await asyncio.gather(search("q"), search("q"), return_exceptions=True)
+
+        results = asyncio.run(run())
+
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert group.coalesced == 1
+
+    def test_cancelled_caller_does_not_cancel_the_shared_call(self, group):
+        """Test that the other callers still get the result when the first caller is cancelled."""
+
+        @coalesce_calls("search_qdrant")
+        async def search(keywords: str):
+            await asyncio.sleep(0.02)
+            return [keywords]
+
+        async def run():
+            first = asyncio.create_task(search("q"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(search("q"))
+            await asyncio.sleep(0)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == ["q"]